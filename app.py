@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -8,6 +7,18 @@ import calendar
 from dateutil.relativedelta import relativedelta
 import os
 
+from src.database import CONFIANCA_MINIMA, DatabaseManager
+from src.analytics import COLUNAS_EXTRATO, Analytics
+from config import config
+from src.utils import (
+    PERIODOS,
+    SIMBOLOS_MOEDA,
+    calcular_intervalo,
+    descrever_intervalo,
+    formatar_moeda,
+    intervalo_ano_anterior
+)
+
 # Configuração da página
 st.set_page_config(
     page_title="Controle de Gastos",
@@ -16,245 +27,50 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Classe de gerenciamento do banco de dados
-class DatabaseManager:
-    def __init__(self, db_path='financas.db'):
-        self.db_path = db_path
-        self.init_db()
-    
-    def get_connection(self):
-        return sqlite3.connect(self.db_path)
-    
-    def init_db(self):
-        conn = self.get_connection()
-        c = conn.cursor()
-        
-        # Tabela de transações
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS transacoes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                descricao TEXT NOT NULL,
-                valor REAL NOT NULL,
-                categoria TEXT NOT NULL,
-                tipo TEXT NOT NULL CHECK(tipo IN ('receita', 'despesa')),
-                data DATE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Tabela de categorias
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS categorias (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL UNIQUE,
-                tipo TEXT NOT NULL CHECK(tipo IN ('receita', 'despesa'))
-            )
-        ''')
-        
-        # Categorias padrão
-        categorias_padrao = [
-            ('Salário', 'receita'),
-            ('Freelance', 'receita'),
-            ('Investimentos', 'receita'),
-            ('Presente', 'receita'),
-            ('Outros', 'receita'),
-            ('Alimentação', 'despesa'),
-            ('Transporte', 'despesa'),
-            ('Moradia', 'despesa'),
-            ('Saúde', 'despesa'),
-            ('Educação', 'despesa'),
-            ('Lazer', 'despesa'),
-            ('Compras', 'despesa'),
-            ('Outros', 'despesa')
-        ]
-        
-        # Inserir categorias padrão
-        for categoria, tipo in categorias_padrao:
-            try:
-                c.execute(
-                    "INSERT OR IGNORE INTO categorias (nome, tipo) VALUES (?, ?)",
-                    (categoria, tipo)
-                )
-            except:
-                pass
-        
-        conn.commit()
-        conn.close()
-    
-    def add_transacao(self, descricao, valor, categoria, tipo, data):
-        conn = self.get_connection()
-        c = conn.cursor()
-        c.execute(
-            "INSERT INTO transacoes (descricao, valor, categoria, tipo, data) VALUES (?, ?, ?, ?, ?)",
-            (descricao, abs(valor), categoria, tipo, data)
-        )
-        conn.commit()
-        conn.close()
-    
-    def get_transacoes(self, mes=None, ano=None):
-        conn = self.get_connection()
-        
-        query = "SELECT * FROM transacoes"
-        params = []
-        
-        if mes and ano:
-            query += " WHERE strftime('%m', data) = ? AND strftime('%Y', data) = ?"
-            params = [f"{mes:02d}", str(ano)]
-        
-        query += " ORDER BY data DESC"
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        return df
-    
-    def get_resumo(self, mes, ano):
-        conn = self.get_connection()
-        
-        query = """
-        SELECT 
-            tipo,
-            categoria,
-            SUM(valor) as total
-        FROM transacoes 
-        WHERE strftime('%m', data) = ? AND strftime('%Y', data) = ?
-        GROUP BY tipo, categoria
-        """
-        
-        df = pd.read_sql_query(query, conn, params=(f"{mes:02d}", str(ano)))
-        conn.close()
-        return df
-    
-    def get_categorias(self, tipo=None):
-        conn = self.get_connection()
-        
-        query = "SELECT nome FROM categorias"
-        params = []
-        
-        if tipo:
-            query += " WHERE tipo = ?"
-            params = [tipo]
-        
-        query += " ORDER BY nome"
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        return df['nome'].tolist()
-    
-    def add_categoria(self, nome, tipo):
-        conn = self.get_connection()
-        c = conn.cursor()
-        try:
-            c.execute("INSERT INTO categorias (nome, tipo) VALUES (?, ?)", (nome, tipo))
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.IntegrityError:
-            conn.close()
-            return False
+# Leituras com cache: a chave inclui db.versao_dados(), então o resultado só é
+# recalculado quando os parâmetros mudam ou quando alguém grava no banco
+@st.cache_data(show_spinner=False, max_entries=200)
+def _ler_cache(_db, versao, metodo, kwargs):
+    return getattr(_db, metodo)(**dict(kwargs))
 
-    def atualizar_transacao(self, transacao_id, descricao, valor, categoria, data):
-        """Atualiza uma transação existente"""
-        conn = self.get_connection()
-        c = conn.cursor()
-        
-        try:
-            c.execute(
-                """
-                UPDATE transacoes 
-                SET descricao = ?, valor = ?, categoria = ?, data = ?
-                WHERE id = ?
-                """,
-                (descricao, valor, categoria, data, transacao_id)
-            )
-            conn.commit()
-            return True
-        except Exception as e:
-            conn.rollback()
-            return False
-        finally:
-            conn.close()
+@st.cache_data(show_spinner=False, max_entries=50)
+def _analisar_cache(_db, versao, metodo, args):
+    return getattr(Analytics(_db), metodo)(*args)
 
-    def excluir_transacao_db(self, transacao_id):
-        """Exclui uma transação do banco"""
-        conn = self.get_connection()
-        c = conn.cursor()
-        
-        try:
-            c.execute("DELETE FROM transacoes WHERE id = ?", (transacao_id,))
-            conn.commit()
-            return True
-        except Exception as e:
-            conn.rollback()
-            return False
-        finally:
-            conn.close()
+def ler(db, metodo, **kwargs):
+    """Executa uma leitura do DatabaseManager (ex: 'get_transacoes') com cache"""
+    return _ler_cache(db, db.versao_dados(), metodo, tuple(sorted(kwargs.items())))
 
-# Funções utilitárias
-def formatar_moeda(valor):
-    """Formata valor como moeda brasileira"""
-    if pd.isna(valor) or valor == 0:
-        return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-
-def gerar_extrato_com_saldo(transacoes):
-    """Gera um DataFrame com saldo acumulado no formato desejado"""
-    if transacoes.empty:
-        return pd.DataFrame()
-    
-    # Criar cópia e ordenar por data
-    df = transacoes.copy()
-    df['data'] = pd.to_datetime(df['data'])
-    df = df.sort_values('data')
-    
-    # Formatar data (ex: 01/nov)
-    df['DATA'] = df['data'].dt.strftime('%d/%b').str.lower()
-    
-    # Formatar movimentação
-    df['MOVIMENTAÇÃO'] = df['descricao']
-    
-    # Ajustar valor (negativo para despesas)
-    df['VALOR_BRUTO'] = df.apply(
-        lambda x: -x['valor'] if x['tipo'] == 'despesa' else x['valor'], 
-        axis=1
-    )
-    
-    # Calcular saldo acumulado
-    df['SALDO'] = df['VALOR_BRUTO'].cumsum()
-    
-    # Formatar VALOR para exibição (com separadores)
-    df['VALOR'] = df['VALOR_BRUTO'].apply(
-        lambda x: f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-    )
-    
-    # Formatar SALDO para exibição
-    df['SALDO_FMT'] = df['SALDO'].apply(
-        lambda x: f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-    )
-    
-    # Selecionar e ordenar colunas
-    extrato = df[['DATA', 'MOVIMENTAÇÃO', 'VALOR', 'SALDO_FMT']]
-    extrato.columns = ['DATA', 'MOVIMENTAÇÃO', 'VALOR', 'SALDO']
-    
-    return extrato
+def analisar(db, metodo, *args):
+    """Executa um método de Analytics (ex: 'gerar_grafico_evolucao_intervalo') com cache"""
+    return _analisar_cache(db, db.versao_dados(), metodo, args)
 
+# Funções utilitárias
 def inicializar_session_state():
     """Inicializa variáveis de sessão"""
     if 'db' not in st.session_state:
         st.session_state.db = DatabaseManager()
+        st.session_state.db.init_db()
+        
+        if config.COTACOES_CSV.exists():
+            st.session_state.db.importar_cotacoes_csv(config.COTACOES_CSV)
     
     if 'tipo_transacao' not in st.session_state:
         st.session_state.tipo_transacao = 'receita'
 
 # Funções de renderização das páginas
-def render_dashboard(db, mes, ano):
+def render_dashboard(db, data_inicio, data_fim):
     """Renderiza a página do dashboard"""
     st.title("📊 Dashboard Financeiro")
+    st.caption(descrever_intervalo(data_inicio, data_fim))
     
-    transacoes = db.get_transacoes(mes, ano)
-    resumo = db.get_resumo(mes, ano)
+    transacoes = ler(db, 'get_transacoes', data_inicio=data_inicio, data_fim=data_fim, colunas=COLUNAS_EXTRATO)
+    resumo = ler(db, 'get_resumo', data_inicio=data_inicio, data_fim=data_fim)
     
     if not transacoes.empty:
         # Métricas principais
-        receitas = transacoes[transacoes['tipo'] == 'receita']['valor'].sum()
-        despesas = transacoes[transacoes['tipo'] == 'despesa']['valor'].sum()
+        receitas = transacoes[transacoes['tipo'] == 'receita']['valor_brl'].sum()
+        despesas = transacoes[transacoes['tipo'] == 'despesa']['valor_brl'].sum()
         saldo = receitas - despesas
         
         col1, col2, col3, col4 = st.columns(4)
@@ -272,6 +88,12 @@ def render_dashboard(db, mes, ano):
             margem = (saldo / receitas * 100) if receitas > 0 else 0
             st.metric("📈 Margem", f"{margem:.1f}%")
         
+        # Totais por moeda original, quando há transações fora de BRL
+        resumo_moedas = ler(db, 'get_resumo_moedas', data_inicio=data_inicio, data_fim=data_fim)
+        if (resumo_moedas['moeda'] != 'BRL').any():
+            st.subheader("💱 Totais por Moeda")
+            st.table(Analytics(db).gerar_tabela_moedas(resumo_moedas))
+        
         st.markdown("---")
         
         # Gráficos
@@ -307,11 +129,22 @@ def render_dashboard(db, mes, ano):
             )
             st.plotly_chart(fig_comparacao, use_container_width=True)
         
+        # Tendências pré-calculadas em metricas_mensais: uma leitura indexada dos
+        # últimos 12 meses, sem agregar o histórico a cada rerun
+        metricas = ler(db, 'get_metricas', data_fim=data_fim)
+        mes = f"{data_fim:%Y-%m}"
+        if not metricas.empty and (metricas['mes'] == mes).any():
+            st.subheader("📉 Tendências por Categoria")
+            st.caption(f"Despesas de {data_fim:%m/%Y} comparadas ao mês anterior e às médias dos 3 e 12 meses anteriores (em BRL)")
+            st.table(Analytics(db).gerar_tabela_tendencias(metricas, mes))
+            if (metricas['tipo'] == 'poupanca').any():
+                st.plotly_chart(Analytics(db).gerar_grafico_poupanca(metricas), use_container_width=True)
+        
         st.markdown("---")
         
         # EXTRATO COM SALDO ACUMULADO
         st.subheader("📋 Extrato com Saldo Acumulado")
-        extrato = gerar_extrato_com_saldo(transacoes)
+        extrato = Analytics(db).gerar_extrato_com_saldo(transacoes)
         
         if not extrato.empty:
             st.table(extrato)
@@ -322,7 +155,7 @@ def render_dashboard(db, mes, ano):
         st.subheader("💰 Top 5 Maiores Receitas")
         receitas_df = transacoes[transacoes['tipo'] == 'receita']
         if not receitas_df.empty:
-            top_receitas = receitas_df.nlargest(5, 'valor')
+            top_receitas = receitas_df.nlargest(5, 'valor_brl')
             for _, receita in top_receitas.iterrows():
                 col1, col2, col3 = st.columns([3, 2, 1])
                 with col1:
@@ -330,9 +163,9 @@ def render_dashboard(db, mes, ano):
                 with col2:
                     st.write(f"`{receita['categoria']}`")
                 with col3:
-                    st.success(formatar_moeda(receita['valor']))
+                    st.success(formatar_moeda(receita['valor'], receita['moeda']))
         else:
-            st.info("🎉 Nenhuma receita registrada este mês!")
+            st.info("🎉 Nenhuma receita registrada no período!")
         
         st.markdown("---")
 
@@ -340,7 +173,7 @@ def render_dashboard(db, mes, ano):
         st.subheader("💸 Top 5 Maiores Despesas")
         despesas_df = transacoes[transacoes['tipo'] == 'despesa']
         if not despesas_df.empty:
-            top_despesas = despesas_df.nlargest(5, 'valor')
+            top_despesas = despesas_df.nlargest(5, 'valor_brl')
             for _, despesa in top_despesas.iterrows():
                 col1, col2, col3 = st.columns([3, 2, 1])
                 with col1:
@@ -348,9 +181,9 @@ def render_dashboard(db, mes, ano):
                 with col2:
                     st.write(f"`{despesa['categoria']}`")
                 with col3:
-                    st.error(formatar_moeda(despesa['valor']))
+                    st.error(formatar_moeda(despesa['valor'], despesa['moeda']))
         else:
-            st.info("🎉 Nenhuma despesa registrada este mês!")
+            st.info("🎉 Nenhuma despesa registrada no período!")
             
     else:
         st.info("📊 Nenhuma transação encontrada para o período selecionado.")
@@ -358,62 +191,108 @@ def render_dashboard(db, mes, ano):
 def render_nova_transacao(db):
     """Renderiza a página de nova transação"""
     st.title("💸 Nova Transação")
+    fragmento_nova_transacao(db)
     
-    if 'current_tipo' not in st.session_state:
-        st.session_state.current_tipo = 'receita'
-    
-    new_tipo = st.radio(
+@st.fragment
+def fragmento_nova_transacao(db):
+    """Tipo + formulário: trocar o tipo ou salvar reexecuta só este trecho"""
+    tipo = st.radio(
         "Tipo de Transação", 
         ["receita", "despesa"], 
         horizontal=True,
-        index=0 if st.session_state.current_tipo == 'receita' else 1,
         key="tipo_selector"
     )
     
-    if new_tipo != st.session_state.current_tipo:
-        st.session_state.current_tipo = new_tipo
-        st.rerun()
+    categorias = ler(db, 'get_categorias', tipo=tipo)
     
-    categorias = db.get_categorias(st.session_state.current_tipo)
-    
-    with st.form("nova_transacao_form", clear_on_submit=True):
-        col1, col2 = st.columns(2)
+    # Sem st.form: cada campo reexecuta o fragmento ao ser confirmado (a
+    # descrição com Enter ou ao sair do campo), e aí a categoria é sugerida
+    col1, col2 = st.columns(2)
         
-        with col1:
-            descricao = st.text_input("Descrição*", placeholder="Ex: Salário mensal, Almoço...")
-            valor = st.number_input("Valor (R$)*", min_value=0.01, step=0.01, format="%.2f")
+    with col1:
+        descricao = st.text_input(
+            "Descrição*", placeholder="Ex: Salário mensal, Almoço...", key="nova_descricao",
+            help="Tecle Enter para sugerir a categoria pelo histórico"
+        )
+        st.number_input("Valor*", min_value=0.01, step=0.01, format="%.2f", key="novo_valor")
+        st.selectbox("Moeda", list(SIMBOLOS_MOEDA), key="nova_moeda")
         
-        with col2:
-            if categorias:
-                categoria = st.selectbox("Categoria*", categorias)
-            else:
-                st.warning("⚠️ Nenhuma categoria disponível")
-                categoria = st.text_input("Digite uma categoria*", placeholder="Ex: Alimentação, Transporte...")
+    with col2:
+        if categorias:
+            sugerida, confianca = (
+                db.get_categorizador().classificar(descricao, tipo) if descricao else (None, 0.0)
+            )
+            sugerida = sugerida if sugerida in categorias and confianca >= CONFIANCA_MINIMA else None
+            st.selectbox(
+                "Categoria*", categorias,
+                index=categorias.index(sugerida) if sugerida else 0,
+                key="nova_categoria"
+            )
+            if sugerida:
+                st.caption(f"🤖 Sugerida pelo histórico ({confianca:.0%} de confiança)")
+        else:
+            st.warning("⚠️ Nenhuma categoria disponível")
+            st.text_input("Digite uma categoria*", placeholder="Ex: Alimentação, Transporte...", key="nova_categoria")
             
-            data = st.date_input("Data", datetime.now())
-        
-        submitted = st.form_submit_button("💾 Salvar Transação")
-        
-        if submitted:
-            if descricao and valor > 0 and categoria:
-                try:
-                    db.add_transacao(descricao, valor, categoria, st.session_state.current_tipo, data)
-                    st.success("✅ Transação salva com sucesso!")
-                    st.session_state.current_tipo = 'receita'
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"❌ Erro ao salvar transação: {e}")
-            else:
-                st.error("❌ Preencha todos os campos obrigatórios!")
+        st.date_input("Data", datetime.now(), key="nova_data")
+        
+    st.button("💾 Salvar Transação", on_click=enviar_transacao, args=(db,))
+    
+    pendente = st.session_state.get('transacao_pendente')
+    if pendente:
+        descricao, valor, categoria, tipo, data, moeda = pendente
+        duplicadas = db.buscar_duplicadas(descricao, valor, tipo, data, moeda)
+        st.warning(f"⚠️ \"{descricao}\" ({formatar_moeda(valor, moeda)} em {data:%d/%m/%Y}) parece já estar cadastrada:")
+        st.dataframe(
+            duplicadas[['data', 'descricao', 'valor', 'moeda', 'categoria', 'exata']],
+            hide_index=True,
+            use_container_width=True
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button("💾 Salvar mesmo assim", on_click=salvar_transacao, args=(db, pendente))
+        with col2:
+            st.button("🗑️ Descartar", on_click=st.session_state.pop, args=('transacao_pendente',))
 
-def render_extrato(db, mes, ano):
+def enviar_transacao(db):
+    """Callback do botão Salvar: valida, confere duplicadas e grava"""
+    estado = st.session_state
+    transacao = (
+        estado.nova_descricao, estado.novo_valor, estado.nova_categoria,
+        estado.tipo_selector, estado.nova_data, estado.nova_moeda
+    )
+    descricao, valor, categoria, tipo, data, moeda = transacao
+    if not (descricao and valor > 0 and categoria):
+        st.toast("❌ Preencha todos os campos obrigatórios!")
+        return
+    
+    # Parecida com alguma já cadastrada: só grava depois de confirmar
+    if db.buscar_duplicadas(descricao, valor, tipo, data, moeda).empty:
+        salvar_transacao(db, transacao)
+    else:
+        estado.transacao_pendente = transacao
+
+def salvar_transacao(db, transacao):
+    """Grava a transação do formulário (ou a pendente, confirmada pelo usuário)"""
+    st.session_state.pop('transacao_pendente', None)
+    try:
+        db.add_transacao(*transacao)
+        # Campos voltam ao valor padrão no próximo rerun
+        for chave in ('nova_descricao', 'novo_valor', 'nova_categoria'):
+            st.session_state.pop(chave, None)
+        st.toast("✅ Transação salva com sucesso!")
+    except Exception as e:
+        st.toast(f"❌ Erro ao salvar transação: {e}")
+
+def render_extrato(db, data_inicio, data_fim):
     """Renderiza a página de extrato"""
     st.title("📋 Extrato Financeiro")
+    st.caption(descrever_intervalo(data_inicio, data_fim))
     
-    transacoes = db.get_transacoes(mes, ano)
+    transacoes = ler(db, 'get_transacoes', data_inicio=data_inicio, data_fim=data_fim, colunas=COLUNAS_EXTRATO)
     
     if not transacoes.empty:
-        extrato = gerar_extrato_com_saldo(transacoes)
+        extrato = Analytics(db).gerar_extrato_com_saldo(transacoes)
         
         st.subheader("📊 Extrato com Saldo Acumulado")
         st.table(extrato)
@@ -424,88 +303,105 @@ def render_extrato(db, mes, ano):
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            total_receitas = transacoes[transacoes['tipo'] == 'receita']['valor'].sum()
+            total_receitas = transacoes[transacoes['tipo'] == 'receita']['valor_brl'].sum()
             st.metric("💰 Total Receitas", formatar_moeda(total_receitas))
         
         with col2:
-            total_despesas = transacoes[transacoes['tipo'] == 'despesa']['valor'].sum()
+            total_despesas = transacoes[transacoes['tipo'] == 'despesa']['valor_brl'].sum()
             st.metric("💸 Total Despesas", formatar_moeda(total_despesas))
         
         with col3:
             saldo_final = total_receitas - total_despesas
             st.metric("⚖️ Saldo Final", formatar_moeda(saldo_final))
+        
+        resumo_moedas = ler(db, 'get_resumo_moedas', data_inicio=data_inicio, data_fim=data_fim)
+        if (resumo_moedas['moeda'] != 'BRL').any():
+            st.subheader("💱 Totais por Moeda")
+            st.table(Analytics(db).gerar_tabela_moedas(resumo_moedas))
                 
     else:
         st.info("📋 Nenhuma transação encontrada para o período selecionado.")
 
-def render_relatorios(db, mes, ano):
+def render_relatorios(db, data_inicio, data_fim, comparar_ano_anterior=False):
     """Renderiza a página de relatórios"""
     st.title("📈 Relatórios Avançados")
+    st.caption(descrever_intervalo(data_inicio, data_fim))
     
-    data_inicio = datetime(ano, mes, 1) - relativedelta(months=5)
-    
-    dados_mensais = []
-    for i in range(6):
-        data_ref = data_inicio + relativedelta(months=i)
-        transacoes_mes = db.get_transacoes(data_ref.month, data_ref.year)
-        
-        if not transacoes_mes.empty:
-            receitas = transacoes_mes[transacoes_mes['tipo'] == 'receita']['valor'].sum()
-            despesas = transacoes_mes[transacoes_mes['tipo'] == 'despesa']['valor'].sum()
-        else:
-            receitas = despesas = 0
-            
-        dados_mensais.append({
-            'mes_ano': data_ref.strftime('%Y-%m'),
-            'mes_nome': data_ref.strftime('%b/%Y'),
-            'receitas': receitas,
-            'despesas': despesas,
-            'saldo': receitas - despesas
-        })
-    
-    df_mensal = pd.DataFrame(dados_mensais)
+    # Pelo menos 6 meses de evolução, mesmo quando o período é um único mês
+    inicio_evolucao = min(data_inicio, data_fim.replace(day=1) - relativedelta(months=5))
+    fig_evolucao, df_mensal = analisar(db, 'gerar_grafico_evolucao_intervalo', inicio_evolucao, data_fim)
     
     if not df_mensal.empty:
-        fig_evolucao = go.Figure()
-        fig_evolucao.add_trace(go.Scatter(
-            x=df_mensal['mes_nome'],
-            y=df_mensal['receitas'],
-            name='Receitas',
-            line=dict(color='#2ecc71', width=3),
-            mode='lines+markers'
-        ))
-        fig_evolucao.add_trace(go.Scatter(
-            x=df_mensal['mes_nome'],
-            y=df_mensal['despesas'],
-            name='Despesas',
-            line=dict(color='#e74c3c', width=3),
-            mode='lines+markers'
-        ))
-        fig_evolucao.update_layout(
-            title="📈 Evolução Mensal - Últimos 6 Meses",
-            xaxis_title="Mês",
-            yaxis_title="Valor (R$)",
-            hovermode='x unified'
-        )
+        fig_evolucao.update_layout(title=f"📈 Evolução Mensal - {len(df_mensal)} Meses")
         st.plotly_chart(fig_evolucao, use_container_width=True)
     else:
         st.info("📈 Dados insuficientes para gerar relatórios.")
+    
+    # Saldo dia a dia; o gráfico tem tamanho fixo mesmo para todo o histórico
+    st.markdown("---")
+    inicio_saldo, fim_saldo = data_inicio, data_fim
+    if st.checkbox("Saldo diário de todo o histórico", key="saldo_todo_historico"):
+        inicio_saldo = datetime(ler(db, 'get_anos_disponiveis')[0], 1, 1).date()
+        fim_saldo = max(data_fim, datetime.now().date())
+    
+    fig_saldo, df_saldo = analisar(db, 'gerar_grafico_saldo_diario', inicio_saldo, fim_saldo)
+    st.plotly_chart(fig_saldo, use_container_width=True)
+    st.caption(
+        f"{len(df_saldo)} dias, de {inicio_saldo:%d/%m/%Y} a {fim_saldo:%d/%m/%Y} · "
+        f"saldo final {formatar_moeda(df_saldo['saldo'].iloc[-1] if not df_saldo.empty else 0)}"
+    )
+    
+    if comparar_ano_anterior:
+        st.markdown("---")
+        fig_comparativo, df_comp = analisar(db, 'gerar_grafico_comparativo_anual', data_inicio, data_fim)
+        st.plotly_chart(fig_comparativo, use_container_width=True)
+        
+        inicio_anterior, fim_anterior = intervalo_ano_anterior(data_inicio, data_fim)
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(
+                "💰 Receitas",
+                formatar_moeda(df_comp['receitas'].sum()),
+                delta=formatar_moeda(df_comp['receitas'].sum() - df_comp['receitas_anterior'].sum())
+            )
+        
+        with col2:
+            st.metric(
+                "💸 Despesas",
+                formatar_moeda(df_comp['despesas'].sum()),
+                delta=formatar_moeda(df_comp['despesas'].sum() - df_comp['despesas_anterior'].sum()),
+                delta_color="inverse"
+            )
+        
+        with col3:
+            st.metric(
+                "⚖️ Saldo",
+                formatar_moeda(df_comp['saldo'].sum()),
+                delta=formatar_moeda(df_comp['saldo'].sum() - df_comp['saldo_anterior'].sum())
+            )
+        
+        st.caption(f"Cada mês comparado com os mesmos dias do ano anterior ({descrever_intervalo(inicio_anterior, fim_anterior)})")
 
 def render_categorias(db):
     """Renderiza a página de categorias"""
     st.title("⚙️ Gerenciar Categorias")
+    fragmento_categorias(db)
     
+@st.fragment
+def fragmento_categorias(db):
+    """Listas + formulário: adicionar uma categoria reexecuta só este trecho"""
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📥 Categorias de Receita")
-        receitas_cat = db.get_categorias('receita')
+        receitas_cat = ler(db, 'get_categorias', tipo='receita')
         for cat in receitas_cat:
             st.write(f"• {cat}")
     
     with col2:
         st.subheader("📤 Categorias de Despesa")
-        despesas_cat = db.get_categorias('despesa')
+        despesas_cat = ler(db, 'get_categorias', tipo='despesa')
         for cat in despesas_cat:
             st.write(f"• {cat}")
     
@@ -516,66 +412,88 @@ def render_categorias(db):
         col1, col2 = st.columns(2)
         
         with col1:
-            nova_cat_nome = st.text_input("Nome da Categoria", placeholder="Ex: Viagem, Academia...")
+            st.text_input("Nome da Categoria", placeholder="Ex: Viagem, Academia...", key="nova_cat_nome")
         
         with col2:
-            nova_cat_tipo = st.selectbox("Tipo", ["receita", "despesa"])
-        
-        submitted = st.form_submit_button("Adicionar Categoria")
-        
-        if submitted and nova_cat_nome:
-            success = db.add_categoria(nova_cat_nome, nova_cat_tipo)
-            if success:
-                st.success("✅ Categoria adicionada com sucesso!")
-                st.rerun()
-            else:
-                st.error("❌ Esta categoria já existe!")
+            st.selectbox("Tipo", ["receita", "despesa"], key="nova_cat_tipo")
+        
+        # O callback grava antes do rerun, então a lista acima já sai atualizada
+        st.form_submit_button("Adicionar Categoria", on_click=adicionar_categoria, args=(db,))
+        
+def adicionar_categoria(db):
+    """Callback do formulário de nova categoria"""
+    nome = st.session_state.nova_cat_nome
+    if not nome:
+        return
+    if db.add_categoria(nome, st.session_state.nova_cat_tipo):
+        st.toast("✅ Categoria adicionada com sucesso!")
+    else:
+        st.toast("❌ Esta categoria já existe!")
 
 def render_editar_excluir(db):
     """Renderiza a página para editar e excluir transações"""
     st.title("✏️ Editar/Excluir Transações")
     
     st.subheader("Últimas Transações")
-    transacoes = db.get_transacoes()
+    fragmento_editar_excluir(db)
+
+@st.fragment
+def fragmento_editar_excluir(db):
+    """Lista editável: salvar ou excluir uma linha reexecuta só a lista"""
+    # Só as 15 mais recentes, já ordenadas pelo banco
+    transacoes = ler(db, 'get_transacoes', limite=15, colunas=('id',) + COLUNAS_EXTRATO)
     
     if not transacoes.empty:
-        # Ordenar por data (mais recentes primeiro)
-        transacoes['data'] = pd.to_datetime(transacoes['data'])
-        transacoes = transacoes.sort_values('data', ascending=False)
-        
-        for _, transacao in transacoes.head(15).iterrows():
-            with st.expander(f"{transacao['descricao']} - {formatar_moeda(transacao['valor'])}"):
+        for _, transacao in transacoes.iterrows():
+            with st.expander(f"{transacao['descricao']} - {formatar_moeda(transacao['valor'], transacao['moeda'])}"):
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     st.write(f"**Tipo:** {transacao['tipo']}")
                     st.write(f"**Categoria:** {transacao['categoria']}")
-                    st.write(f"**Data:** {pd.to_datetime(transacao['data']).strftime('%d/%m/%Y')}")
+                    st.write(f"**Data:** {transacao['data']:%d/%m/%Y}")
                 
                 with col2:
                     with st.form(key=f"edit_{transacao['id']}"):
-                        nova_descricao = st.text_input("Descrição", value=transacao['descricao'])
-                        novo_valor = st.number_input("Valor", value=float(transacao['valor']), format="%.2f")
+                        st.text_input("Descrição", value=transacao['descricao'], key=f"descricao_{transacao['id']}")
+                        st.number_input("Valor", value=float(transacao['valor']), format="%.2f", key=f"valor_{transacao['id']}")
                         
+                        # Callbacks gravam antes do rerun do fragmento, que já lista os dados novos
                         col_btn1, col_btn2 = st.columns(2)
                         with col_btn1:
-                            if st.form_submit_button("💾 Atualizar"):
-                                if db.atualizar_transacao(transacao['id'], nova_descricao, novo_valor, transacao['categoria'], transacao['data']):
-                                    st.success("✅ Transação atualizada!")
-                                    st.rerun()
-                                else:
-                                    st.error("❌ Erro ao atualizar")
+                            st.form_submit_button("💾 Atualizar", on_click=atualizar_transacao, args=(db, transacao))
                         
                         with col_btn2:
-                            if st.form_submit_button("🗑️ Excluir"):
-                                if db.excluir_transacao_db(transacao['id']):
-                                    st.error("🗑️ Transação excluída!")
-                                    st.rerun()
-                                else:
-                                    st.error("❌ Erro ao excluir")
+                            st.form_submit_button("🗑️ Excluir", on_click=excluir_transacao, args=(db, transacao['id']))
     else:
         st.info("Nenhuma transação encontrada.")
 
+def atualizar_transacao(db, transacao):
+    """Callback do botão Atualizar"""
+    resultado = db.atualizar_transacao(
+        transacao['id'],
+        st.session_state[f"descricao_{transacao['id']}"],
+        st.session_state[f"valor_{transacao['id']}"],
+        transacao['categoria'],
+        transacao['data'].strftime('%Y-%m-%d')
+    )
+    if resultado:
+        st.toast("✅ Transação atualizada!")
+    elif resultado is None:
+        st.toast("⚠️ Transação não encontrada (excluída em outra sessão?)")
+    else:
+        st.toast("❌ Erro ao atualizar")
+
+def excluir_transacao(db, transacao_id):
+    """Callback do botão Excluir"""
+    resultado = db.excluir_transacao_db(transacao_id)
+    if resultado:
+        st.toast("🗑️ Transação excluída!")
+    elif resultado is None:
+        st.toast("⚠️ Transação não encontrada (excluída em outra sessão?)")
+    else:
+        st.toast("❌ Erro ao excluir")
+
 # Inicializar aplicação
 def main():
     # Inicializar banco de dados
@@ -589,22 +507,52 @@ def main():
     hoje = datetime.now()
     mes_atual = hoje.month
     ano_atual = hoje.year
+    anos = ler(db, 'get_anos_disponiveis')
     
     with st.sidebar:
-        col1, col2 = st.columns(2)
-        with col1:
-            mes_selecionado = st.selectbox(
-                "Mês",
-                range(1, 13),
-                index=mes_atual-1,
-                format_func=lambda x: calendar.month_name[x]
-            )
-        with col2:
-            ano_selecionado = st.selectbox(
-                "Ano",
-                range(ano_atual-2, ano_atual+1),
-                index=2
+        periodo = st.selectbox("Período", PERIODOS)
+        
+        if periodo == "Mês":
+            col1, col2 = st.columns(2)
+            with col1:
+                mes_selecionado = st.selectbox(
+                    "Mês",
+                    range(1, 13),
+                    index=mes_atual-1,
+                    format_func=lambda x: calendar.month_name[x]
+                )
+            with col2:
+                ano_selecionado = st.selectbox("Ano", anos, index=len(anos)-1)
+            data_inicio, data_fim = calcular_intervalo(periodo, mes=mes_selecionado, ano=ano_selecionado)
+        elif periodo == "Trimestre":
+            col1, col2 = st.columns(2)
+            with col1:
+                trimestre = st.selectbox(
+                    "Trimestre",
+                    range(1, 5),
+                    index=(mes_atual-1) // 3,
+                    format_func=lambda x: f"{x}º tri"
+                )
+            with col2:
+                ano_selecionado = st.selectbox("Ano", anos, index=len(anos)-1)
+            data_inicio, data_fim = calcular_intervalo(periodo, ano=ano_selecionado, trimestre=trimestre)
+        elif periodo == "Ano":
+            ano_selecionado = st.selectbox("Ano", anos, index=len(anos)-1)
+            data_inicio, data_fim = calcular_intervalo(periodo, ano=ano_selecionado)
+        elif periodo == "Personalizado":
+            intervalo = st.date_input(
+                "Intervalo",
+                (hoje.date().replace(day=1), hoje.date()),
+                min_value=datetime(anos[0], 1, 1).date(),
+                format="DD/MM/YYYY"
             )
+            # Enquanto o usuário escolhe só a data inicial, o intervalo tem um elemento
+            data_inicio = intervalo[0]
+            data_fim = intervalo[1] if len(intervalo) > 1 else intervalo[0]
+        else:
+            data_inicio, data_fim = calcular_intervalo(periodo, hoje=hoje.date())
+        
+        comparar_ano_anterior = st.checkbox("Comparar com ano anterior")
     
     # Menu principal
     menu = st.sidebar.radio(
@@ -614,13 +562,13 @@ def main():
     
     # Páginas
     if menu == "📊 Dashboard":
-        render_dashboard(db, mes_selecionado, ano_selecionado)
+        render_dashboard(db, data_inicio, data_fim)
     elif menu == "💸 Nova Transação":
         render_nova_transacao(db)
     elif menu == "📋 Extrato":
-        render_extrato(db, mes_selecionado, ano_selecionado)
+        render_extrato(db, data_inicio, data_fim)
     elif menu == "📈 Relatórios":
-        render_relatorios(db, mes_selecionado, ano_selecionado)
+        render_relatorios(db, data_inicio, data_fim, comparar_ano_anterior)
     elif menu == "⚙️ Categorias":
         render_categorias(db)
     elif menu == "✏️ Editar/Excluir":
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Snapshots online com um escritor concorrente: duração, tamanho e latência dos INSERTs
+
+Faz um snapshot completo, grava mais transações, faz um incremental, restaura
+e confere que o banco restaurado tem as mesmas linhas do momento do snapshot.
+
+Uso: python benchmarks/bench_backup.py [linhas]
+"""
+
+import statistics
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_cambio import popular_banco
+
+from src.backup import criar_snapshot, restaurar
+from src.database import DatabaseManager
+
+class Escritor(threading.Thread):
+    """Insere uma transação a cada ~2ms e guarda a latência de cada commit"""
+    
+    def __init__(self, db_path):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.latencias = []
+        self.parar = threading.Event()
+    
+    def run(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        while not self.parar.is_set():
+            inicio = time.perf_counter()
+            conn.execute(
+                "INSERT INTO transacoes (descricao, valor, categoria, tipo, data) "
+                "VALUES ('Escritor', 1, 'Outros', 'despesa', '2024-01-01')"
+            )
+            conn.commit()
+            self.latencias.append(time.perf_counter() - inicio)
+            time.sleep(0.002)
+        conn.close()
+
+def com_escritor(db_path, funcao):
+    escritor = Escritor(db_path)
+    escritor.start()
+    time.sleep(0.2)
+    antes = len(escritor.latencias)
+    resultado = funcao()
+    durante = escritor.latencias[antes:]
+    escritor.parar.set()
+    escritor.join()
+    print(f"   INSERT concorrente: {len(durante)} commits, p50 {statistics.median(durante) * 1000:.2f} ms, "
+          f"máx {max(durante) * 1000:.2f} ms (antes: máx {max(escritor.latencias[:antes]) * 1000:.2f} ms)")
+    return resultado
+
+def contar(db_path, descricao=None):
+    with sqlite3.connect(str(db_path)) as conn:
+        if descricao:
+            return conn.execute("SELECT COUNT(*) FROM transacoes WHERE descricao = ?", (descricao,)).fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM transacoes").fetchone()[0]
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / 'bench.db')
+        db.init_db()
+        popular_banco(db, linhas)
+        pasta = Path(tmp) / 'backups'
+        print(f"📦 {linhas:,} transações, {db.db_path.stat().st_size / 1024 ** 2:.0f} MB")
+        
+        for tipo, incremental in (("completo", False), ("incremental", True)):
+            db.add_transacoes([("Nova", 10.0, "Outros", "despesa", "2024-02-01", "BRL")] * 1000)
+            manifesto = com_escritor(db.db_path, lambda: criar_snapshot(db.db_path, pasta, incremental=incremental))
+            print(f"📸 {tipo}: {manifesto['duracao_s']:.2f}s, {manifesto['paginas_gravadas']:,} de "
+                  f"{manifesto['paginas']:,} páginas, {manifesto['bytes'] / 1024 ** 2:.1f} MB")
+        
+        # O incremental deve ter as linhas gravadas até o início da cópia, não as posteriores
+        db.add_transacoes([("Depois", 10.0, "Outros", "despesa", "2024-03-01", "BRL")] * 10)
+        antes_restaurar = contar(db.db_path)
+        _, segundos, _ = restaurar(db.db_path, pasta)
+        depois_restaurar = contar(db.db_path)
+        print(f"♻️  restauração: {segundos:.2f}s, {antes_restaurar:,} → {depois_restaurar:,} linhas")
+        assert contar(db.db_path, "Nova") == 2000 and contar(db.db_path, "Depois") == 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark da conversão de moedas para BRL
+
+Uso: python benchmarks/bench_cambio.py [linhas]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import DatabaseManager
+
+def popular_banco(db, linhas, dias=3650):
+    """Gera transações em BRL/USD/EUR e cotações diárias (só dias úteis)"""
+    inicio = date(2015, 1, 1)
+    
+    transacoes = (
+        (
+            f"Transação {i}",
+            round(random.uniform(1, 500), 2),
+            random.choice(['Alimentação', 'Transporte', 'Lazer', 'Salário']),
+            random.choice(['receita', 'despesa']),
+            (inicio + timedelta(days=random.randrange(dias))).isoformat(),
+            random.choices(['BRL', 'USD', 'EUR'], weights=[6, 2, 2])[0]
+        )
+        for i in range(linhas)
+    )
+    
+    cotacoes = []
+    for moeda, base in (('USD', 5.0), ('EUR', 5.5)):
+        for i in range(dias):
+            dia = inicio + timedelta(days=i)
+            if dia.weekday() < 5:
+                cotacoes.append((moeda, dia.isoformat(), base + random.uniform(-0.5, 0.5)))
+    
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO transacoes (descricao, valor, categoria, tipo, data, moeda) VALUES (?, ?, ?, ?, ?, ?)",
+            transacoes
+        )
+        conn.executemany("INSERT INTO cotacoes (moeda, data, taxa) VALUES (?, ?, ?)", cotacoes)
+        conn.commit()
+    
+    return inicio, inicio + timedelta(days=dias - 1)
+
+def medir(descricao, funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    print(f"{descricao:<40} {time.perf_counter() - inicio:8.3f}s")
+    return resultado
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / 'bench.db')
+        db.init_db()
+        data_inicio, data_fim = popular_banco(db, linhas)
+        print(f"📦 {linhas:,} transações de {data_inicio} a {data_fim}")
+        
+        # Referência: mesma agregação diária, sem a conversão
+        medir("agregação diária sem conversão", lambda: db.fetch_all(
+            "SELECT COUNT(*) FROM (SELECT data, tipo, categoria, moeda, SUM(valor) FROM transacoes "
+            "WHERE data BETWEEN ? AND ? GROUP BY data, tipo, categoria, moeda)",
+            (data_inicio.isoformat(), data_fim.isoformat())
+        ))
+        medir("get_resumo_moedas (original + BRL)", lambda: db.get_resumo_moedas(data_inicio=data_inicio, data_fim=data_fim))
+        medir("get_resumo (categorias em BRL)", lambda: db.get_resumo(data_inicio=data_inicio, data_fim=data_fim))
+        medir("get_totais_mensais (120 meses em BRL)", lambda: db.get_totais_mensais(data_inicio, data_fim))
+
+        # Linhas individuais: a leitura pura contra get_transacoes (merge_asof das cotações)
+        medir("SELECT das transações sem conversão", lambda: db.fetch_all(
+            "SELECT * FROM transacoes WHERE data BETWEEN ? AND ? ORDER BY data DESC, id DESC",
+            (data_inicio.isoformat(), data_fim.isoformat())
+        ))
+        medir("get_transacoes (linhas em BRL)", lambda: db.get_transacoes(data_inicio=data_inicio, data_fim=data_fim))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
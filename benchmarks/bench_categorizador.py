@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Treino, latência e acerto da categorização automática
+
+Gera um histórico com descrições realistas (estabelecimento + ruído de
+extrato), mede o treino do índice, o tempo por classificação, o acerto em
+descrições que não estavam no histórico e a importação sem categoria.
+
+Uso: python benchmarks/bench_categorizador.py [linhas]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import DatabaseManager
+
+ESTABELECIMENTOS = {
+    'Alimentação': ['Supermercado Extra', 'Padaria Pão Quente', 'iFood', 'Restaurante Sabor', 'Açougue Central'],
+    'Transporte': ['Uber Trip', '99 Pop', 'Posto Shell', 'Estacionamento Centro', 'Metrô Recarga'],
+    'Lazer': ['Netflix', 'Cinema Cinemark', 'Spotify', 'Ingresso Show', 'Steam Games'],
+    'Saúde': ['Drogaria São Paulo', 'Farmácia Pague Menos', 'Laboratório Fleury', 'Consulta Médica'],
+    'Moradia': ['Aluguel Apartamento', 'Conta de Luz Enel', 'Condomínio Edifício', 'Internet Vivo']
+}
+RUIDO = ['PAG*', 'COMPRA CARTAO', 'DEB AUT', '', '', '']
+
+def gerar(linhas, inicio=date(2020, 1, 1)):
+    transacoes = []
+    for _ in range(linhas):
+        categoria = random.choice(list(ESTABELECIMENTOS))
+        descricao = f"{random.choice(RUIDO)} {random.choice(ESTABELECIMENTOS[categoria])} {random.randrange(10000)}"
+        data = (inicio + timedelta(days=random.randrange(1800))).isoformat()
+        transacoes.append((descricao.strip(), round(random.uniform(1, 500), 2), categoria, 'despesa', data, 'BRL'))
+    return transacoes
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    random.seed(42)
+    historico = gerar(linhas)
+    # Validação: mesmas lojas com outras grafias (caixa, acentos, sufixos)
+    validacao = [
+        (descricao.upper().replace('Ç', 'C').replace('Ã', 'A') + ' LTDA', categoria)
+        for descricao, _, categoria, *_ in gerar(5000)
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / 'categorizador.db')
+        db.init_db()
+        
+        inicio = time.perf_counter()
+        db.add_transacoes(historico)
+        print(f"📦 importar {linhas:,} linhas com categoria:  {time.perf_counter() - inicio:6.2f}s")
+        
+        inicio = time.perf_counter()
+        with db.get_connection() as conn:
+            db._treinar_indice(conn.cursor())
+            conn.commit()
+        db._categorizador = None
+        categorizador = db.get_categorizador()
+        print(f"🧠 treinar o índice do zero e carregar:      {time.perf_counter() - inicio:6.2f}s  "
+              f"({len(categorizador.indice):,} termos)")
+        
+        inicio = time.perf_counter()
+        acertos = sum(categorizador.classificar(descricao, 'despesa')[0] == categoria for descricao, categoria in validacao)
+        segundos = time.perf_counter() - inicio
+        print(f"🎯 acerto em {len(validacao):,} descrições novas:        {acertos / len(validacao):6.1%}  "
+              f"({segundos / len(validacao) * 1e6:.0f} µs por classificação)")
+        
+        sem_categoria = [(descricao, valor, None, tipo, data, moeda) for descricao, valor, _, tipo, data, moeda in gerar(50_000)]
+        inicio = time.perf_counter()
+        db.add_transacoes(sem_categoria)
+        segundos = time.perf_counter() - inicio
+        outros = db.fetch_all("SELECT COUNT(*) AS n FROM transacoes WHERE categoria = 'Outros'")['n'][0]
+        print(f"📥 importar {len(sem_categoria):,} linhas sem categoria:  {segundos:6.2f}s  "
+              f"({len(sem_categoria) / segundos:,.0f} linhas/s, {outros:,} em 'Outros')")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Custo da detecção de duplicadas em importações grandes (add_transacoes)
+
+Compara a importação com e sem ignorar_duplicadas e reimporta um extrato
+sobreposto para conferir que nada é gravado duas vezes.
+
+Uso: python benchmarks/bench_duplicadas.py [linhas]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import DatabaseManager
+
+def gerar_extrato(linhas, inicio):
+    return [
+        (
+            f"Compra {random.randrange(50000)}",
+            round(random.uniform(1, 500), 2),
+            random.choice(['Alimentação', 'Transporte', 'Lazer']),
+            'despesa',
+            (inicio + timedelta(days=random.randrange(1800))).isoformat(),
+            'BRL'
+        )
+        for _ in range(linhas)
+    ]
+
+def importar(pasta, nome, lotes, ignorar_duplicadas):
+    db = DatabaseManager(Path(pasta) / f"{nome}.db")
+    db.init_db()
+    inicio = time.perf_counter()
+    gravadas = [db.add_transacoes(lote, ignorar_duplicadas=ignorar_duplicadas) for lote in lotes]
+    return gravadas, time.perf_counter() - inicio
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    random.seed(42)
+    extrato = gerar_extrato(linhas, date(2020, 1, 1))
+    # Segundo extrato: metade final do primeiro + linhas novas
+    sobreposto = extrato[linhas // 2:] + gerar_extrato(linhas // 2, date(2020, 1, 1))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"📦 extrato de {linhas:,} linhas + extrato sobreposto de {len(sobreposto):,} (metade repetida)")
+        for ignorar in (False, True):
+            gravadas, segundos = importar(tmp, f"dedup-{ignorar}", [extrato, sobreposto], ignorar)
+            print(f"{'com' if ignorar else 'sem'} detecção: {segundos:6.2f}s  "
+                  f"({2 * linhas / segundos:,.0f} linhas/s)  gravadas {gravadas[0]:,} + {gravadas[1]:,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Memória do DataFrame de get_transacoes: tipos padrão x tipos compactos
+
+Uso: python benchmarks/bench_memoria.py [linhas]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_cambio import popular_banco
+
+from src.analytics import COLUNAS_EXTRATO
+from src.database import SQL_TAXA_BRL, DatabaseManager
+
+def medir(descricao, funcao):
+    inicio = time.perf_counter()
+    df = funcao()
+    duracao = time.perf_counter() - inicio
+    memoria = df.memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"{descricao:<45} {memoria:>9.1f} MB {duracao:>8.2f}s")
+    return memoria
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / 'bench.db')
+        db.init_db()
+        popular_banco(db, linhas)
+        print(f"📦 {linhas:,} transações")
+        
+        # Referência: a leitura antiga (SELECT * com os tipos padrão do pandas)
+        padrao = medir("SELECT * com tipos padrão", lambda: db.fetch_all(
+            f"SELECT t.*, t.valor * {SQL_TAXA_BRL.format(alias='t')} AS valor_brl "
+            "FROM transacoes t ORDER BY t.data DESC, t.id DESC"
+        ))
+        compacto = medir("get_transacoes() compacto", db.get_transacoes)
+        extrato = medir("get_transacoes(colunas=COLUNAS_EXTRATO)", lambda: db.get_transacoes(colunas=COLUNAS_EXTRATO))
+        
+        print(f"📉 {compacto / padrao:.0%} do original com todas as colunas, "
+              f"{extrato / padrao:.0%} com as colunas das páginas")
+
+if __name__ == "__main__":
+    main()
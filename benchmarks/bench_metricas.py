@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Custo das métricas pré-calculadas do dashboard (tabela metricas_mensais)
+
+Mede a reconstrução completa, o custo extra de cada gravação (que atualiza
+só os meses afetados) e compara a leitura das tendências dos últimos 12
+meses com o que o dashboard teria de agregar a cada rerun sem a tabela.
+
+Uso: python benchmarks/bench_metricas.py [linhas]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_duplicadas import gerar_extrato
+
+from src.database import DatabaseManager
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    random.seed(42)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / 'metricas.db')
+        db.init_db()
+        db.add_transacoes(gerar_extrato(linhas, date(2020, 1, 1)))
+        db.add_transacoes([("Salário", 20000, "Salário", "receita", f"{ano}-{mes:02d}-05", "BRL")
+                           for ano in range(2020, 2025) for mes in range(1, 13)])
+        print(f"📦 {linhas:,} transações em {db.fetch_all('SELECT COUNT(*) AS n FROM metricas_mensais')['n'][0]:,} métricas")
+        
+        def reconstruir():
+            with db.get_connection() as conn:
+                db._reconstruir_metricas(conn)
+                conn.commit()
+        print(f"🔁 reconstruir tudo:                          {medir(reconstruir, 1):8.1f} ms")
+        
+        def atualizar_mes():
+            with db.get_connection() as conn:
+                db._atualizar_metricas(conn, ['2022-06'])
+                conn.commit()
+        print(f"✏️  atualizar as métricas de um mês:           {medir(atualizar_mes, 20):8.1f} ms")
+        print(f"➕ add_transacao (com métricas):              "
+              f"{medir(lambda: db.add_transacao('Café', 7.5, 'Alimentação', 'despesa', '2022-06-15'), 20):8.1f} ms")
+        
+        data_fim = date(2024, 12, 31)
+        print(f"📖 get_metricas (12 meses):                   {medir(lambda: db.get_metricas(data_fim), 50):8.2f} ms")
+        # Sem a tabela: totais por categoria de 24 meses (12 + 12 de médias) a cada rerun
+        print(f"🐢 get_resumo de 24 meses (agregação direta): "
+              f"{medir(lambda: db.get_resumo(data_inicio=date(2023, 1, 1), data_fim=data_fim), 50):8.2f} ms")
+        print(f"   get_resumo do mês (referência):           "
+              f"{medir(lambda: db.get_resumo(data_inicio=date(2024, 12, 1), data_fim=data_fim), 50):8.2f} ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Conta as consultas SQL executadas em cada interação da interface (AppTest)
+
+Copia app.py, config.py e src/ para uma pasta temporária com um banco de
+exemplo, simula interações comuns e mostra quantas instruções SQL cada
+rerun executou.
+
+Uso: python benchmarks/bench_reruns.py [transacoes]
+"""
+
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+RAIZ = Path(__file__).parent.parent
+
+# Conta instruções SQL de todas as conexões abertas pelo app
+_connect = sqlite3.connect
+consultas = []
+
+def _connect_contando(*args, **kwargs):
+    conn = _connect(*args, **kwargs)
+    conn.set_trace_callback(
+        lambda sql: consultas.append(sql)
+        if sql.lstrip().upper().startswith(('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE'))
+        else None
+    )
+    return conn
+
+sqlite3.connect = _connect_contando
+
+def preparar_app(pasta, transacoes):
+    """Copia o app para `pasta` e cria um banco de exemplo nela"""
+    for arquivo in ('app.py', 'config.py'):
+        shutil.copy(RAIZ / arquivo, pasta / arquivo)
+    shutil.copytree(RAIZ / 'src', pasta / 'src', ignore=shutil.ignore_patterns('__pycache__'))
+    
+    sys.path.insert(0, str(pasta))
+    from src.database import DatabaseManager
+    
+    db = DatabaseManager(pasta / 'financas.db')
+    db.init_db()
+    hoje = date.today()
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO transacoes (descricao, valor, categoria, tipo, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    f"Transação {i}",
+                    round(random.uniform(1, 500), 2),
+                    random.choice(['Alimentação', 'Transporte', 'Lazer', 'Salário']),
+                    random.choice(['receita', 'despesa']),
+                    (hoje - timedelta(days=random.randrange(730))).isoformat()
+                )
+                for i in range(transacoes)
+            ]
+        )
+        conn.commit()
+    # Preenche uuid, hashes de sincronização e índice de categorias das linhas inseridas acima
+    db.init_db()
+
+def medir(descricao, interacao, resultados):
+    consultas.clear()
+    inicio = time.perf_counter()
+    at = interacao()
+    duracao = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(f"{descricao}: {at.exception[0].value}")
+    resultados.append((descricao, len(consultas), duracao))
+    return at
+
+def main():
+    transacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp)
+        preparar_app(pasta, transacoes)
+        
+        at = AppTest.from_file(str(pasta / 'app.py'), default_timeout=60)
+        resultados = []
+        
+        medir("Abrir o dashboard", at.run, resultados)
+        medir("Rerun sem mudar filtros", at.run, resultados)
+        medir("Marcar 'Comparar com ano anterior'", lambda: at.sidebar.checkbox[0].check().run(), resultados)
+        medir("Ir para Nova Transação", lambda: at.sidebar.radio[0].set_value("💸 Nova Transação").run(), resultados)
+        medir("Trocar tipo para despesa", lambda: at.radio(key="tipo_selector").set_value("despesa").run(), resultados)
+        
+        at.text_input[0].input("Almoço")
+        at.number_input[0].set_value(42.0)
+        medir("Salvar transação", lambda: at.button[0].click().run(), resultados)
+        
+        medir("Ir para Editar/Excluir", lambda: at.sidebar.radio[0].set_value("✏️ Editar/Excluir").run(), resultados)
+        at.text_input[0].input("Almoço editado")
+        medir("Atualizar uma transação", lambda: at.button[0].click().run(), resultados)
+        medir("Voltar ao dashboard", lambda: at.sidebar.radio[0].set_value("📊 Dashboard").run(), resultados)
+        
+        print(f"📦 {transacoes} transações")
+        print(f"{'Interação':<40} {'SQL':>5} {'Tempo':>8}")
+        for descricao, total, duracao in resultados:
+            print(f"{descricao:<40} {total:>5} {duracao:>7.2f}s")
+        print(f"{'Total':<40} {sum(r[1] for r in resultados):>5} {sum(r[2] for r in resultados):>7.2f}s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark do gráfico de saldo diário: 1 mês x 1 ano x 10 anos
+
+Mostra o tempo de consulta + LTTB e o tamanho do JSON que vai ao navegador.
+
+Uso: python benchmarks/bench_saldo_diario.py [linhas]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_cambio import popular_banco
+from dateutil.relativedelta import relativedelta
+
+from src.analytics import Analytics
+from src.database import DatabaseManager
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    random.seed(42)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / 'bench.db')
+        db.init_db()
+        _, data_fim = popular_banco(db, linhas)
+        analytics = Analytics(db)
+        print(f"📦 {linhas:,} transações")
+        print(f"{'Intervalo':<12} {'Dias':>6} {'Pontos':>7} {'Consulta+LTTB':>14} {'JSON':>10}")
+        
+        for rotulo, anos, meses in (("1 mês", 0, 1), ("1 ano", 1, 0), ("10 anos", 10, 0)):
+            data_inicio = data_fim - relativedelta(years=anos, months=meses) + relativedelta(days=1)
+            inicio = time.perf_counter()
+            fig, df_diario = analytics.gerar_grafico_saldo_diario(data_inicio, data_fim)
+            duracao = time.perf_counter() - inicio
+            pontos = len(fig.data[0].x)
+            tamanho = len(fig.to_json())
+            print(f"{rotulo:<12} {len(df_diario):>6} {pontos:>7} {duracao:>13.3f}s {tamanho / 1024:>8.1f}KB")
+
+if __name__ == "__main__":
+    main()
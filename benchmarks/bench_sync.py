@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Sincronização incremental entre dois arquivos locais (python run.py sync)
+
+Cria dois bancos, faz a sincronização inicial e mede quantos bytes cada
+sincronização seguinte troca: uma transação nova, edições e exclusões dos
+dois lados e um conflito (a mesma transação editada nos dois). No fim confere
+que as duas cópias têm exatamente as mesmas transações.
+
+Uso: python benchmarks/bench_sync.py [linhas]
+"""
+
+import random
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_duplicadas import gerar_extrato
+
+from src.database import COLUNAS_SYNC, DatabaseManager
+from src.sincronizacao import ParLocal, sincronizar
+
+def rodada(descricao, notebook, servidor):
+    resumo = sincronizar(notebook, ParLocal(servidor))
+    trafego = resumo['bytes_enviados'] + resumo['bytes_recebidos']
+    print(f"{descricao:<38} {resumo['prefixos']:>8} {trafego / 1024:>12,.1f} {resumo['segundos']:>8.2f}s  "
+          f"{'✅' if resumo['sincronizado'] else '❌'}")
+    return resumo
+
+def ids_aleatorios(db, quantidade):
+    return db.fetch_all("SELECT id FROM transacoes ORDER BY random() LIMIT ?", (quantidade,))['id'].tolist()
+
+def editar(db, transacao_id, descricao):
+    linha = db.fetch_all("SELECT valor, categoria, data FROM transacoes WHERE id = ?", (int(transacao_id),)).iloc[0]
+    db.atualizar_transacao(transacao_id, descricao, linha['valor'] + 1, linha['categoria'], linha['data'])
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    random.seed(42)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        notebook = DatabaseManager(Path(tmp) / 'notebook.db')
+        servidor = DatabaseManager(Path(tmp) / 'servidor.db')
+        notebook.init_db()
+        servidor.init_db()
+        notebook.add_transacoes(gerar_extrato(linhas, date(2020, 1, 1)))
+        
+        print(f"📦 {linhas:,} transações ({notebook.db_path.stat().st_size / 1024 ** 2:.1f} MB no notebook)")
+        print(f"{'Sincronização':<38} {'prefixos':>8} {'KB trocados':>12} {'tempo':>9}")
+        rodada("inicial (servidor vazio)", notebook, servidor)
+        rodada("sem mudanças", notebook, servidor)
+        
+        notebook.add_transacao("Café", 7.5, "Alimentação", "despesa", "2023-06-15")
+        rodada("1 transação nova no notebook", notebook, servidor)
+        
+        for transacao_id in ids_aleatorios(notebook, 10):
+            editar(notebook, transacao_id, "Editada no notebook")
+        for transacao_id in ids_aleatorios(servidor, 5):
+            servidor.excluir_transacao_db(transacao_id)
+        rodada("10 edições + 5 exclusões", notebook, servidor)
+        
+        # Conflito: o servidor edita depois, então a versão dele vence nos dois
+        uuid = notebook.fetch_all("SELECT uuid FROM transacoes ORDER BY random() LIMIT 1")['uuid'][0]
+        editar(notebook, notebook.fetch_all("SELECT id FROM transacoes WHERE uuid = ?", (uuid,))['id'][0], "Notebook")
+        editar(servidor, servidor.fetch_all("SELECT id FROM transacoes WHERE uuid = ?", (uuid,))['id'][0], "Servidor")
+        rodada("mesma transação editada nos dois", notebook, servidor)
+        
+        consulta = f"SELECT {', '.join(COLUNAS_SYNC)} FROM transacoes ORDER BY uuid"
+        iguais = notebook.fetch_all(consulta).equals(servidor.fetch_all(consulta))
+        vencedora = notebook.fetch_all("SELECT descricao FROM transacoes WHERE uuid = ?", (uuid,))['descricao'][0]
+        print(f"\n{'✅' if iguais else '❌'} cópias idênticas  |  conflito resolvido para '{vencedora}'")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Teste de carga da API de ingestão (POST /transacoes/lote)
+
+Sem --url, sobe a API (python run.py api) num banco temporário e mede contra ela.
+
+Uso: python benchmarks/carga_api.py [--requisicoes 400] [--lote 1000] [--concorrencia 8]
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+RAIZ = Path(__file__).parent.parent
+
+def gerar_lote(tamanho):
+    inicio = date(2020, 1, 1)
+    return json.dumps({'transacoes': [
+        {
+            'descricao': f"Compra {random.randrange(100000)}",
+            'valor': round(random.uniform(1, 500), 2),
+            'categoria': random.choice(['Alimentação', 'Transporte', 'Lazer']),
+            'tipo': 'despesa',
+            'data': (inicio + timedelta(days=random.randrange(1800))).isoformat()
+        }
+        for _ in range(tamanho)
+    ]}).encode('utf-8')
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def aguardar_api(host, porta, timeout=30):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            conn = http.client.HTTPConnection(host, porta, timeout=1)
+            conn.request('GET', '/saude')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("API não respondeu a tempo")
+
+def consultar_saude(host, porta):
+    conn = http.client.HTTPConnection(host, porta)
+    conn.request('GET', '/saude')
+    return json.loads(conn.getresponse().read())
+
+def cliente(host, porta, corpos, latencias, erros):
+    """Envia os lotes por uma conexão keep-alive e registra a latência de cada um"""
+    conn = http.client.HTTPConnection(host, porta, timeout=60)
+    for corpo in corpos:
+        inicio = time.perf_counter()
+        conn.request('POST', '/transacoes/lote', corpo, {'Content-Type': 'application/json'})
+        resposta = conn.getresponse()
+        resposta.read()
+        latencias.append(time.perf_counter() - inicio)
+        if resposta.status != 201:
+            erros.append(resposta.status)
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="API já em execução (ex: http://127.0.0.1:8765)")
+    parser.add_argument('--requisicoes', type=int, default=400)
+    parser.add_argument('--lote', type=int, default=1000)
+    parser.add_argument('--concorrencia', type=int, default=8)
+    args = parser.parse_args()
+    
+    processo = None
+    tmp = tempfile.TemporaryDirectory()
+    if args.url:
+        url = urlsplit(args.url)
+        host, porta = url.hostname, url.port
+    else:
+        host, porta = '127.0.0.1', porta_livre()
+        processo = subprocess.Popen(
+            [sys.executable, str(RAIZ / 'run.py'), 'api', '--porta', str(porta),
+             '--db', str(Path(tmp.name) / 'carga.db')],
+            cwd=RAIZ, stdout=subprocess.DEVNULL
+        )
+    
+    try:
+        aguardar_api(host, porta)
+        commits_antes = consultar_saude(host, porta)['commits']
+        
+        # Corpos gerados antes da medição para não medir o cliente
+        corpos = [gerar_lote(args.lote) for _ in range(args.requisicoes)]
+        latencias, erros = [], []
+        threads = [
+            threading.Thread(target=cliente, args=(host, porta, corpos[i::args.concorrencia], latencias, erros))
+            for i in range(args.concorrencia)
+        ]
+        
+        inicio = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+        
+        commits = consultar_saude(host, porta)['commits'] - commits_antes
+        total = args.requisicoes * args.lote
+        print(f"📦 {args.requisicoes} requisições x {args.lote} linhas, {args.concorrencia} clientes")
+        print(f"⏱️  {duracao:.2f}s  |  {total / duracao:,.0f} inserções/s  |  {args.requisicoes / duracao:,.1f} req/s")
+        print(f"📈 latência p50 {statistics.median(latencias) * 1000:.1f} ms  "
+              f"p95 {percentil(latencias, 95) * 1000:.1f} ms  p99 {percentil(latencias, 99) * 1000:.1f} ms")
+        print(f"🔗 {commits} commits para {args.requisicoes} requisições (agrupamento de escrita)")
+        if erros:
+            print(f"❌ {len(erros)} requisições com erro: {sorted(set(erros))}")
+    finally:
+        if processo:
+            processo.terminate()
+            processo.wait()
+        tmp.cleanup()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Teste de carga com sessões simultâneas do app
+
+Cada sessão repete, por --duracao segundos, uma mistura de operações
+(dashboard, extrato, inserir, editar) sorteadas com os pesos de --mix, sobre
+uma cópia do app com um banco de exemplo. Roda um nível de concorrência por
+valor de --sessoes e mostra vazão, percentis de latência, erros de trava do
+SQLite e as instruções SQL que mais consumiram tempo.
+
+Modos:
+  banco  cada sessão chama o DatabaseManager como as páginas do app, sem cache
+         (em threads, ou em processos com --processos)
+  app    cada sessão é um AppTest do Streamlit rodando app.py num processo
+         próprio (o cache de leituras fica por processo, não compartilhado)
+
+Com --salvar o resultado vai para um JSON; com --comparar, os níveis são
+comparados com um resultado salvo e o script sai com erro se a vazão cair ou
+o p95 subir mais que --tolerancia.
+
+Uso: python benchmarks/carga_sessoes.py [--modo banco] [--sessoes 1,2,4,8] [--duracao 10]
+       [--mix dashboard=50,extrato=25,inserir=20,editar=5] [--linhas 100000]
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_cambio import popular_banco
+from carga_api import percentil
+
+from src.analytics import COLUNAS_EXTRATO, Analytics
+from src.database import DatabaseManager
+
+RAIZ = Path(__file__).parent.parent
+OPERACOES = ('dashboard', 'extrato', 'inserir', 'editar')
+MIX_PADRAO = 'dashboard=50,extrato=25,inserir=20,editar=5'
+CATEGORIAS = ['Alimentação', 'Transporte', 'Lazer', 'Salário']
+
+# Medição por instrução SQL: todas as conexões do processo passam a usar
+# ConexaoMedida, inclusive as abertas pelo app dentro do AppTest
+class Medidor:
+    """Chamadas, tempo e erros de trava acumulados por instrução SQL"""
+    
+    def __init__(self):
+        self.instrucoes = defaultdict(lambda: [0, 0.0, 0])
+        self._trava = threading.Lock()
+    
+    def registrar(self, sql, segundos, chamada=True, travou=False):
+        with self._trava:
+            estatistica = self.instrucoes[sql]
+            estatistica[0] += chamada
+            estatistica[1] += segundos
+            estatistica[2] += travou
+    
+    def coletar(self):
+        """Devolve o acumulado ({sql: [chamadas, segundos, travas]}) e zera"""
+        with self._trava:
+            dados = {sql: list(valores) for sql, valores in self.instrucoes.items()}
+            self.instrucoes.clear()
+        return dados
+
+medidor = Medidor()
+
+def eh_trava(erro):
+    return isinstance(erro, sqlite3.OperationalError) and ('locked' in str(erro) or 'busy' in str(erro))
+
+def normalizar_sql(sql):
+    # IN (?, ?, ...) com tamanhos diferentes contam como a mesma instrução
+    return re.sub(r'\?(?:, \?)+', '?, …', ' '.join(sql.split()))
+
+def _medir(sql, funcao, *args, chamada=True):
+    inicio = time.perf_counter()
+    travou = False
+    try:
+        return funcao(*args)
+    except sqlite3.OperationalError as erro:
+        travou = eh_trava(erro)
+        raise
+    finally:
+        medidor.registrar(sql, time.perf_counter() - inicio, chamada, travou)
+
+class CursorMedido(sqlite3.Cursor):
+    _sql = ''
+    
+    def execute(self, sql, parametros=()):
+        self._sql = normalizar_sql(sql)
+        return _medir(self._sql, super().execute, sql, parametros)
+    
+    def executemany(self, sql, parametros):
+        self._sql = normalizar_sql(sql)
+        return _medir(self._sql, super().executemany, sql, parametros)
+    
+    # O tempo de leitura das linhas conta para a instrução que as gerou
+    def fetchone(self):
+        return _medir(self._sql, super().fetchone, chamada=False)
+    
+    def fetchmany(self, size=1):
+        return _medir(self._sql, super().fetchmany, size, chamada=False)
+    
+    def fetchall(self):
+        return _medir(self._sql, super().fetchall, chamada=False)
+
+class ConexaoMedida(sqlite3.Connection):
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+    
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+    
+    def commit(self):
+        return _medir('COMMIT', super().commit)
+
+_connect = sqlite3.connect
+
+def _connect_medido(*args, **kwargs):
+    kwargs.setdefault('factory', ConexaoMedida)
+    return _connect(*args, **kwargs)
+
+sqlite3.connect = _connect_medido
+
+# Sessões
+class SessaoBanco:
+    """Faz as mesmas leituras e gravações das páginas do app, direto no DatabaseManager"""
+    
+    def __init__(self, pasta):
+        self.db = DatabaseManager(pasta / 'financas.db')
+        self.analytics = Analytics(self.db)
+        self.anos = list(self.db.get_anos_disponiveis())
+    
+    def _mes(self):
+        ano, mes = random.choice(self.anos), random.randint(1, 12)
+        fim = (date(ano, mes, 28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        return date(ano, mes, 1), fim
+    
+    def dashboard(self):
+        inicio, fim = self._mes()
+        transacoes = self.db.get_transacoes(data_inicio=inicio, data_fim=fim, colunas=COLUNAS_EXTRATO)
+        self.db.get_resumo(data_inicio=inicio, data_fim=fim)
+        self.db.get_resumo_moedas(data_inicio=inicio, data_fim=fim)
+        self.analytics.gerar_extrato_com_saldo(transacoes)
+    
+    def extrato(self):
+        inicio, fim = self._mes()
+        transacoes = self.db.get_transacoes(data_inicio=inicio, data_fim=fim, colunas=COLUNAS_EXTRATO)
+        self.analytics.gerar_extrato_com_saldo(transacoes)
+        self.db.get_resumo_moedas(data_inicio=inicio, data_fim=fim)
+    
+    def inserir(self):
+        self.db.add_transacao(
+            f"Carga {random.randrange(10**9)}", round(random.uniform(1, 500), 2),
+            random.choice(CATEGORIAS), random.choice(['receita', 'despesa']), date.today(), 'BRL'
+        )
+    
+    def editar(self):
+        recentes = self.db.get_transacoes(limite=15, colunas=('id',) + COLUNAS_EXTRATO)
+        transacao = recentes.iloc[random.randrange(len(recentes))]
+        if not self.db.atualizar_transacao(
+            transacao['id'], transacao['descricao'], round(random.uniform(1, 500), 2),
+            transacao['categoria'], transacao['data']
+        ):
+            raise RuntimeError("atualizar_transacao falhou")
+
+class SessaoApp:
+    """Uma sessão Streamlit (AppTest) navegando pela cópia do app em `pasta`"""
+    
+    def __init__(self, pasta):
+        # O processo da sessão passa a importar `src` da cópia, que grava no banco da cópia
+        for modulo in [m for m in sys.modules if m == 'src' or m.startswith('src.')]:
+            del sys.modules[modulo]
+        sys.path.insert(0, str(pasta))
+        from streamlit.testing.v1 import AppTest
+        
+        self.at = AppTest.from_file(str(pasta / 'app.py'), default_timeout=60)
+        self._rodar(self.at.run)
+    
+    def _rodar(self, interacao):
+        at = interacao()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    
+    def _ir(self, pagina):
+        self._rodar(self.at.sidebar.radio[0].set_value(pagina).run)
+    
+    def dashboard(self):
+        self._ir("📊 Dashboard")
+    
+    def extrato(self):
+        self._ir("📋 Extrato")
+    
+    def inserir(self):
+        self._ir("💸 Nova Transação")
+        self.at.text_input(key="nova_descricao").input(f"Carga {random.randrange(10**9)}")
+        self.at.number_input(key="novo_valor").set_value(round(random.uniform(1, 500), 2))
+        salvar = next(b for b in self.at.button if b.label == "💾 Salvar Transação")
+        self._rodar(salvar.click().run)
+    
+    def editar(self):
+        self._ir("✏️ Editar/Excluir")
+        self.at.text_input[0].input(f"Editada {random.randrange(10**9)}")
+        self._rodar(self.at.button[0].click().run)
+
+def rodar_sessao(modo, pasta, mix, duracao, pausa, semente, barreira):
+    """Repete operações sorteadas do mix por `duracao` segundos.
+    
+    Retorna [(operacao, segundos, erro)], com erro None, 'trava' ou o nome da exceção.
+    """
+    random.seed(semente)
+    sessao = SessaoApp(pasta) if modo == 'app' else SessaoBanco(pasta)
+    operacoes, pesos = zip(*mix.items())
+    resultados = []
+    
+    # Descarta o que foi medido na preparação; a última sessão a chegar zera por último
+    medidor.coletar()
+    barreira.wait()
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        operacao = random.choices(operacoes, pesos)[0]
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            getattr(sessao, operacao)()
+        except Exception as e:
+            erro = 'trava' if eh_trava(e) else type(e).__name__
+        resultados.append((operacao, time.perf_counter() - inicio, erro))
+        if pausa:
+            time.sleep(random.expovariate(1 / pausa))
+    return resultados
+
+def _processo_sessao(fila, *args):
+    fila.put((rodar_sessao(*args), medidor.coletar()))
+
+def rodar_nivel(args, pasta, mix, sessoes):
+    """Roda `sessoes` sessões simultâneas e retorna (resultados, instruções SQL)"""
+    configuracao = (args.modo, pasta, mix, args.duracao, args.pausa)
+    
+    if args.modo == 'app' or args.processos:
+        barreira, fila = multiprocessing.Barrier(sessoes), multiprocessing.Queue()
+        processos = [
+            multiprocessing.Process(target=_processo_sessao, args=(fila,) + configuracao + (i, barreira))
+            for i in range(sessoes)
+        ]
+        for p in processos:
+            p.start()
+        coletas = [fila.get() for _ in processos]
+        for p in processos:
+            p.join()
+        resultados = [r for parcial, _ in coletas for r in parcial]
+        instrucoes = defaultdict(lambda: [0, 0.0, 0])
+        for _, parcial in coletas:
+            for sql, valores in parcial.items():
+                instrucoes[sql] = [a + b for a, b in zip(instrucoes[sql], valores)]
+        return resultados, dict(instrucoes)
+    
+    # Threads compartilham o medidor do processo
+    barreira = threading.Barrier(sessoes)
+    parciais = [None] * sessoes
+    
+    def sessao(i):
+        parciais[i] = rodar_sessao(*configuracao, i, barreira)
+    
+    threads = [threading.Thread(target=sessao, args=(i,)) for i in range(sessoes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [r for parcial in parciais for r in parcial], medidor.coletar()
+
+def resumir(sessoes, duracao, resultados, instrucoes):
+    latencias = [segundos for _, segundos, _ in resultados]
+    erros = Counter(erro for _, _, erro in resultados if erro)
+    return {
+        'sessoes': sessoes,
+        'operacoes': len(resultados),
+        'ops_s': round(len(resultados) / duracao, 2),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 1) if latencias else 0.0,
+        'p95_ms': round(percentil(latencias, 95) * 1000, 1) if latencias else 0.0,
+        'p99_ms': round(percentil(latencias, 99) * 1000, 1) if latencias else 0.0,
+        'travas_sql': sum(travas for _, _, travas in instrucoes.values()),
+        'erros': dict(erros)
+    }
+
+def imprimir_detalhes(resultados, instrucoes, limite=10):
+    print(f"\n{'Operação':<12} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    for operacao in OPERACOES:
+        latencias = [s for op, s, _ in resultados if op == operacao]
+        if latencias:
+            erros = sum(1 for op, _, erro in resultados if op == operacao and erro)
+            print(f"{operacao:<12} {len(latencias):>6} {percentil(latencias, 50) * 1000:>8.1f} "
+                  f"{percentil(latencias, 95) * 1000:>8.1f} {percentil(latencias, 99) * 1000:>8.1f} {erros:>6}")
+    
+    total = sum(segundos for _, segundos, _ in instrucoes.values()) or 1
+    print(f"\n🔥 Instruções SQL com mais tempo (de {total:.1f}s somando todas as sessões)")
+    print(f"{'Instrução':<70} {'chamadas':>9} {'total s':>8} {'%':>5} {'médio ms':>9} {'travas':>7}")
+    ordenadas = sorted(instrucoes.items(), key=lambda item: item[1][1], reverse=True)
+    for sql, (chamadas, segundos, travas) in ordenadas[:limite]:
+        # Início e fim da instrução: consultas com o mesmo WITH diferem no final
+        resumo = sql if len(sql) <= 70 else f"{sql[:40]} … {sql[-27:]}"
+        medio = segundos / chamadas * 1000 if chamadas else 0.0
+        print(f"{resumo:<70} {chamadas:>9} {segundos:>8.2f} {segundos / total:>5.0%} {medio:>9.2f} {travas:>7}")
+
+def comparar(niveis, caminho, tolerancia):
+    """Compara com um resultado salvo; retorna True se algum nível regrediu"""
+    base = {n['sessoes']: n for n in json.loads(Path(caminho).read_text(encoding='utf-8'))['niveis']}
+    regrediu = False
+    print(f"\n📏 Comparação com {caminho} (tolerância {tolerancia:.0%})")
+    for nivel in niveis:
+        anterior = base.get(nivel['sessoes'])
+        if not anterior:
+            continue
+        vazao = nivel['ops_s'] / anterior['ops_s'] - 1 if anterior['ops_s'] else 0.0
+        p95 = nivel['p95_ms'] / anterior['p95_ms'] - 1 if anterior['p95_ms'] else 0.0
+        piorou = vazao < -tolerancia or p95 > tolerancia
+        regrediu |= piorou
+        print(f"{nivel['sessoes']:>3} sessões: vazão {vazao:+.0%}  p95 {p95:+.0%}  {'❌ regressão' if piorou else '✅'}")
+    return regrediu
+
+def ler_mix(texto):
+    mix = {}
+    for item in texto.split(','):
+        operacao, _, peso = item.partition('=')
+        if operacao not in OPERACOES:
+            raise SystemExit(f"Operação desconhecida no mix: {operacao} (use {', '.join(OPERACOES)})")
+        mix[operacao] = float(peso or 1)
+    return mix
+
+def preparar(pasta, linhas):
+    """Copia o app para `pasta` e cria nela um banco de exemplo"""
+    for arquivo in ('app.py', 'config.py'):
+        shutil.copy(RAIZ / arquivo, pasta / arquivo)
+    shutil.copytree(RAIZ / 'src', pasta / 'src', ignore=shutil.ignore_patterns('__pycache__'))
+    db = DatabaseManager(pasta / 'financas.db')
+    db.init_db()
+    popular_banco(db, linhas)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modo', choices=['banco', 'app'], default='banco')
+    parser.add_argument('--processos', action='store_true', help="no modo banco, uma sessão por processo")
+    parser.add_argument('--sessoes', default='1,2,4,8', help="níveis de concorrência, ex: 1,2,4,8")
+    parser.add_argument('--duracao', type=float, default=10, help="segundos por nível")
+    parser.add_argument('--pausa', type=float, default=0, help="pausa média entre operações (s)")
+    parser.add_argument('--mix', default=MIX_PADRAO)
+    parser.add_argument('--linhas', type=int, default=100_000, help="transações no banco de exemplo")
+    parser.add_argument('--salvar', help="grava o resultado em JSON")
+    parser.add_argument('--comparar', help="JSON salvo antes, para detectar regressões")
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+    
+    mix = ler_mix(args.mix)
+    niveis_sessoes = [int(n) for n in args.sessoes.split(',')]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp)
+        preparar(pasta, args.linhas)
+        print(f"📦 {args.linhas:,} transações  |  modo {args.modo}"
+              f"{' (processos)' if args.processos or args.modo == 'app' else ' (threads)'}  |  "
+              f"mix {args.mix}  |  {args.duracao:g}s por nível")
+        print(f"{'Sessões':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'travas':>7}  erros")
+        
+        niveis = []
+        for sessoes in niveis_sessoes:
+            resultados, instrucoes = rodar_nivel(args, pasta, mix, sessoes)
+            nivel = resumir(sessoes, args.duracao, resultados, instrucoes)
+            niveis.append(nivel)
+            print(f"{sessoes:>7} {nivel['ops_s']:>8.1f} {nivel['p50_ms']:>8.1f} {nivel['p95_ms']:>8.1f} "
+                  f"{nivel['p99_ms']:>8.1f} {nivel['travas_sql']:>7}  {nivel['erros'] or '-'}")
+        
+        # Teto: a partir de onde mais sessões não aumentam a vazão em pelo menos 10%
+        teto = niveis[0]
+        for nivel in niveis[1:]:
+            if nivel['ops_s'] < teto['ops_s'] * 1.1:
+                break
+            teto = nivel
+        print(f"\n🧱 Vazão para de crescer por volta de {teto['sessoes']} sessões ({teto['ops_s']:.1f} ops/s)")
+        
+        print(f"\nDetalhes com {niveis_sessoes[-1]} sessões:")
+        imprimir_detalhes(resultados, instrucoes)
+    
+    if args.salvar:
+        Path(args.salvar).write_text(json.dumps({
+            'modo': args.modo, 'mix': args.mix, 'linhas': args.linhas,
+            'duracao': args.duracao, 'niveis': niveis
+        }, indent=2), encoding='utf-8')
+        print(f"\n💾 Resultado salvo em {args.salvar}")
+    
+    if args.comparar and comparar(niveis, args.comparar, args.tolerancia):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
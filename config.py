@@ -10,6 +10,17 @@ class Config:
     DB_NAME = "financas.db"
     DB_PATH = Path(__file__).parent / DB_NAME
     
+    # Cotações diárias (data, moeda, taxa em BRL) importadas ao iniciar
+    COTACOES_CSV = Path(__file__).parent / "cotacoes.csv"
+    
+    # Token compartilhado das rotas /sync/* da API e do `run.py sync` por HTTP
+    SYNC_TOKEN = os.environ.get("FINANCAS_SYNC_TOKEN")
+    
+    # Backups (python run.py backup / restore)
+    BACKUP_DIR = Path(__file__).parent / "backups"
+    BACKUP_RETENCAO = 7          # cadeias (completo + incrementais) mantidas
+    BACKUP_COMPLETO_A_CADA = 24  # snapshots por cadeia
+    
     # Configurações do Streamlit
     STREAMLIT_CONFIG = {
         "page_title": "Controle de Gastos",
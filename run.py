@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 """
 Script de execução do Controle de Gastos
+
+Uso:
+    python run.py              # interface Streamlit
+    python run.py api          # API JSON de ingestão
+    python run.py report       # relatórios mensais em HTML
+    python run.py backup       # snapshot do banco (--intervalo para agendar)
+    python run.py restore      # restaura um snapshot (--listar para ver todos)
+    python run.py sync <par>   # sincroniza com outro .db ou com a API de outra máquina
+    python run.py cotacoes     # importa cotações de um CSV (data,moeda,taxa)
 """
 
+import argparse
 import subprocess
 import sys
 import os
 
-def main():
-    """Função principal para executar a aplicação"""
+from config import config
+
+def executar_app(args):
+    """Executa a interface Streamlit"""
     print("🚀 Iniciando Controle de Gastos...")
     print("📊 A aplicação estará disponível em: http://localhost:8501")
     print("⏹️  Pressione Ctrl+C para parar a aplicação")
@@ -23,5 +35,202 @@ def main():
     except Exception as e:
         print(f"❌ Erro ao executar a aplicação: {e}")
 
+def executar_api(args):
+    """Executa a API JSON de ingestão de transações"""
+    from src.api import servir
+    
+    print("⏹️  Pressione Ctrl+C para parar a API")
+    servir(args.host, args.porta, args.db, args.token)
+    print("\n👋 API encerrada!")
+
+def executar_relatorios(args):
+    """Gera os relatórios mensais em HTML para um intervalo de meses"""
+    from datetime import date, datetime
+    from src.database import DatabaseManager
+    from src.relatorios import gerar_relatorios
+    
+    db = DatabaseManager(args.db)
+    db.init_db()
+    
+    if args.inicio:
+        inicio = datetime.strptime(args.inicio, "%Y-%m").date()
+    else:
+        inicio = date(db.get_anos_disponiveis()[0], 1, 1)
+    fim = datetime.strptime(args.fim, "%Y-%m").date() if args.fim else date.today()
+    
+    print(f"📄 Gerando relatórios de {inicio:%m/%Y} a {fim:%m/%Y} em {args.destino}/ ...")
+    arquivos, segundos = gerar_relatorios(
+        db.db_path, inicio, fim, args.destino, args.processos, args.plotlyjs
+    )
+    print(f"✅ {len(arquivos)} relatórios em {segundos:.1f}s ({len(arquivos) / segundos:.1f} meses/s)")
+
+def _descrever_snapshot(manifesto):
+    latencia = manifesto['latencia_escrita']
+    return (
+        f"{manifesto['tipo']} {manifesto['nome']}: "
+        f"{manifesto['paginas_gravadas']:,} de {manifesto['paginas']:,} páginas "
+        f"({manifesto['bytes'] / 1024:,.0f} KB) em {manifesto['duracao_s']:.2f}s | "
+        f"espera de escrita p50 {latencia['antes']['p50_ms']:.2f} → {latencia['durante']['p50_ms']:.2f} ms, "
+        f"máx {latencia['antes']['max_ms']:.2f} → {latencia['durante']['max_ms']:.2f} ms"
+    )
+
+def executar_backup(args):
+    """Cria um snapshot do banco, ou um a cada --intervalo minutos"""
+    from src.backup import agendar_backups, aplicar_retencao, criar_snapshot
+    from src.database import DatabaseManager
+    
+    db = DatabaseManager(args.db)
+    db.init_db()
+    
+    def relatar(manifesto, removidos):
+        print(f"✅ {_descrever_snapshot(manifesto)}")
+        if removidos:
+            print(f"🧹 {len(removidos)} snapshots antigos removidos pela retenção")
+    
+    if args.intervalo:
+        print(f"⏱️  Snapshot a cada {args.intervalo} min em {args.destino}/ (Ctrl+C para parar)")
+        try:
+            agendar_backups(
+                db.db_path, args.destino, args.intervalo * 60,
+                args.retencao, args.completo_a_cada, relatar
+            )
+        except KeyboardInterrupt:
+            print("\n👋 Backups encerrados!")
+    else:
+        manifesto = criar_snapshot(db.db_path, args.destino, incremental=not args.completo)
+        relatar(manifesto, aplicar_retencao(args.destino, args.retencao, db.db_path))
+
+def executar_restauracao(args):
+    """Lista os snapshots ou restaura um deles sobre o banco"""
+    from src.backup import listar_snapshots, restaurar
+    from src.database import DatabaseManager
+    
+    db = DatabaseManager(args.db)
+    if args.listar:
+        for manifesto in listar_snapshots(args.origem, db.db_path):
+            print(f"{manifesto['nome']}  {manifesto['tipo']:<11} {manifesto['paginas']:>8,} páginas  {manifesto['criado_em']}")
+        return
+    
+    manifesto, segundos, seguranca = restaurar(db.db_path, args.origem, args.nome)
+    if seguranca:
+        print(f"🛟 Estado anterior salvo em {seguranca['nome']}")
+    print(f"♻️  {manifesto['nome']} restaurado em {db.db_path} em {segundos:.2f}s")
+
+def executar_sincronizacao(args):
+    """Sincroniza o banco com outra cópia (arquivo .db ou URL da API)"""
+    from src.database import DatabaseManager
+    from src.sincronizacao import ParHttp, ParLocal, sincronizar
+    
+    db = DatabaseManager(args.db)
+    db.init_db()
+    if args.par.startswith(('http://', 'https://')):
+        par = ParHttp(args.par, args.token)
+    else:
+        outro = DatabaseManager(args.par)
+        outro.init_db()
+        par = ParLocal(outro)
+    
+    resumo = sincronizar(db, par)
+    if not resumo['baldes']:
+        print("✅ Já sincronizado")
+    else:
+        enviadas, recebidas = resumo['enviadas'], resumo['recebidas']
+        print(f"🔄 {resumo['meses']} meses / {resumo['baldes']} baldes diferentes")
+        print(f"⬆️  enviadas: {enviadas['incluidas']} novas, {enviadas['atualizadas']} atualizadas, "
+              f"{enviadas['excluidas']} excluídas")
+        print(f"⬇️  recebidas: {recebidas['incluidas']} novas, {recebidas['atualizadas']} atualizadas, "
+              f"{recebidas['excluidas']} excluídas")
+    print(f"📡 {resumo['chamadas']} chamadas, {resumo['bytes_enviados'] / 1024:,.1f} KB enviados, "
+          f"{resumo['bytes_recebidos'] / 1024:,.1f} KB recebidos em {resumo['segundos']:.2f}s")
+    if not resumo['sincronizado']:
+        print("⚠️  As cópias ainda diferem (alguém gravou durante a sincronização?); rode de novo")
+
+def executar_importacao_cotacoes(args):
+    """Importa cotações diárias de um CSV (data,moeda,taxa) para o banco"""
+    from src.database import DatabaseManager
+    
+    db = DatabaseManager(args.db)
+    db.init_db()
+    linhas = db.importar_cotacoes_csv(args.arquivo)
+    print(f"💱 {linhas:,} cotações lidas de {args.arquivo}")
+
+def main():
+    """Função principal para executar a aplicação"""
+    parser = argparse.ArgumentParser(description="Controle de Gastos Pessoais")
+    subparsers = parser.add_subparsers(dest="comando")
+    
+    subparsers.add_parser("app", help="Interface Streamlit (padrão)")
+    
+    parser_api = subparsers.add_parser("api", help="API JSON de ingestão de transações")
+    parser_api.add_argument("--host", default="127.0.0.1")
+    parser_api.add_argument("--porta", type=int, default=8765)
+    parser_api.add_argument("--db", help="Caminho do banco (padrão: financas.db)")
+    parser_api.add_argument(
+        "--token", default=config.SYNC_TOKEN,
+        help="Token exigido nas rotas /sync/* (padrão: FINANCAS_SYNC_TOKEN)"
+    )
+    
+    parser_report = subparsers.add_parser("report", help="Relatórios mensais em HTML")
+    parser_report.add_argument("--inicio", help="Primeiro mês, AAAA-MM (padrão: ano da transação mais antiga)")
+    parser_report.add_argument("--fim", help="Último mês, AAAA-MM (padrão: mês atual)")
+    parser_report.add_argument("--destino", default="relatorios", help="Pasta de saída")
+    parser_report.add_argument("--processos", type=int, help="Processos em paralelo (padrão: núcleos)")
+    parser_report.add_argument(
+        "--plotlyjs", choices=["directory", "inline", "cdn"], default="directory",
+        help="Como incluir o plotly.js (inline gera arquivos totalmente independentes)"
+    )
+    parser_report.add_argument("--db", help="Caminho do banco (padrão: financas.db)")
+    
+    parser_backup = subparsers.add_parser("backup", help="Snapshot online do banco")
+    parser_backup.add_argument("--destino", default=str(config.BACKUP_DIR), help="Pasta dos snapshots")
+    parser_backup.add_argument("--completo", action="store_true", help="Força um snapshot completo")
+    parser_backup.add_argument("--intervalo", type=float, help="Repete a cada N minutos")
+    parser_backup.add_argument(
+        "--retencao", type=int, default=config.BACKUP_RETENCAO,
+        help="Cadeias (completo + incrementais) mantidas"
+    )
+    parser_backup.add_argument(
+        "--completo-a-cada", type=int, default=config.BACKUP_COMPLETO_A_CADA,
+        help="Com --intervalo, inicia uma cadeia nova a cada N snapshots"
+    )
+    parser_backup.add_argument("--db", help="Caminho do banco (padrão: financas.db)")
+    
+    parser_restore = subparsers.add_parser("restore", help="Restaura um snapshot sobre o banco")
+    parser_restore.add_argument("nome", nargs="?", help="Snapshot a restaurar (padrão: o mais recente do banco)")
+    parser_restore.add_argument("--origem", default=str(config.BACKUP_DIR), help="Pasta dos snapshots")
+    parser_restore.add_argument("--listar", action="store_true", help="Só lista os snapshots")
+    parser_restore.add_argument("--db", help="Caminho do banco (padrão: financas.db)")
+    
+    parser_sync = subparsers.add_parser("sync", help="Sincroniza com outra cópia do banco")
+    parser_sync.add_argument("par", help="Outro arquivo .db ou URL da API (ex: http://servidor:8765)")
+    parser_sync.add_argument("--db", help="Caminho do banco (padrão: financas.db)")
+    parser_sync.add_argument(
+        "--token", default=config.SYNC_TOKEN,
+        help="Token da API do par (padrão: FINANCAS_SYNC_TOKEN)"
+    )
+    
+    parser_cotacoes = subparsers.add_parser("cotacoes", help="Importa cotações de um CSV (data,moeda,taxa)")
+    parser_cotacoes.add_argument(
+        "arquivo", nargs="?", default=str(config.COTACOES_CSV), help="CSV de cotações (padrão: cotacoes.csv)"
+    )
+    parser_cotacoes.add_argument("--db", help="Caminho do banco (padrão: financas.db)")
+    
+    args = parser.parse_args()
+    
+    if args.comando == "api":
+        executar_api(args)
+    elif args.comando == "report":
+        executar_relatorios(args)
+    elif args.comando == "backup":
+        executar_backup(args)
+    elif args.comando == "restore":
+        executar_restauracao(args)
+    elif args.comando == "sync":
+        executar_sincronizacao(args)
+    elif args.comando == "cotacoes":
+        executar_importacao_cotacoes(args)
+    else:
+        executar_app(args)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,13 +1,108 @@
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
+from src.utils import formatar_moeda, intervalo_ano_anterior
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
+# Colunas de get_transacoes usadas pelo extrato e pelas páginas de resumo
+COLUNAS_EXTRATO = ('descricao', 'valor', 'categoria', 'tipo', 'data', 'moeda')
+
+# Pontos enviados ao navegador pelo gráfico de saldo diário, qualquer que seja o intervalo
+MAX_PONTOS_SALDO = 2000
+
+def reduzir_lttb(x, y, pontos):
+    """Escolhe `pontos` índices da série com Largest-Triangle-Three-Buckets.
+    
+    O primeiro e o último ponto são mantidos; o resto é dividido em baldes e de
+    cada balde fica o ponto que forma o maior triângulo com o ponto escolhido no
+    balde anterior e a média do balde seguinte. Preserva picos e vales, ao
+    contrário de uma amostragem a cada N pontos.
+    """
+    n = len(x)
+    if pontos >= n or pontos < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    limites = np.linspace(1, n - 1, pontos - 1).astype(int)
+    indices = np.empty(pontos, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(pontos - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        if i + 2 < len(limites):
+            media_x = x[fim:limites[i + 2]].mean()
+            media_y = y[fim:limites[i + 2]].mean()
+        else:
+            media_x, media_y = x[-1], y[-1]
+        
+        areas = np.abs(
+            (x[a] - media_x) * (y[inicio:fim] - y[a])
+            - (x[a] - x[inicio:fim]) * (media_y - y[a])
+        )
+        a = inicio + int(areas.argmax())
+        indices[i + 1] = a
+    
+    return indices
+
 class Analytics:
     def __init__(self, db_manager):
         self.db = db_manager
     
+    def gerar_extrato_com_saldo(self, transacoes):
+        """Gera um DataFrame com saldo acumulado no formato desejado"""
+        if transacoes.empty:
+            return pd.DataFrame()
+        
+        # Criar cópia e ordenar por data
+        # (data já vem como datetime64 de get_transacoes)
+        df = transacoes.copy()
+        df = df.sort_values('data')
+        
+        # Formatar data (ex: 01/nov)
+        df['DATA'] = df['data'].dt.strftime('%d/%b').str.lower()
+        
+        # Formatar movimentação
+        df['MOVIMENTAÇÃO'] = df['descricao']
+        
+        # Valor original, apenas para transações em outra moeda
+        df['ORIGINAL'] = df.apply(
+            lambda x: formatar_moeda(x['valor'], x['moeda']) if x['moeda'] != 'BRL' else '',
+            axis=1
+        )
+        
+        # Ajustar valor convertido em BRL (negativo para despesas)
+        df['VALOR_BRUTO'] = df.apply(
+            lambda x: -x['valor_brl'] if x['tipo'] == 'despesa' else x['valor_brl'],
+            axis=1
+        )
+        
+        # Calcular saldo acumulado
+        df['SALDO'] = df['VALOR_BRUTO'].cumsum()
+        
+        # Formatar VALOR para exibição (com separadores)
+        df['VALOR'] = df['VALOR_BRUTO'].apply(
+            lambda x: f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        )
+        
+        # Formatar SALDO para exibição
+        df['SALDO_FMT'] = df['SALDO'].apply(
+            lambda x: f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        )
+        
+        # Selecionar e ordenar colunas
+        extrato = df[['DATA', 'MOVIMENTAÇÃO', 'ORIGINAL', 'VALOR', 'SALDO_FMT']]
+        extrato.columns = ['DATA', 'MOVIMENTAÇÃO', 'ORIGINAL', 'VALOR', 'SALDO']
+        
+        # Sem transações em outras moedas a coluna ORIGINAL só ocuparia espaço
+        if not (extrato['ORIGINAL'] != '').any():
+            extrato = extrato.drop(columns='ORIGINAL')
+        
+        return extrato
+    
     def gerar_grafico_pizza_despesas(self, df_resumo):
         """Gera gráfico de pizza para despesas por categoria"""
         if df_resumo.empty:
@@ -27,6 +122,23 @@ class Analytics:
         )
         return fig
     
+    def gerar_tabela_moedas(self, df_moedas):
+        """Gera tabela de totais por moeda com valor original e convertido para BRL"""
+        tabela = pd.DataFrame({
+            'TIPO': df_moedas['tipo'].str.capitalize(),
+            'MOEDA': df_moedas['moeda'],
+            'ORIGINAL': [
+                formatar_moeda(total, moeda)
+                for total, moeda in zip(df_moedas['total_original'], df_moedas['moeda'])
+            ],
+            'CONVERTIDO': [
+                'sem cotação' if pd.isna(total)
+                else formatar_moeda(total) + (' (parcial)' if sem_cotacao else '')
+                for total, sem_cotacao in zip(df_moedas['total_brl'], df_moedas['dias_sem_cotacao'])
+            ]
+        })
+        return tabela.reset_index(drop=True)
+    
     def gerar_grafico_comparacao(self, receitas, despesas):
         """Gera gráfico de barras para receitas vs despesas"""
         fig = go.Figure()
@@ -44,30 +156,61 @@ class Analytics:
         )
         return fig
     
+    def gerar_tabela_tendencias(self, df_metricas, mes, tipo='despesa'):
+        """Gera tabela por categoria do mês ('AAAA-MM') com variação sobre o mês anterior e as médias de 3 e 12 meses"""
+        df = df_metricas[
+            (df_metricas['mes'] == mes) & (df_metricas['tipo'] == tipo) & (df_metricas['categoria'] != '')
+        ].sort_values('valor', ascending=False)
+        
+        def variacao(valor, base):
+            return '—' if pd.isna(base) or base == 0 else f"{(valor / base - 1) * 100:+.1f}%"
+        
+        tabela = pd.DataFrame({
+            'CATEGORIA': df['categoria'],
+            'MÊS': [formatar_moeda(valor) for valor in df['valor']],
+            'VS MÊS ANTERIOR': [variacao(v, b) for v, b in zip(df['valor'], df['anterior'])],
+            'MÉDIA 3M': ['—' if pd.isna(m) else formatar_moeda(m) for m in df['media_3m']],
+            'MÉDIA 12M': ['—' if pd.isna(m) else formatar_moeda(m) for m in df['media_12m']],
+            'VS MÉDIA 12M': [variacao(v, b) for v, b in zip(df['valor'], df['media_12m'])]
+        })
+        return tabela.reset_index(drop=True)
+    
+    def gerar_grafico_poupanca(self, df_metricas):
+        """Gera gráfico da taxa de poupança mensal (1 - despesas / receitas) e da sua média de 3 meses"""
+        df = df_metricas[df_metricas['tipo'] == 'poupanca']
+        meses = pd.to_datetime(df['mes']).dt.strftime('%b/%Y')
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=meses,
+            y=df['valor'] * 100,
+            name='Taxa do mês',
+            line=dict(color='#3498db', width=3),
+            mode='lines+markers'
+        ))
+        fig.add_trace(go.Scatter(
+            x=meses,
+            y=df['media_3m'] * 100,
+            name='Média 3 meses',
+            line=dict(color='#95a5a6', width=2, dash='dash')
+        ))
+        fig.update_layout(
+            title="🐷 Taxa de Poupança",
+            yaxis_title="% da receita",
+            hovermode='x unified'
+        )
+        return fig
+    
     def gerar_grafico_evolucao(self, mes, ano, meses_anteriores=5):
         """Gera gráfico de evolução dos últimos meses"""
         data_inicio = datetime(ano, mes, 1) - relativedelta(months=meses_anteriores-1)
+        data_fim = datetime(ano, mes, 1) + relativedelta(months=1) - relativedelta(days=1)
+        return self.gerar_grafico_evolucao_intervalo(data_inicio, data_fim)
         
-        dados_mensais = []
-        for i in range(meses_anteriores):
-            data_ref = data_inicio + relativedelta(months=i)
-            transacoes = self.db.get_transacoes(data_ref.month, data_ref.year)
-            
-            if not transacoes.empty:
-                receitas = transacoes[transacoes['tipo'] == 'receita']['valor'].sum()
-                despesas = transacoes[transacoes['tipo'] == 'despesa']['valor'].sum()
-            else:
-                receitas = despesas = 0
-            
-            dados_mensais.append({
-                'mes_ano': data_ref.strftime('%Y-%m'),
-                'mes_nome': data_ref.strftime('%b/%Y'),
-                'receitas': receitas,
-                'despesas': despesas,
-                'saldo': receitas - despesas
-            })
-        
-        df_mensal = pd.DataFrame(dados_mensais)
+    def gerar_grafico_evolucao_intervalo(self, data_inicio, data_fim):
+        """Gera gráfico de evolução mensal para um intervalo qualquer (uma única consulta)"""
+        df_mensal = self.db.get_totais_mensais(data_inicio, data_fim)
+        df_mensal['mes_nome'] = pd.to_datetime(df_mensal['ano_mes']).dt.strftime('%b/%Y')
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
@@ -90,4 +233,86 @@ class Analytics:
             yaxis_title="Valor (R$)",
             hovermode='x unified'
         )
-        return fig, df_mensal
\ No newline at end of file
+        return fig, df_mensal
+    
+    def gerar_grafico_saldo_diario(self, data_inicio, data_fim, max_pontos=MAX_PONTOS_SALDO):
+        """Gera gráfico do saldo acumulado dia a dia, reduzido com LTTB.
+        
+        Retorna a figura (no máximo max_pontos pontos) e a série diária completa.
+        """
+        df_diario = self.db.get_saldo_diario(data_inicio, data_fim)
+        dias = pd.to_datetime(df_diario['data'])
+        indices = reduzir_lttb(dias.to_numpy('int64'), df_diario['saldo'], max_pontos)
+        df_grafico = df_diario.iloc[indices]
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=df_grafico['data'],
+            y=df_grafico['saldo'],
+            name='Saldo',
+            line=dict(color='#3498db', width=2),
+            mode='lines'
+        ))
+        fig.update_layout(
+            title="📉 Saldo Diário",
+            xaxis_title="Data",
+            yaxis_title="Saldo (R$)",
+            hovermode='x unified'
+        )
+        return fig, df_diario
+    
+    def gerar_grafico_comparativo_anual(self, data_inicio, data_fim):
+        """Gera gráfico comparando cada mês do intervalo com o mesmo mês do ano anterior.
+        
+        O ano anterior é o mesmo intervalo, dia a dia, um ano antes: num mês
+        parcial (ex: até o dia 19) a comparação também vai só até o dia 19.
+        """
+        atual = self.db.get_totais_mensais(data_inicio, data_fim)
+        atual['data_ref'] = pd.to_datetime(atual['ano_mes'])
+        anterior = self.db.get_totais_mensais(*intervalo_ano_anterior(data_inicio, data_fim))
+        anterior['data_ref'] = pd.to_datetime(anterior['ano_mes']) + pd.DateOffset(years=1)
+        anterior = anterior[['data_ref', 'receitas', 'despesas', 'saldo']]
+        
+        df_comp = atual.merge(anterior, on='data_ref', how='left', suffixes=('', '_anterior')).fillna(0)
+        df_comp['mes_nome'] = df_comp['data_ref'].dt.strftime('%b/%Y')
+        df_comp['variacao_despesas'] = (
+            (df_comp['despesas'] - df_comp['despesas_anterior'])
+            / df_comp['despesas_anterior'].where(df_comp['despesas_anterior'] != 0)
+            * 100
+        )
+        
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=df_comp['mes_nome'],
+            y=df_comp['despesas_anterior'],
+            name='Despesas (ano anterior)',
+            marker_color='#f5b7b1'
+        ))
+        fig.add_trace(go.Bar(
+            x=df_comp['mes_nome'],
+            y=df_comp['despesas'],
+            name='Despesas',
+            marker_color='#e74c3c'
+        ))
+        fig.add_trace(go.Scatter(
+            x=df_comp['mes_nome'],
+            y=df_comp['receitas_anterior'],
+            name='Receitas (ano anterior)',
+            line=dict(color='#abebc6', width=2, dash='dash'),
+            mode='lines+markers'
+        ))
+        fig.add_trace(go.Scatter(
+            x=df_comp['mes_nome'],
+            y=df_comp['receitas'],
+            name='Receitas',
+            line=dict(color='#2ecc71', width=3),
+            mode='lines+markers'
+        ))
+        fig.update_layout(
+            title="📅 Comparação com o Ano Anterior",
+            xaxis_title="Mês",
+            yaxis_title="Valor (R$)",
+            barmode='group',
+            hovermode='x unified'
+        )
+        return fig, df_comp
\ No newline at end of file
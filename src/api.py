@@ -0,0 +1,377 @@
+"""
+API HTTP/JSON para ingestão de transações sem passar pela interface Streamlit.
+
+Servidor assíncrono (asyncio, só biblioteca padrão) que expõe as operações do
+DatabaseManager. As gravações de todas as requisições são enfileiradas e um
+único gravador junta o que estiver pendente numa só transação do SQLite;
+edições, exclusões e a junção da sincronização rodam na mesma thread do
+gravador, então nunca disputam a trava de escrita com os lotes.
+Linhas que já estão no banco (mesma impressão digital) são puladas e contadas
+em "duplicadas" na resposta, então reenviar um extrato não duplica nada.
+Transações sem "categoria" são categorizadas pelo histórico (src/categorizador.py).
+
+Endpoints:
+    GET    /saude
+    GET    /categorias?tipo=despesa
+    GET    /transacoes?data_inicio=AAAA-MM-DD&data_fim=AAAA-MM-DD
+    GET    /resumo?data_inicio=AAAA-MM-DD&data_fim=AAAA-MM-DD
+    POST   /transacoes           {"descricao": ..., "valor": ..., ...}
+    POST   /transacoes/lote      {"transacoes": [{...}, {...}]}
+    PUT    /transacoes/<id>      {"descricao": ..., "valor": ..., "categoria": ..., "data": ...}
+    DELETE /transacoes/<id>
+    POST   /sync/<operacao>      protocolo de src/sincronizacao.py (python run.py sync <url>)
+
+As rotas /sync/* exigem "Authorization: Bearer <token>" quando a API tem um
+token (FINANCAS_SYNC_TOKEN ou --token); sem token elas só atendem com a API
+ouvindo em localhost.
+"""
+
+import asyncio
+import hmac
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from src.database import DatabaseManager
+from src.sincronizacao import atender
+from src.utils import SIMBOLOS_MOEDA
+
+# Limites de tamanho das requisições e das transações agrupadas
+MAX_CORPO_BYTES = 64 * 1024 * 1024
+MAX_LINHAS_POR_REQUISICAO = 50_000
+MAX_LINHAS_POR_TRANSACAO = 100_000
+
+CAMPOS_OBRIGATORIOS = ('descricao', 'valor', 'categoria', 'tipo', 'data')
+
+HOSTS_LOCAIS = ('127.0.0.1', 'localhost', '::1')
+
+
+class ErroRequisicao(Exception):
+    """Erro causado pela requisição do cliente (vira uma resposta 4xx)"""
+    
+    def __init__(self, mensagem, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def validar_transacao(dados, exigir_tipo=True):
+    """Valida um objeto JSON de transação e retorna a tupla usada em add_transacoes.
+    
+    Com exigir_tipo=True (inclusão) a categoria pode faltar e volta como None:
+    o DatabaseManager escolhe uma pelo histórico. Com exigir_tipo=False
+    (atualização) o tipo pode faltar e volta como None.
+    """
+    if not isinstance(dados, dict):
+        raise ErroRequisicao("Cada transação deve ser um objeto JSON")
+    
+    opcional = 'categoria' if exigir_tipo else 'tipo'
+    obrigatorios = tuple(c for c in CAMPOS_OBRIGATORIOS if c != opcional)
+    faltando = [campo for campo in obrigatorios if dados.get(campo) in (None, '')]
+    if faltando:
+        raise ErroRequisicao(f"Campos obrigatórios ausentes: {', '.join(faltando)}")
+    
+    tipo = dados.get('tipo')
+    if (exigir_tipo or tipo is not None) and tipo not in ('receita', 'despesa'):
+        raise ErroRequisicao("tipo deve ser 'receita' ou 'despesa'")
+    
+    try:
+        valor = float(dados['valor'])
+    except (TypeError, ValueError):
+        raise ErroRequisicao(f"valor inválido: {dados['valor']!r}")
+    if valor == 0:
+        raise ErroRequisicao("valor deve ser diferente de zero")
+    
+    try:
+        data = date.fromisoformat(str(dados['data'])[:10])
+    except ValueError:
+        raise ErroRequisicao(f"data inválida (use AAAA-MM-DD): {dados['data']!r}")
+    
+    moeda = str(dados.get('moeda') or 'BRL').upper()
+    if moeda not in SIMBOLOS_MOEDA:
+        raise ErroRequisicao(f"moeda não suportada: {moeda}")
+    
+    categoria = str(dados['categoria']) if dados.get('categoria') not in (None, '') else None
+    return (str(dados['descricao']), valor, categoria, tipo, data, moeda)
+
+
+class GravadorAgrupado:
+    """Junta as gravações pendentes de várias requisições numa única transação.
+    
+    Cada requisição enfileira suas linhas e aguarda um Future. O gravador pega
+    tudo o que estiver na fila (até MAX_LINHAS_POR_TRANSACAO), grava numa thread
+    dedicada com um único executemany/commit e resolve os Futures com o número
+    de linhas gravadas de cada requisição (duplicadas já no banco são puladas).
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self.fila = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gravador')
+        self.transacoes_gravadas = 0
+        self.duplicadas_ignoradas = 0
+        self.commits = 0
+        self._tarefa = None
+    
+    def iniciar(self):
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+    
+    async def parar(self):
+        if self._tarefa:
+            self._tarefa.cancel()
+        self.executor.shutdown(wait=True)
+    
+    async def gravar(self, linhas):
+        """Enfileira linhas já validadas e espera até estarem gravadas"""
+        futuro = asyncio.get_running_loop().create_future()
+        await self.fila.put((linhas, futuro))
+        return await futuro
+    
+    async def executar(self, funcao, *args):
+        """Roda outra gravação (edição, exclusão, sincronização) na thread do gravador, em série com os lotes"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(funcao, *args))
+    
+    async def _executar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pendentes = [await self.fila.get()]
+            total = len(pendentes[0][0])
+            while not self.fila.empty() and total < MAX_LINHAS_POR_TRANSACAO:
+                item = self.fila.get_nowait()
+                pendentes.append(item)
+                total += len(item[0])
+            
+            lotes = [lote for lote, _ in pendentes]
+            try:
+                gravadas = await loop.run_in_executor(
+                    self.executor, partial(self.db.add_lotes, lotes, ignorar_duplicadas=True)
+                )
+            except Exception as e:
+                for _, futuro in pendentes:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            
+            self.transacoes_gravadas += sum(gravadas)
+            self.duplicadas_ignoradas += total - sum(gravadas)
+            self.commits += 1
+            for (_, futuro), gravadas_lote in zip(pendentes, gravadas):
+                if not futuro.done():
+                    futuro.set_result(gravadas_lote)
+
+
+class ApiServidor:
+    """Servidor HTTP/1.1 mínimo (com keep-alive) sobre asyncio"""
+    
+    def __init__(self, db, host='127.0.0.1', porta=8765, token=None):
+        self.db = db
+        self.host = host
+        self.porta = porta
+        self.token = token
+        self.gravador = GravadorAgrupado(db)
+        self.leitores = ThreadPoolExecutor(max_workers=4, thread_name_prefix='leitor')
+        self.rotas = [
+            ('GET', re.compile(r'^/saude$'), self.saude),
+            ('GET', re.compile(r'^/categorias$'), self.listar_categorias),
+            ('GET', re.compile(r'^/transacoes$'), self.listar_transacoes),
+            ('GET', re.compile(r'^/resumo$'), self.resumo),
+            ('POST', re.compile(r'^/transacoes$'), self.criar_transacao),
+            ('POST', re.compile(r'^/transacoes/lote$'), self.criar_lote),
+            ('PUT', re.compile(r'^/transacoes/(\d+)$'), self.atualizar_transacao),
+            ('DELETE', re.compile(r'^/transacoes/(\d+)$'), self.excluir_transacao),
+            ('POST', re.compile(r'^/sync/(\w+)$'), self.sincronizar),
+        ]
+    
+    async def _ler(self, funcao, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.leitores, lambda: funcao(*args, **kwargs))
+    
+    # Handlers -------------------------------------------------------------
+    
+    async def saude(self, consulta, corpo):
+        return HTTPStatus.OK, {
+            'status': 'ok',
+            'transacoes_gravadas': self.gravador.transacoes_gravadas,
+            'duplicadas_ignoradas': self.gravador.duplicadas_ignoradas,
+            'commits': self.gravador.commits
+        }
+    
+    async def listar_categorias(self, consulta, corpo):
+        categorias = await self._ler(self.db.get_categorias, consulta.get('tipo'))
+        return HTTPStatus.OK, {'categorias': categorias}
+    
+    async def listar_transacoes(self, consulta, corpo):
+        df = await self._ler(self.db.get_transacoes, **self._intervalo(consulta))
+        df['data'] = df['data'].dt.strftime('%Y-%m-%d')
+        df['created_at'] = df['created_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        return HTTPStatus.OK, {'transacoes': json.loads(df.to_json(orient='records'))}
+    
+    async def resumo(self, consulta, corpo):
+        intervalo = self._intervalo(consulta)
+        if not intervalo:
+            raise ErroRequisicao("Informe data_inicio e data_fim")
+        df = await self._ler(self.db.get_resumo, **intervalo)
+        return HTTPStatus.OK, {'resumo': json.loads(df.to_json(orient='records'))}
+    
+    async def criar_transacao(self, consulta, corpo):
+        linha = validar_transacao(corpo)
+        gravadas = await self.gravador.gravar([linha])
+        return HTTPStatus.CREATED, {'gravadas': gravadas, 'duplicadas': 1 - gravadas}
+    
+    async def criar_lote(self, consulta, corpo):
+        transacoes = corpo.get('transacoes') if isinstance(corpo, dict) else corpo
+        if not isinstance(transacoes, list) or not transacoes:
+            raise ErroRequisicao("Envie uma lista não vazia em 'transacoes'")
+        if len(transacoes) > MAX_LINHAS_POR_REQUISICAO:
+            raise ErroRequisicao(
+                f"Máximo de {MAX_LINHAS_POR_REQUISICAO} transações por requisição",
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            )
+        
+        linhas = []
+        for i, dados in enumerate(transacoes):
+            try:
+                linhas.append(validar_transacao(dados))
+            except ErroRequisicao as e:
+                raise ErroRequisicao(f"Transação {i}: {e}")
+        
+        gravadas = await self.gravador.gravar(linhas)
+        return HTTPStatus.CREATED, {'gravadas': gravadas, 'duplicadas': len(linhas) - gravadas}
+    
+    async def atualizar_transacao(self, consulta, corpo, transacao_id):
+        descricao, valor, categoria, _, data, moeda = validar_transacao(corpo, exigir_tipo=False)
+        resultado = await self.gravador.executar(
+            self.db.atualizar_transacao, int(transacao_id), descricao, abs(valor), categoria, data,
+            moeda if corpo.get('moeda') else None
+        )
+        if resultado is None:
+            raise ErroRequisicao(f"Transação {transacao_id} não encontrada", HTTPStatus.NOT_FOUND)
+        if not resultado:
+            raise ErroRequisicao("Erro ao atualizar", HTTPStatus.INTERNAL_SERVER_ERROR)
+        return HTTPStatus.OK, {'atualizada': int(transacao_id)}
+    
+    async def excluir_transacao(self, consulta, corpo, transacao_id):
+        resultado = await self.gravador.executar(self.db.excluir_transacao_db, int(transacao_id))
+        if resultado is None:
+            raise ErroRequisicao(f"Transação {transacao_id} não encontrada", HTTPStatus.NOT_FOUND)
+        if not resultado:
+            raise ErroRequisicao("Erro ao excluir", HTTPStatus.INTERNAL_SERVER_ERROR)
+        return HTTPStatus.OK, {'excluida': int(transacao_id)}
+    
+    async def sincronizar(self, consulta, corpo, operacao):
+        # 'aplicar' grava; as demais operações só leem
+        executar = self.gravador.executar if operacao == 'aplicar' else self._ler
+        try:
+            return HTTPStatus.OK, await executar(atender, self.db, operacao, corpo)
+        except ValueError as e:
+            raise ErroRequisicao(str(e), HTTPStatus.NOT_FOUND)
+        except (KeyError, TypeError) as e:
+            # Corpo sem os campos (ou com os tipos) que a operação espera
+            raise ErroRequisicao(f"Corpo inválido para /sync/{operacao}: {e!r}")
+    
+    def _autorizar_sync(self, cabecalhos):
+        """Confere o token das rotas /sync/*, que leem e gravam o banco inteiro"""
+        if self.token:
+            enviado = cabecalhos.get('authorization', '').removeprefix('Bearer ').strip()
+            if not hmac.compare_digest(enviado.encode('utf-8'), self.token.encode('utf-8')):
+                raise ErroRequisicao("Token de sincronização inválido", HTTPStatus.UNAUTHORIZED)
+        elif self.host not in HOSTS_LOCAIS:
+            raise ErroRequisicao(
+                "Sincronização pela rede exige um token (FINANCAS_SYNC_TOKEN ou --token)", HTTPStatus.FORBIDDEN
+            )
+    
+    def _intervalo(self, consulta):
+        if consulta.get('data_inicio') and consulta.get('data_fim'):
+            return {'data_inicio': consulta['data_inicio'], 'data_fim': consulta['data_fim']}
+        return {}
+    
+    # HTTP -----------------------------------------------------------------
+    
+    async def _despachar(self, metodo, caminho, consulta, corpo_bruto, cabecalhos=None):
+        for metodo_rota, padrao, handler in self.rotas:
+            encontrado = padrao.match(caminho)
+            if encontrado and metodo_rota == metodo:
+                if caminho.startswith('/sync/'):
+                    self._autorizar_sync(cabecalhos or {})
+                try:
+                    corpo = json.loads(corpo_bruto) if corpo_bruto else {}
+                except json.JSONDecodeError as e:
+                    raise ErroRequisicao(f"JSON inválido: {e}")
+                return await handler(consulta, corpo, *encontrado.groups())
+        raise ErroRequisicao(f"Rota não encontrada: {metodo} {caminho}", HTTPStatus.NOT_FOUND)
+    
+    async def _atender(self, reader, writer):
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                metodo, alvo, versao = linha.decode('latin-1').split()
+                
+                cabecalhos = {}
+                while True:
+                    linha = await reader.readline()
+                    if linha in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = linha.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                
+                tamanho = int(cabecalhos.get('content-length', 0))
+                manter_conexao = (
+                    cabecalhos.get('connection', '').lower() != 'close' and versao == 'HTTP/1.1'
+                )
+                
+                if tamanho > MAX_CORPO_BYTES:
+                    status, resposta = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'erro': 'Corpo muito grande'}
+                    manter_conexao = False
+                else:
+                    corpo = await reader.readexactly(tamanho) if tamanho else b''
+                    url = urlsplit(alvo)
+                    consulta = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+                    try:
+                        status, resposta = await self._despachar(metodo, url.path, consulta, corpo, cabecalhos)
+                    except ErroRequisicao as e:
+                        status, resposta = e.status, {'erro': str(e)}
+                    except Exception as e:
+                        status, resposta = HTTPStatus.INTERNAL_SERVER_ERROR, {'erro': str(e)}
+                
+                dados = json.dumps(resposta, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(dados)}\r\n"
+                    f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n"
+                    f"\r\n".encode('latin-1') + dados
+                )
+                await writer.drain()
+                
+                if not manter_conexao:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def servir(self):
+        self.gravador.iniciar()
+        servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        print(f"🔌 API disponível em http://{self.host}:{self.porta}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await self.gravador.parar()
+            self.leitores.shutdown(wait=False)
+
+
+def servir(host='127.0.0.1', porta=8765, db_path=None, token=None):
+    """Inicializa o banco e roda a API até Ctrl+C"""
+    db = DatabaseManager(db_path)
+    db.init_db()
+    try:
+        asyncio.run(ApiServidor(db, host, porta, token).servir())
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
@@ -0,0 +1,354 @@
+"""
+Backups online do banco com a API de backup do SQLite.
+
+A cópia é feita algumas páginas por passo, com uma pausa entre os passos, a
+partir de uma transação de leitura aberta na origem: em WAL quem grava nunca
+espera pela cópia, e a cópia não recomeça quando o banco muda no meio dela.
+
+Snapshots completos (.db) são bancos SQLite prontos para abrir. Snapshots
+incrementais (.delta) guardam só as páginas que mudaram desde o snapshot
+anterior. Cada snapshot tem um manifesto .json com os hashes de todas as
+páginas, usados para calcular o próximo incremental e conferir a restauração.
+
+Uma pasta pode guardar snapshots de vários bancos: cada manifesto registra o
+banco de origem (`db`, o caminho absoluto do arquivo) e cadeias, restauração
+e retenção só consideram os snapshots do mesmo banco, em ordem de criado_em.
+O nome do arquivo do banco aparece só no nome do snapshot, para leitura.
+"""
+
+import hashlib
+import json
+import sqlite3
+import statistics
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+PAGINAS_POR_PASSO = 256
+PAUSA_ENTRE_PASSOS = 0.002
+
+# Sonda de escrita: intervalo entre medições e duração da amostra de referência
+INTERVALO_SONDA = 0.01
+AMOSTRA_REFERENCIA = 0.2
+
+_REGISTRO_DELTA = struct.Struct('>I')
+
+
+class SondaEscrita(threading.Thread):
+    """Mede quanto um escritor espera pela trava de escrita enquanto a sonda roda.
+
+    Usa BEGIN IMMEDIATE + ROLLBACK, que disputa a mesma trava de um INSERT sem
+    alterar nada no banco.
+    """
+
+    def __init__(self, db_path):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.latencias = []
+        self._parar = threading.Event()
+
+    def run(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        try:
+            while not self._parar.is_set():
+                inicio = time.perf_counter()
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("ROLLBACK")
+                self.latencias.append(time.perf_counter() - inicio)
+                self._parar.wait(INTERVALO_SONDA)
+        finally:
+            conn.close()
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+        return self.latencias
+
+
+def _resumo_latencias(latencias):
+    if not latencias:
+        return {'p50_ms': 0.0, 'max_ms': 0.0}
+    return {
+        'p50_ms': round(statistics.median(latencias) * 1000, 3),
+        'max_ms': round(max(latencias) * 1000, 3)
+    }
+
+
+def _medir_referencia(db_path):
+    sonda = SondaEscrita(db_path)
+    sonda.start()
+    time.sleep(AMOSTRA_REFERENCIA)
+    return sonda.parar()
+
+
+def copiar_online(db_path, destino, paginas_por_passo=PAGINAS_POR_PASSO, pausa=PAUSA_ENTRE_PASSOS):
+    """Copia o banco para `destino` com a API de backup, em passos. Retorna o nº de passos."""
+    origem = sqlite3.connect(str(db_path))
+    copia = sqlite3.connect(str(destino))
+    passos = 0
+
+    def progresso(status, restantes, total):
+        nonlocal passos
+        passos += 1
+        time.sleep(pausa)
+
+    try:
+        # Fixa o snapshot de leitura: sem isso a cópia recomeça a cada gravação
+        origem.execute("BEGIN")
+        origem.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        origem.backup(copia, pages=paginas_por_passo, progress=progresso)
+        origem.rollback()
+    finally:
+        copia.close()
+        origem.close()
+    return passos
+
+
+def _tamanho_pagina(caminho):
+    with sqlite3.connect(str(caminho)) as conn:
+        return conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def _ler_paginas(caminho, tamanho_pagina):
+    with open(caminho, 'rb') as arquivo:
+        while True:
+            pagina = arquivo.read(tamanho_pagina)
+            if not pagina:
+                return
+            yield pagina
+
+
+def _hash_pagina(pagina):
+    return hashlib.blake2b(pagina, digest_size=8).hexdigest()
+
+
+def _hashes(caminho, tamanho_pagina):
+    return [_hash_pagina(pagina) for pagina in _ler_paginas(caminho, tamanho_pagina)]
+
+
+def _banco(db_path):
+    """Identifica o banco pelo caminho absoluto: dois financas.db em pastas diferentes são bancos diferentes"""
+    return str(Path(db_path).resolve())
+
+
+def origem_snapshot(manifesto):
+    """Caminho absoluto do banco de origem, ou None em manifestos antigos (sem o caminho)"""
+    origem = manifesto.get('db')
+    return origem if origem and Path(origem).is_absolute() else None
+
+
+def listar_snapshots(pasta, db_path=None):
+    """Lista os manifestos dos snapshots da pasta, do mais antigo ao mais recente.
+
+    Com `db_path`, só os snapshots daquele banco. Snapshots antigos, sem o
+    caminho de origem, não entram em nenhum banco (nem como base de
+    incrementais, nem na retenção); só são restaurados pelo nome.
+    """
+    manifestos = [
+        json.loads(caminho.read_text(encoding='utf-8'))
+        for caminho in Path(pasta).glob('*.json')
+    ]
+    if db_path is not None:
+        manifestos = [m for m in manifestos if origem_snapshot(m) == _banco(db_path)]
+    return sorted(manifestos, key=lambda m: (m['criado_em'], m['nome']))
+
+
+def _cadeia(pasta, nome):
+    """Manifestos do snapshot completo até `nome`, seguindo os `base` dos incrementais"""
+    manifestos = {m['nome']: m for m in listar_snapshots(pasta)}
+    if nome not in manifestos:
+        raise FileNotFoundError(f"Snapshot não encontrado: {nome}")
+    cadeia = [manifestos[nome]]
+    while cadeia[-1]['tipo'] == 'incremental':
+        base = cadeia[-1]['base']
+        if base not in manifestos:
+            raise FileNotFoundError(f"Snapshot base não encontrado: {base}")
+        cadeia.append(manifestos[base])
+    return list(reversed(cadeia))
+
+
+def criar_snapshot(db_path, pasta, incremental=True, paginas_por_passo=PAGINAS_POR_PASSO, pausa=PAUSA_ENTRE_PASSOS):
+    """Cria um snapshot do banco em `pasta` e retorna o manifesto.
+
+    Com incremental=True e um snapshot anterior do mesmo banco na pasta, grava
+    só as páginas alteradas. O manifesto traz a duração e a latência de escrita
+    medida antes e durante a cópia.
+    """
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    anteriores = listar_snapshots(pasta, db_path)
+    anterior = anteriores[-1] if incremental and anteriores else None
+    nome = f"{Path(db_path).stem}-{datetime.now():%Y%m%d-%H%M%S-%f}"
+
+    referencia = _medir_referencia(db_path)
+    sonda = SondaEscrita(db_path)
+    sonda.start()
+    inicio = time.perf_counter()
+
+    try:
+        if anterior is None:
+            arquivo = pasta / f"{nome}.db"
+            passos = copiar_online(db_path, arquivo, paginas_por_passo, pausa)
+            tamanho_pagina = _tamanho_pagina(arquivo)
+            hashes = _hashes(arquivo, tamanho_pagina)
+            paginas_gravadas = len(hashes)
+        else:
+            arquivo = pasta / f"{nome}.delta"
+            with tempfile.TemporaryDirectory(dir=pasta) as tmp:
+                copia = Path(tmp) / 'copia.db'
+                passos = copiar_online(db_path, copia, paginas_por_passo, pausa)
+                tamanho_pagina = _tamanho_pagina(copia)
+                if tamanho_pagina != anterior['tamanho_pagina']:
+                    raise ValueError("Tamanho de página mudou; crie um snapshot completo")
+
+                hashes = []
+                paginas_gravadas = 0
+                with open(arquivo, 'wb') as delta:
+                    for numero, pagina in enumerate(_ler_paginas(copia, tamanho_pagina), start=1):
+                        hash_pagina = _hash_pagina(pagina)
+                        hashes.append(hash_pagina)
+                        if numero > len(anterior['hashes']) or anterior['hashes'][numero - 1] != hash_pagina:
+                            delta.write(_REGISTRO_DELTA.pack(numero))
+                            delta.write(pagina)
+                            paginas_gravadas += 1
+    finally:
+        durante = sonda.parar()
+
+    manifesto = {
+        'nome': nome,
+        'db': _banco(db_path),
+        'tipo': 'completo' if anterior is None else 'incremental',
+        'base': anterior['nome'] if anterior else None,
+        'arquivo': arquivo.name,
+        'criado_em': datetime.now().isoformat(timespec='microseconds'),
+        'duracao_s': round(time.perf_counter() - inicio, 3),
+        'passos': passos,
+        'tamanho_pagina': tamanho_pagina,
+        'paginas': len(hashes),
+        'paginas_gravadas': paginas_gravadas,
+        'bytes': arquivo.stat().st_size,
+        'latencia_escrita': {
+            'antes': _resumo_latencias(referencia),
+            'durante': _resumo_latencias(durante)
+        },
+        'hashes': hashes
+    }
+    (pasta / f"{nome}.json").write_text(json.dumps(manifesto), encoding='utf-8')
+    return manifesto
+
+
+def materializar(pasta, nome, destino):
+    """Monta em `destino` o banco completo do snapshot `nome` e confere os hashes"""
+    pasta = Path(pasta)
+    cadeia = _cadeia(pasta, nome)
+    Path(destino).write_bytes((pasta / cadeia[0]['arquivo']).read_bytes())
+
+    with open(destino, 'r+b') as banco:
+        for manifesto in cadeia[1:]:
+            tamanho_pagina = manifesto['tamanho_pagina']
+            with open(pasta / manifesto['arquivo'], 'rb') as delta:
+                while True:
+                    registro = delta.read(_REGISTRO_DELTA.size)
+                    if not registro:
+                        break
+                    (numero,) = _REGISTRO_DELTA.unpack(registro)
+                    banco.seek((numero - 1) * tamanho_pagina)
+                    banco.write(delta.read(tamanho_pagina))
+            banco.truncate(manifesto['paginas'] * tamanho_pagina)
+
+    if _hashes(destino, cadeia[-1]['tamanho_pagina']) != cadeia[-1]['hashes']:
+        raise ValueError(f"Snapshot {nome} corrompido: hashes não conferem")
+    return cadeia[-1]
+
+
+def restaurar(db_path, pasta, nome=None):
+    """Restaura o snapshot `nome` (padrão: o mais recente deste banco) sobre o banco.
+
+    Recusa snapshots de outro banco (snapshots antigos, sem a origem, só com o
+    mesmo nome de arquivo). O snapshot é montado e verificado num
+    arquivo temporário; antes de sobrescrever, o banco atual ganha um snapshot
+    de segurança na mesma pasta. A cópia usa a API de backup, então conexões
+    abertas passam a ver os dados restaurados. Retorna (manifesto, segundos,
+    manifesto do snapshot de segurança ou None se o banco não existia).
+    """
+    snapshots = listar_snapshots(pasta, db_path)
+    if nome is None:
+        if not snapshots:
+            raise FileNotFoundError(f"Nenhum snapshot de {Path(db_path).name} em {pasta}")
+        nome = snapshots[-1]['nome']
+    elif nome not in {m['nome'] for m in snapshots}:
+        outro = next((m for m in listar_snapshots(pasta) if m['nome'] == nome), None)
+        if outro is None:
+            raise FileNotFoundError(f"Snapshot não encontrado: {nome}")
+        banco_origem = origem_snapshot(outro)
+        if banco_origem is not None:
+            raise ValueError(f"Snapshot {nome} é do banco '{banco_origem}', não de {_banco(db_path)}")
+        if outro['nome'].rsplit('-', 3)[0] != Path(db_path).stem:
+            raise ValueError(f"Snapshot {nome} não é de {Path(db_path).name}")
+    inicio = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        montado = Path(tmp) / 'restauracao.db'
+        manifesto = materializar(pasta, nome, montado)
+
+        origem = sqlite3.connect(str(montado))
+        try:
+            resultado = origem.execute("PRAGMA integrity_check").fetchone()[0]
+            if resultado != 'ok':
+                raise ValueError(f"Snapshot {nome} falhou no integrity_check: {resultado}")
+            seguranca = criar_snapshot(db_path, pasta) if Path(db_path).exists() else None
+            destino = sqlite3.connect(str(db_path), timeout=30)
+            try:
+                origem.backup(destino)
+            finally:
+                destino.close()
+        finally:
+            origem.close()
+
+    return manifesto, time.perf_counter() - inicio, seguranca
+
+
+def aplicar_retencao(pasta, retencao, db_path):
+    """Mantém só as `retencao` cadeias mais recentes (completo + incrementais) do banco.
+
+    Snapshots de outros bancos na mesma pasta não são tocados. Retorna os
+    nomes dos snapshots removidos.
+    """
+    snapshots = listar_snapshots(pasta, db_path)
+    completos = [i for i, m in enumerate(snapshots) if m['tipo'] == 'completo']
+    if len(completos) <= retencao:
+        return []
+
+    # Em ordem de criação, tudo antes do primeiro completo mantido é de cadeias mais antigas
+    removidos = []
+    for manifesto in snapshots[:completos[-retencao]]:
+        (Path(pasta) / manifesto['arquivo']).unlink(missing_ok=True)
+        (Path(pasta) / f"{manifesto['nome']}.json").unlink(missing_ok=True)
+        removidos.append(manifesto['nome'])
+    return removidos
+
+
+def agendar_backups(db_path, pasta, intervalo, retencao, completo_a_cada, ao_concluir=None):
+    """Cria snapshots a cada `intervalo` segundos até ser interrompido.
+
+    Um completo abre cada cadeia, seguido de até `completo_a_cada - 1`
+    incrementais; depois de cada snapshot aplica a retenção. `ao_concluir`
+    recebe (manifesto, removidos).
+    """
+    while True:
+        snapshots = listar_snapshots(pasta, db_path)
+        tamanho_cadeia = 0
+        for manifesto in reversed(snapshots):
+            tamanho_cadeia += 1
+            if manifesto['tipo'] == 'completo':
+                break
+
+        incremental = bool(snapshots) and tamanho_cadeia < completo_a_cada
+        manifesto = criar_snapshot(db_path, pasta, incremental=incremental)
+        removidos = aplicar_retencao(pasta, retencao, db_path)
+        if ao_concluir:
+            ao_concluir(manifesto, removidos)
+        time.sleep(intervalo)
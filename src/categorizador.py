@@ -0,0 +1,66 @@
+"""
+Categorização automática de transações a partir do histórico.
+
+O índice invertido vem da tabela indice_categorias (mantida pelo DatabaseManager
+a cada gravação): para cada (tipo, termo) quantas transações de cada categoria
+têm aquele termo na descrição. Classificar é somar, para os termos da descrição,
+o peso de cada categoria (fração das transações do termo × idf do termo).
+"""
+
+import math
+from collections import Counter, defaultdict
+
+from src.database import termos_descricao
+
+
+class Categorizador:
+    def __init__(self, contagens=()):
+        """`contagens`: linhas (termo, tipo, categoria, contagem) de indice_categorias.
+
+        O termo '' guarda o total de transações de cada categoria.
+        """
+        self.indice = defaultdict(Counter)
+        for termo, tipo, categoria, contagem in contagens:
+            self.indice[(tipo, termo)][categoria] += contagem
+        self._pesos = {}
+
+    def aprender(self, deltas):
+        """Aplica variações {(termo, tipo, categoria): n} (n negativo ao excluir)"""
+        for (termo, tipo, categoria), n in deltas.items():
+            categorias = self.indice[(tipo, termo)]
+            categorias[categoria] += n
+            if categorias[categoria] <= 0:
+                del categorias[categoria]
+        # O idf depende dos totais, então todos os pesos precisam ser recalculados
+        self._pesos.clear()
+
+    def _pesos_termo(self, tipo, termo):
+        chave = (tipo, termo)
+        if chave not in self._pesos:
+            categorias = self.indice.get(chave)
+            if not categorias:
+                self._pesos[chave] = ()
+            else:
+                transacoes_termo = sum(categorias.values())
+                transacoes_tipo = sum(self.indice.get((tipo, ''), Counter()).values())
+                idf = math.log(1 + transacoes_tipo / transacoes_termo)
+                self._pesos[chave] = tuple(
+                    (categoria, idf * n / transacoes_termo) for categoria, n in categorias.items()
+                )
+        return self._pesos[chave]
+
+    def pontuar(self, descricao, tipo):
+        """Pontos de cada categoria para a descrição, do maior para o menor"""
+        pontos = defaultdict(float)
+        for termo in termos_descricao(descricao):
+            for categoria, peso in self._pesos_termo(tipo, termo):
+                pontos[categoria] += peso
+        return sorted(pontos.items(), key=lambda item: item[1], reverse=True)
+
+    def classificar(self, descricao, tipo):
+        """Retorna (categoria, confiança de 0 a 1), ou (None, 0.0) sem termos conhecidos"""
+        pontos = self.pontuar(descricao, tipo)
+        if not pontos:
+            return None, 0.0
+        categoria, melhor = pontos[0]
+        return categoria, melhor / sum(p for _, p in pontos)
@@ -1,11 +1,200 @@
 import sqlite3
+import calendar
+import difflib
+import hashlib
+import re
+import unicodedata
 import pandas as pd
+from collections import Counter, defaultdict
 from contextlib import contextmanager
+from functools import lru_cache
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
 import os
 from pathlib import Path
 
+# Faixa mínima da tabela calendario (dimensão de datas); ela é estendida
+# quando uma transação cai fora dela (_garantir_calendario)
+CALENDARIO_INICIO = '2000-01-01'
+CALENDARIO_FIM = '2050-12-31'
+
+# Taxa de conversão para BRL da linha `alias` pela última cotação até a data
+# da linha (as-of). Sem cotação disponível a taxa fica NULL. O CAST evita que a
+# afinidade NUMERIC de transacoes.data impeça a busca pela chave de cotacoes.
+SQL_TAXA_BRL = '''
+    CASE WHEN {alias}.moeda = 'BRL' THEN 1.0 ELSE (
+        SELECT c.taxa FROM cotacoes c
+        WHERE c.moeda = {alias}.moeda AND c.data <= CAST({alias}.data AS TEXT)
+        ORDER BY c.data DESC LIMIT 1
+    ) END
+'''
+
+# Transações do intervalo agregadas por dia antes da conversão: a busca da
+# cotação é feita uma vez por (data, moeda), não uma vez por linha
+SQL_DIARIO_BRL = '''
+    diario AS (
+        SELECT data, tipo, categoria, moeda, SUM(valor) AS valor
+        FROM transacoes
+        WHERE data BETWEEN ? AND ?
+        GROUP BY data, tipo, categoria, moeda
+    ),
+    diario_brl AS (
+        SELECT d.*, d.valor * ''' + SQL_TAXA_BRL.format(alias='d') + ''' AS valor_brl
+        FROM diario d
+    )
+'''
+
+# Total em BRL de cada (mês, tipo, categoria) do intervalo, gravado em metricas_mensais
+SQL_METRICAS_MES = f'''
+    INSERT INTO metricas_mensais (mes, tipo, categoria, valor)
+    WITH {SQL_DIARIO_BRL}
+    SELECT substr(data, 1, 7), tipo, categoria, COALESCE(SUM(valor_brl), 0)
+    FROM diario_brl
+    GROUP BY substr(data, 1, 7), tipo, categoria
+'''
+
+# Duplicadas aproximadas: mesmo tipo e valor, até N dias de distância e
+# descrição normalizada com similaridade mínima (difflib, 0 a 1)
+JANELA_DUPLICADAS = 3
+SIMILARIDADE_DUPLICADAS = 0.8
+
+# Impressões consultadas por vez no IN (...) da verificação de duplicadas
+LOTE_IMPRESSOES = 500
+
+# Cache de páginas (KB) da conexão que grava lotes (add_lotes)
+CACHE_GRAVACAO_KB = 65536
+
+# Categorização automática: tamanho dos prefixos indexados, confiança mínima
+# para aceitar a sugestão e categoria usada quando não há sugestão confiável
+TAMANHO_PREFIXO = 4
+CONFIANCA_MINIMA = 0.4
+CATEGORIA_PADRAO = 'Outros'
+
+# Sincronização entre cópias do banco (src/sincronizacao.py): colunas trocadas
+# entre os pares, na ordem das listas enviadas
+COLUNAS_SYNC = ('uuid', 'descricao', 'valor', 'categoria', 'tipo', 'data', 'moeda', 'alterado_em')
+
+# Colunas de transacoes; get_transacoes aceita qualquer subconjunto em `colunas`
+COLUNAS_TRANSACOES = ('id', 'descricao', 'valor', 'categoria', 'tipo', 'data', 'moeda', 'created_at')
+
+# Texto livre em strings Arrow quando o pyarrow está instalado (vem com o Streamlit)
+try:
+    import pyarrow  # noqa: F401
+    TIPO_TEXTO = 'string[pyarrow]'
+except ImportError:
+    TIPO_TEXTO = None
+
+
+def para_iso(data):
+    """Normaliza uma data (str, date, datetime ou Timestamp) para 'AAAA-MM-DD'"""
+    if isinstance(data, str):
+        return data[:10]
+    if isinstance(data, datetime):
+        return data.date().isoformat()
+    if isinstance(data, date):
+        return data.isoformat()
+    return pd.Timestamp(data).date().isoformat()
+
+
+_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+# Extratos repetem muito as descrições; o cache evita normalizar de novo
+@lru_cache(maxsize=65536)
+def normalizar_descricao(descricao):
+    """Descrição sem acentos, pontuação e espaços repetidos, em minúsculas"""
+    texto = str(descricao).lower()
+    if not texto.isascii():
+        texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode()
+    return _NAO_ALFANUMERICO.sub(' ', texto).strip()
+
+
+@lru_cache(maxsize=65536)
+def termos_descricao(descricao):
+    """Termos do índice de categorias: palavras da descrição normalizada e seus
+    prefixos ('supermercado' também gera 'supe*'), sem números e letras soltas
+    """
+    termos = set()
+    for palavra in normalizar_descricao(descricao).split():
+        if len(palavra) < 2 or palavra.isdigit():
+            continue
+        termos.add(palavra)
+        if len(palavra) > TAMANHO_PREFIXO:
+            termos.add(palavra[:TAMANHO_PREFIXO] + '*')
+    return frozenset(termos)
+
+
+def impressao_transacao(data, valor, descricao, tipo, moeda):
+    """Impressão digital de (data, valor, descrição normalizada, tipo, moeda) em 64 bits.
+    
+    Duas transações com a mesma impressão são consideradas duplicadas exatas
+    (10 USD e 10 BRL no mesmo dia não são).
+    """
+    chave = f"{para_iso(data)}|{round(abs(float(valor)) * 100)}|{normalizar_descricao(descricao)}|{tipo}|{moeda}"
+    return int.from_bytes(hashlib.blake2b(chave.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+def somar_meses(mes, n):
+    """'AAAA-MM' deslocado de n meses (n negativo volta no tempo)"""
+    ano, numero = map(int, mes.split('-'))
+    total = ano * 12 + numero - 1 + n
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+
+def agora_utc():
+    """Momento atual para alterado_em/excluido_em ('AAAA-MM-DD HH:MM:SS.ffffff', UTC)"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def hash_sync(*campos):
+    """Hash de 64 bits com sinal (cabe num INTEGER do SQLite) dos campos de uma folha"""
+    chave = '\x1f'.join(map(str, campos))
+    return int.from_bytes(hashlib.blake2b(chave.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+def uuid_legado(transacao_id, created_at, data, descricao, valor, moeda):
+    """uuid de uma transação gravada antes da sincronização existir.
+    
+    Vem dos campos da linha, então duas cópias do mesmo banco antigo dão o
+    mesmo uuid à mesma transação e não a trocam como se fossem duas.
+    """
+    chave = '\x1f'.join(map(str, (transacao_id, created_at, data, descricao, float(valor), moeda)))
+    return hashlib.blake2b(chave.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def folha_transacao(uuid, descricao, valor, categoria, tipo, data, moeda, alterado_em):
+    """(mês, balde, hash) de uma transação na árvore de sincronização.
+    
+    O balde é o primeiro dígito hexadecimal do uuid (16 por mês).
+    """
+    return data[:7], uuid[0], hash_sync(uuid, descricao, float(valor), categoria, tipo, data, moeda, alterado_em)
+
+
+def folha_exclusao(uuid, mes):
+    """(mês, balde, hash) da lápide de uma transação excluída"""
+    return mes, uuid[0], hash_sync('excluida', uuid)
+
+
+def compactar_transacoes(df):
+    """Converte o DataFrame lido de transacoes para tipos compactos.
+    
+    tipo, categoria e moeda viram category, datas viram datetime64 (já
+    interpretadas uma única vez aqui) e descricao vira string Arrow.
+    """
+    for coluna in ('tipo', 'categoria', 'moeda'):
+        if coluna in df:
+            df[coluna] = df[coluna].astype('category')
+    if 'data' in df:
+        df['data'] = pd.to_datetime(df['data'], format='%Y-%m-%d')
+    if 'created_at' in df:
+        df['created_at'] = pd.to_datetime(df['created_at'], format='ISO8601')
+    if 'descricao' in df and TIPO_TEXTO:
+        df['descricao'] = df['descricao'].astype(TIPO_TEXTO)
+    return df
+
+
 class DatabaseManager:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, somente_leitura=False):
         if db_path is None:
             # Cria o diretório se não existir
             base_dir = Path(__file__).parent.parent
@@ -15,11 +204,29 @@ class DatabaseManager:
         
         # Garante que o diretório existe
         self.db_path.parent.mkdir(exist_ok=True)
+        
+        # Conexões abertas com mode=ro (ex: workers de relatórios)
+        self.somente_leitura = somente_leitura
+        
+        # Gravações feitas por esta instância (parte de versao_dados)
+        self.escritas = 0
+        
+        # Primeira e última data de calendario lidas por _checar_calendario (só crescem)
+        self._faixa_calendario = None
+        
+        # Categorizador em memória (get_categorizador) e a versão dos dados que ele reflete
+        self._categorizador = None
+        self._versao_categorizador = None
     
     @contextmanager
     def get_connection(self):
-        conn = sqlite3.connect(str(self.db_path))
+        if self.somente_leitura:
+            conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            conn = sqlite3.connect(str(self.db_path))
         conn.row_factory = sqlite3.Row  # CORREÇÃO: usar = em vez de -
+        conn.create_function('impressao_transacao', 5, impressao_transacao, deterministic=True)
+        conn.create_function('uuid_legado', 6, uuid_legado, deterministic=True)
         try:
             yield conn
         finally:
@@ -30,6 +237,9 @@ class DatabaseManager:
         with self.get_connection() as conn:
             c = conn.cursor()
             
+            # WAL: leituras (Streamlit, API) não bloqueiam a gravação e vice-versa
+            c.execute("PRAGMA journal_mode=WAL")
+            
             # Tabela de transações
             c.execute('''
                 CREATE TABLE IF NOT EXISTS transacoes (
@@ -79,53 +289,912 @@ class DatabaseManager:
                 except sqlite3.IntegrityError:
                     pass
             
+            # Datas gravadas com horário ('AAAA-MM-DD HH:MM:SS') ficariam fora
+            # das consultas por intervalo; normaliza tudo para 'AAAA-MM-DD'
+            c.execute("UPDATE transacoes SET data = substr(data, 1, 10) WHERE length(data) > 10")
+            
+            # Moeda original da transação (valores antigos são todos em BRL)
+            self._garantir_coluna(c, 'transacoes', 'moeda', "TEXT NOT NULL DEFAULT 'BRL'")
+            
+            # Índice de intervalo por data, cobrindo as colunas dos resumos
+            c.execute("DROP INDEX IF EXISTS idx_transacoes_data")
+            c.execute('''
+                CREATE INDEX IF NOT EXISTS idx_transacoes_periodo
+                ON transacoes (data, tipo, categoria, moeda, valor)
+            ''')
+            
+            # Impressão digital para detectar duplicadas (preenche as linhas antigas)
+            self._garantir_coluna(c, 'transacoes', 'impressao', 'INTEGER')
+            # Impressões de antes da moeda entrar na chave: uma linha basta para saber, recalcula todas
+            amostra = c.execute('''
+                SELECT impressao = impressao_transacao(data, valor, descricao, tipo, moeda)
+                FROM transacoes WHERE impressao IS NOT NULL LIMIT 1
+            ''').fetchone()
+            c.execute(f'''
+                UPDATE transacoes SET impressao = impressao_transacao(data, valor, descricao, tipo, moeda)
+                {'WHERE impressao IS NULL' if amostra is None or amostra[0] else ''}
+            ''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_transacoes_impressao ON transacoes (impressao)")
+            
+            # Cotações diárias: quantos BRL vale uma unidade da moeda na data
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS cotacoes (
+                    moeda TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    taxa REAL NOT NULL CHECK(taxa > 0),
+                    PRIMARY KEY (moeda, data)
+                ) WITHOUT ROWID
+            ''')
+            
+            self._init_calendario(c)
+            
+            # Índice invertido do categorizador: transações de cada categoria com
+            # o termo na descrição (termo '' = total de transações da categoria)
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS indice_categorias (
+                    termo TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    categoria TEXT NOT NULL,
+                    contagem INTEGER NOT NULL,
+                    PRIMARY KEY (termo, tipo, categoria)
+                ) WITHOUT ROWID
+            ''')
+            if c.execute("SELECT 1 FROM indice_categorias LIMIT 1").fetchone() is None:
+                self._treinar_indice(c)
+            
+            # Sincronização: uuid estável e momento da última alteração de cada
+            # transação, lápides das excluídas e o XOR dos hashes das folhas de
+            # cada (mês, balde), mantido a cada gravação
+            self._garantir_coluna(c, 'transacoes', 'uuid', 'TEXT')
+            self._garantir_coluna(c, 'transacoes', 'alterado_em', 'TEXT')
+            c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transacoes_uuid ON transacoes (uuid)")
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS exclusoes (
+                    uuid TEXT PRIMARY KEY,
+                    mes TEXT NOT NULL,
+                    excluido_em TEXT NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_exclusoes_mes ON exclusoes (mes)")
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS hashes_sync (
+                    mes TEXT NOT NULL,
+                    balde TEXT NOT NULL,
+                    hash INTEGER NOT NULL,
+                    PRIMARY KEY (mes, balde)
+                ) WITHOUT ROWID
+            ''')
+            # Linhas antigas: uuid e alterado_em só dos campos da linha (nada
+            # aleatório nem do relógio), iguais em todas as cópias do banco
+            sem_uuid = c.execute('''
+                UPDATE transacoes SET uuid = uuid_legado(id, created_at, data, descricao, valor, moeda),
+                    alterado_em = COALESCE(alterado_em, created_at || '.000000', '1970-01-01 00:00:00.000000')
+                WHERE uuid IS NULL
+            ''').rowcount
+            if sem_uuid or c.execute("SELECT 1 FROM hashes_sync LIMIT 1").fetchone() is None:
+                self._recalcular_sync(c)
+            
+            # Métricas do dashboard por mês, mantidas a cada gravação (_atualizar_metricas).
+            # Linhas de categoria, total do tipo (categoria '') e taxa de poupança
+            # (tipo 'poupanca': 1 - despesas / receitas), cada uma com o valor do
+            # mês anterior e as médias dos 3 e 12 meses anteriores
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS metricas_mensais (
+                    mes TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    categoria TEXT NOT NULL,
+                    valor REAL NOT NULL,
+                    anterior REAL,
+                    media_3m REAL,
+                    media_12m REAL,
+                    PRIMARY KEY (mes, tipo, categoria)
+                ) WITHOUT ROWID
+            ''')
+            if c.execute("SELECT 1 FROM metricas_mensais LIMIT 1").fetchone() is None:
+                self._reconstruir_metricas(c)
+            
             conn.commit()
     
+    def _garantir_coluna(self, c, tabela, coluna, definicao):
+        """Adiciona uma coluna a uma tabela existente caso ela ainda não exista"""
+        colunas = [linha[1] for linha in c.execute(f"PRAGMA table_info({tabela})")]
+        if coluna not in colunas:
+            c.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+    
+    def _treinar_indice(self, c):
+        """(Re)constrói indice_categorias a partir de todas as transações"""
+        c.execute("DELETE FROM indice_categorias")
+        deltas = self._deltas_indice(c.execute("SELECT descricao, tipo, categoria FROM transacoes"), 1)
+        self._gravar_indice(c, deltas)
+    
+    def _deltas_indice(self, transacoes, sinal):
+        """Variações do índice para (descricao, tipo, categoria) incluídas (1) ou removidas (-1)"""
+        deltas = Counter()
+        for descricao, tipo, categoria in transacoes:
+            deltas[('', tipo, categoria)] += sinal
+            for termo in termos_descricao(descricao):
+                deltas[(termo, tipo, categoria)] += sinal
+        return deltas
+    
+    def _gravar_indice(self, c, deltas):
+        c.executemany(
+            """
+            INSERT INTO indice_categorias (termo, tipo, categoria, contagem) VALUES (?, ?, ?, ?)
+            ON CONFLICT (termo, tipo, categoria) DO UPDATE SET contagem = contagem + excluded.contagem
+            """,
+            [(termo, tipo, categoria, n) for (termo, tipo, categoria), n in deltas.items() if n]
+        )
+        if any(n < 0 for n in deltas.values()):
+            c.execute("DELETE FROM indice_categorias WHERE contagem <= 0")
+    
+    def _recalcular_sync(self, c):
+        """(Re)constrói hashes_sync a partir de todas as transações e lápides"""
+        c.execute("DELETE FROM hashes_sync")
+        folhas = [folha_transacao(*linha) for linha in c.execute(f"SELECT {', '.join(COLUNAS_SYNC)} FROM transacoes")]
+        folhas += [folha_exclusao(uuid, mes) for uuid, mes in c.execute("SELECT uuid, mes FROM exclusoes")]
+        self._gravar_sync(c, self._variacoes_sync(folhas))
+    
+    def _variacoes_sync(self, folhas):
+        """XOR dos hashes das folhas por (mês, balde): incluir e remover são a mesma operação"""
+        variacoes = {}
+        for mes, balde, valor in folhas:
+            variacoes[(mes, balde)] = variacoes.get((mes, balde), 0) ^ valor
+        return variacoes
+    
+    def _gravar_sync(self, c, variacoes):
+        # SQLite não tem XOR: (a | b) & ~(a & b)
+        c.executemany(
+            """
+            INSERT INTO hashes_sync (mes, balde, hash) VALUES (?, ?, ?)
+            ON CONFLICT (mes, balde) DO UPDATE SET hash = (hash | excluded.hash) & ~(hash & excluded.hash)
+            """,
+            [(mes, balde, valor) for (mes, balde), valor in variacoes.items() if valor]
+        )
+    
+    def _reconstruir_metricas(self, c):
+        """(Re)constrói metricas_mensais a partir de todas as transações"""
+        c.execute("DELETE FROM metricas_mensais")
+        self._atualizar_metricas(c, [
+            mes for (mes,) in c.execute("SELECT DISTINCT substr(data, 1, 7) FROM transacoes").fetchall()
+        ])
+    
+    def _atualizar_metricas(self, c, meses):
+        """Recalcula metricas_mensais para os `meses` ('AAAA-MM') que mudaram.
+        
+        Cada mês é reagregado pelo índice de data; anterior e médias são
+        recalculados dele até 12 meses depois, os únicos que o enxergam. As
+        janelas começam no primeiro mês com transações, então se ele mudar os
+        12 meses seguintes a ele também são recalculados.
+        """
+        meses = sorted(set(meses))
+        if not meses:
+            return
+        
+        primeiro_antes = c.execute("SELECT MIN(mes) FROM metricas_mensais").fetchone()[0]
+        for mes in meses:
+            c.execute("DELETE FROM metricas_mensais WHERE mes = ?", (mes,))
+            c.execute(SQL_METRICAS_MES, (f"{mes}-01", f"{mes}-31"))
+            c.execute(
+                """
+                INSERT INTO metricas_mensais (mes, tipo, categoria, valor)
+                SELECT mes, tipo, '', SUM(valor) FROM metricas_mensais WHERE mes = ? GROUP BY tipo
+                """,
+                (mes,)
+            )
+            c.execute(
+                """
+                INSERT INTO metricas_mensais (mes, tipo, categoria, valor)
+                SELECT mes, 'poupanca', '',
+                    1 - COALESCE(SUM(CASE WHEN tipo = 'despesa' THEN valor END), 0)
+                        / SUM(CASE WHEN tipo = 'receita' THEN valor END)
+                FROM metricas_mensais
+                WHERE mes = ? AND categoria = ''
+                GROUP BY mes
+                HAVING SUM(CASE WHEN tipo = 'receita' THEN valor END) > 0
+                """,
+                (mes,)
+            )
+        
+        primeiro = c.execute("SELECT MIN(mes) FROM metricas_mensais").fetchone()[0]
+        if primeiro is None:
+            return
+        ultimo = somar_meses(meses[-1], 12)
+        if primeiro_antes and primeiro_antes != primeiro:
+            ultimo = max(ultimo, somar_meses(max(primeiro_antes, primeiro), 12))
+        
+        series = defaultdict(dict)
+        for mes, tipo, categoria, valor in c.execute(
+            "SELECT mes, tipo, categoria, valor FROM metricas_mensais WHERE mes BETWEEN ? AND ?",
+            (somar_meses(meses[0], -12), ultimo)
+        ).fetchall():
+            series[(tipo, categoria)][mes] = valor
+        
+        def media(serie, janela):
+            # Meses sem transações da categoria contam como zero
+            return sum(serie.get(m, 0) for m in janela) / len(janela) if janela else None
+        
+        def taxa_poupanca(janela):
+            receitas = sum(series[('receita', '')].get(m, 0) for m in janela)
+            despesas = sum(series[('despesa', '')].get(m, 0) for m in janela)
+            return 1 - despesas / receitas if receitas > 0 else None
+        
+        atualizacoes = []
+        for (tipo, categoria), serie in list(series.items()):
+            for mes in serie:
+                if mes < meses[0]:
+                    continue
+                # Janelas só com meses a partir do primeiro mês com transações
+                janelas = [
+                    [m for m in (somar_meses(mes, -k) for k in range(1, n + 1)) if m >= primeiro]
+                    for n in (3, 12)
+                ]
+                if tipo == 'poupanca':
+                    anterior = serie.get(somar_meses(mes, -1))
+                    medias = [taxa_poupanca(janela) for janela in janelas]
+                else:
+                    anterior = media(serie, janelas[0][:1]) if janelas[0] else None
+                    medias = [media(serie, janela) for janela in janelas]
+                atualizacoes.append((anterior, *medias, mes, tipo, categoria))
+        
+        c.executemany(
+            """
+            UPDATE metricas_mensais SET anterior = ?, media_3m = ?, media_12m = ?
+            WHERE mes = ? AND tipo = ? AND categoria = ?
+            """,
+            atualizacoes
+        )
+    
+    def _linha_sync(self, conn, chave, valor):
+        """Colunas de COLUNAS_SYNC da transação com `chave` ('id' ou 'uuid') = valor"""
+        return conn.execute(
+            f"SELECT {', '.join(COLUNAS_SYNC)} FROM transacoes WHERE {chave} = ?", (valor,)
+        ).fetchone()
+    
+    def _apos_gravar(self, deltas):
+        """Depois do commit: conta a escrita e leva as mudanças ao categorizador em memória"""
+        self.escritas += 1
+        if self._categorizador is not None and deltas:
+            self._categorizador.aprender(deltas)
+            self._versao_categorizador = self.versao_dados()
+    
+    def get_categorizador(self):
+        """Categorizador em memória, recarregado se outro processo gravou no banco"""
+        from src.categorizador import Categorizador
+        
+        versao = self.versao_dados()
+        if self._categorizador is None or versao != self._versao_categorizador:
+            with self.get_connection() as conn:
+                self._categorizador = Categorizador(
+                    conn.execute("SELECT termo, tipo, categoria, contagem FROM indice_categorias")
+                )
+            self._versao_categorizador = versao
+        return self._categorizador
+    
+    def sugerir_categoria(self, descricao, tipo, categorizador=None):
+        """Categoria prevista pelo histórico, ou CATEGORIA_PADRAO com pouca confiança"""
+        categoria, confianca = (categorizador or self.get_categorizador()).classificar(descricao, tipo)
+        return categoria if confianca >= CONFIANCA_MINIMA else CATEGORIA_PADRAO
+    
+    def _init_calendario(self, c):
+        """Gera a tabela calendario (uma linha por dia) cobrindo a faixa padrão e as transações"""
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS calendario (
+                data TEXT PRIMARY KEY,
+                ano INTEGER NOT NULL,
+                mes INTEGER NOT NULL,
+                dia INTEGER NOT NULL,
+                trimestre INTEGER NOT NULL,
+                ano_mes TEXT NOT NULL,
+                dia_semana INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
+        self._garantir_calendario(c, CALENDARIO_INICIO, CALENDARIO_FIM)
+        inicio, fim = c.execute("SELECT MIN(data), MAX(data) FROM transacoes").fetchone()
+        if inicio:
+            self._garantir_calendario(c, inicio, fim)
+    
+    def _garantir_calendario(self, c, inicio, fim):
+        """Estende calendario para cobrir os anos inteiros de `inicio` a `fim` ('AAAA-MM-DD').
+        
+        Só gera os dias que faltam antes da primeira e depois da última data.
+        """
+        inicio, fim = f"{inicio[:4]}-01-01", f"{fim[:4]}-12-31"
+        atual = c.execute("SELECT MIN(data), MAX(data) FROM calendario").fetchone()
+        if atual[0] is None:
+            faixas = [(inicio, fim)]
+        else:
+            faixas = [(inicio, atual[0])] if inicio < atual[0] else []
+            faixas += [(atual[1], fim)] if fim > atual[1] else []
+        for faixa in faixas:
+            self._gerar_calendario(c, *faixa)
+    
+    def _gerar_calendario(self, c, inicio, fim):
+        c.execute('''
+            WITH RECURSIVE dias(d) AS (
+                SELECT date(?)
+                UNION ALL
+                SELECT date(d, '+1 day') FROM dias WHERE d < date(?)
+            )
+            INSERT OR IGNORE INTO calendario (data, ano, mes, dia, trimestre, ano_mes, dia_semana)
+            SELECT
+                d,
+                CAST(strftime('%Y', d) AS INTEGER),
+                CAST(strftime('%m', d) AS INTEGER),
+                CAST(strftime('%d', d) AS INTEGER),
+                (CAST(strftime('%m', d) AS INTEGER) + 2) / 3,
+                strftime('%Y-%m', d),
+                CAST(strftime('%w', d) AS INTEGER)
+            FROM dias
+        ''', (inicio, fim))
+    
+    def _checar_calendario(self, inicio, fim):
+        """Recusa intervalos que passam da tabela calendario (os dias de fora sumiriam das séries)"""
+        faixa = self._faixa_calendario
+        if faixa is None or inicio < faixa[0] or fim > faixa[1]:
+            with self.get_connection() as conn:
+                faixa = self._faixa_calendario = tuple(
+                    conn.execute("SELECT MIN(data), MAX(data) FROM calendario").fetchone()
+                )
+        if faixa[0] is None or inicio < faixa[0] or fim > faixa[1]:
+            raise ValueError(f"Intervalo {inicio} a {fim} fora do calendário ({faixa[0]} a {faixa[1]})")
+    
     def execute_query(self, query, params=()):
         """Executa uma query e retorna o cursor"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             conn.commit()
+            self.escritas += 1
             return cursor
     
+    def versao_dados(self):
+        """Identifica o estado atual dos dados sem consultar o banco.
+
+        Muda a cada gravação: as desta instância pelo contador e as de outros
+        processos (API, outra sessão) pelo tamanho/mtime do banco e do WAL.
+        Usada como chave de cache das leituras na interface.
+        """
+        versao = [str(self.db_path), self.escritas]
+        for arquivo in (self.db_path, Path(f"{self.db_path}-wal")):
+            try:
+                info = os.stat(arquivo)
+                versao += [info.st_mtime_ns, info.st_size]
+            except FileNotFoundError:
+                versao += [0, 0]
+        return tuple(versao)
+    
     def fetch_all(self, query, params=()):
         """Executa uma query e retorna um DataFrame"""
         with self.get_connection() as conn:
             return pd.read_sql_query(query, conn, params=params)
     
-    def add_transacao(self, descricao, valor, categoria, tipo, data):
-        """Adiciona uma nova transação"""
+    def _intervalo(self, mes=None, ano=None, data_inicio=None, data_fim=None):
+        """Converte (mes, ano) ou (data_inicio, data_fim) em limites 'AAAA-MM-DD'"""
+        if data_inicio is not None and data_fim is not None:
+            return para_iso(data_inicio), para_iso(data_fim)
+        if mes and ano:
+            ultimo_dia = calendar.monthrange(ano, mes)[1]
+            return date(ano, mes, 1).isoformat(), date(ano, mes, ultimo_dia).isoformat()
+        return None
+    
+    def add_transacao(self, descricao, valor, categoria, tipo, data, moeda='BRL'):
+        """Adiciona uma nova transação (valor na moeda original)"""
+        self.add_lotes([[(descricao, valor, categoria, tipo, data, moeda)]])
+    
+    def add_transacoes(self, transacoes, ignorar_duplicadas=False):
+        """Adiciona várias transações numa única transação do banco.
+
+        Cada item é uma tupla (descricao, valor, categoria, tipo, data, moeda).
+        Com ignorar_duplicadas, pula as que já estão no banco (ver add_lotes).
+        Retorna o número de transações gravadas.
+        """
+        return self.add_lotes([transacoes], ignorar_duplicadas)[0]
+    
+    def add_lotes(self, lotes, ignorar_duplicadas=False):
+        """Grava vários lotes de transações numa única transação do banco.
+        
+        Com ignorar_duplicadas, uma linha só é pulada se a mesma impressão já
+        existe no banco ou num lote anterior: um lote com k cópias de uma linha
+        que já aparece e vezes grava max(0, k - e) delas. Assim reimportar um
+        extrato não duplica nada, mas duas compras iguais no mesmo dia continuam
+        sendo gravadas. Linhas sem categoria recebem a de sugerir_categoria.
+        Retorna quantas linhas de cada lote foram gravadas.
+        """
         query = """
-        INSERT INTO transacoes (descricao, valor, categoria, tipo, data)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO transacoes (descricao, valor, categoria, tipo, data, moeda, uuid, alterado_em, impressao)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        self.execute_query(query, (descricao, abs(valor), categoria, tipo, data))
+        alterado_em = agora_utc()
+        categorizador = None
+        if any(not transacao[2] for transacoes in lotes for transacao in transacoes):
+            categorizador = self.get_categorizador()
+        lotes = [
+            [
+                (descricao, abs(valor), categoria or self.sugerir_categoria(descricao, tipo, categorizador), tipo,
+                 para_iso(data), moeda, uuid4().hex, alterado_em, impressao_transacao(data, valor, descricao, tipo, moeda))
+                for descricao, valor, categoria, tipo, data, moeda in transacoes
+            ]
+            for transacoes in lotes
+        ]
+        
+        with self.get_connection() as conn:
+            # Cache maior: lotes grandes mexem em páginas espalhadas dos índices
+            conn.execute(f"PRAGMA cache_size = -{CACHE_GRAVACAO_KB}")
+            # IMMEDIATE: a verificação e o INSERT enxergam o mesmo estado do banco
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if ignorar_duplicadas:
+                    existentes = self._contar_impressoes(conn, {linha[-1] for lote in lotes for linha in lote})
+                    lotes = [self._sem_duplicadas(lote, existentes) for lote in lotes]
+                linhas = [linha for lote in lotes for linha in lote]
+                conn.executemany(query, linhas)
+                if linhas:
+                    self._garantir_calendario(conn, min(l[4] for l in linhas), max(l[4] for l in linhas))
+                deltas = self._deltas_indice(((l[0], l[3], l[2]) for l in linhas), 1)
+                self._gravar_indice(conn, deltas)
+                self._gravar_sync(conn, self._variacoes_sync(
+                    folha_transacao(l[6], l[0], l[1], l[2], l[3], l[4], l[5], l[7]) for l in linhas
+                ))
+                self._atualizar_metricas(conn, {l[4][:7] for l in linhas})
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        self._apos_gravar(deltas)
+        return [len(lote) for lote in lotes]
     
-    def get_transacoes(self, mes=None, ano=None):
-        """Obtém transações com filtro opcional de mês/ano"""
-        query = "SELECT * FROM transacoes"
-        params = []
+    def _contar_impressoes(self, conn, impressoes):
+        """Quantas vezes cada impressão já aparece no banco (pelo índice de impressao)"""
+        impressoes = list(impressoes)
+        existentes = Counter()
+        for i in range(0, len(impressoes), LOTE_IMPRESSOES):
+            bloco = impressoes[i:i + LOTE_IMPRESSOES]
+            existentes.update(dict(conn.execute(
+                f"SELECT impressao, COUNT(*) FROM transacoes WHERE impressao IN ({','.join('?' * len(bloco))}) "
+                "GROUP BY impressao",
+                bloco
+            ).fetchall()))
+        return existentes
+    
+    def _sem_duplicadas(self, lote, existentes):
+        """Filtra o lote contra `existentes` (Counter) e soma nele o que for gravado"""
+        no_lote = Counter()
+        gravar = []
+        for linha in lote:
+            impressao = linha[-1]
+            no_lote[impressao] += 1
+            if no_lote[impressao] > existentes[impressao]:
+                gravar.append(linha)
+        for impressao, vezes in no_lote.items():
+            existentes[impressao] = max(existentes[impressao], vezes)
+        return gravar
+    
+    def buscar_duplicadas(self, descricao, valor, tipo, data, moeda='BRL', janela_dias=JANELA_DUPLICADAS,
+                          similaridade=SIMILARIDADE_DUPLICADAS):
+        """Transações que parecem ser a mesma que (descricao, valor, tipo, data, moeda).
         
-        if mes and ano:
-            query += " WHERE strftime('%m', data) = ? AND strftime('%Y', data) = ?"
-            params = [f"{mes:02d}", str(ano)]
+        Candidatas: mesmo tipo, moeda e valor, até janela_dias de distância (consulta pelo
+        índice de data). Ficam as com a mesma impressão (`exata`) ou com descrição
+        normalizada parecida, das exatas para as demais.
+        """
+        dia = date.fromisoformat(para_iso(data))
+        valor = abs(float(valor))
+        query = """
+        SELECT id, descricao, valor, categoria, tipo, data, moeda, impressao
+        FROM transacoes
+        WHERE data BETWEEN ? AND ? AND tipo = ? AND moeda = ? AND valor BETWEEN ? AND ?
+        """
+        candidatas = self.fetch_all(query, (
+            para_iso(dia - timedelta(days=janela_dias)), para_iso(dia + timedelta(days=janela_dias)),
+            tipo, moeda, valor - 0.005, valor + 0.005
+        ))
         
-        query += " ORDER BY data DESC"
-        return self.fetch_all(query, params)
+        normalizada = normalizar_descricao(descricao)
+        candidatas['exata'] = candidatas['impressao'] == impressao_transacao(dia, valor, descricao, tipo, moeda)
+        candidatas['similaridade'] = [
+            difflib.SequenceMatcher(None, normalizada, normalizar_descricao(outra)).ratio()
+            for outra in candidatas['descricao']
+        ]
+        duplicadas = candidatas[candidatas['exata'] | (candidatas['similaridade'] >= similaridade)]
+        return duplicadas.drop(columns='impressao').sort_values(
+            ['exata', 'similaridade'], ascending=False
+        ).reset_index(drop=True)
     
-    def get_resumo(self, mes, ano):
-        """Obtém resumo por categoria"""
+    def atualizar_transacao(self, transacao_id, descricao, valor, categoria, data, moeda=None):
+        """Atualiza uma transação existente.
+        
+        Retorna True se atualizou, None se não existe transação com esse id e
+        False se o banco falhou.
+        """
         query = """
+        UPDATE transacoes
+        SET descricao = ?, valor = ?, categoria = ?, data = ?, moeda = COALESCE(?, moeda),
+            impressao = impressao_transacao(?, ?, ?, tipo, COALESCE(?, moeda)), alterado_em = ?
+        WHERE id = ?
+        """
+        data = para_iso(data)
+        try:
+            with self.get_connection() as conn:
+                # IMMEDIATE: a linha lida é a que o UPDATE altera (índice, hashes e métricas consistentes)
+                conn.execute("BEGIN IMMEDIATE")
+                anterior = self._linha_sync(conn, 'id', int(transacao_id))
+                if anterior is None:
+                    conn.rollback()
+                    return None
+                conn.execute(query, (
+                    descricao, valor, categoria, data, moeda,
+                    data, valor, descricao, moeda, agora_utc(), int(transacao_id)
+                ))
+                deltas = self._deltas_indice([(anterior['descricao'], anterior['tipo'], anterior['categoria'])], -1)
+                deltas.update(self._deltas_indice([(descricao, anterior['tipo'], categoria)], 1))
+                self._gravar_indice(conn, deltas)
+                self._garantir_calendario(conn, data, data)
+                self._atualizar_metricas(conn, {anterior['data'][:7], data[:7]})
+                if anterior['uuid']:
+                    atual = self._linha_sync(conn, 'id', int(transacao_id))
+                    self._gravar_sync(conn, self._variacoes_sync([folha_transacao(*anterior), folha_transacao(*atual)]))
+                conn.commit()
+            self._apos_gravar(deltas)
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def excluir_transacao_db(self, transacao_id):
+        """Exclui uma transação do banco (deixando a lápide usada na sincronização).
+        
+        Retorna True se excluiu, None se não existe transação com esse id e
+        False se o banco falhou.
+        """
+        try:
+            with self.get_connection() as conn:
+                # IMMEDIATE: a linha lida é a que o DELETE remove
+                conn.execute("BEGIN IMMEDIATE")
+                anterior = self._linha_sync(conn, 'id', int(transacao_id))
+                if anterior is None:
+                    conn.rollback()
+                    return None
+                conn.execute("DELETE FROM transacoes WHERE id = ?", (int(transacao_id),))
+                deltas = self._deltas_indice([(anterior['descricao'], anterior['tipo'], anterior['categoria'])], -1)
+                self._gravar_indice(conn, deltas)
+                self._atualizar_metricas(conn, {anterior['data'][:7]})
+                if anterior['uuid']:
+                    mes = anterior['data'][:7]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO exclusoes (uuid, mes, excluido_em) VALUES (?, ?, ?)",
+                        (anterior['uuid'], mes, agora_utc())
+                    )
+                    self._gravar_sync(conn, self._variacoes_sync([
+                        folha_transacao(*anterior), folha_exclusao(anterior['uuid'], mes)
+                    ]))
+                conn.commit()
+            self._apos_gravar(deltas)
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def get_hashes_sync(self):
+        """Árvore de sincronização: {mês: {balde: hash}}, sem os baldes vazios"""
+        arvore = defaultdict(dict)
+        with self.get_connection() as conn:
+            for mes, balde, valor in conn.execute("SELECT mes, balde, hash FROM hashes_sync WHERE hash != 0"):
+                arvore[mes][balde] = valor
+        return dict(arvore)
+    
+    def exportar_sync(self, prefixos):
+        """Transações e lápides dos (mês, prefixo do uuid) pedidos, no formato trocado entre pares"""
+        pacote = {'transacoes': [], 'exclusoes': []}
+        with self.get_connection() as conn:
+            for mes, prefixo in prefixos:
+                pacote['transacoes'] += [list(linha) for linha in conn.execute(
+                    f"""
+                    SELECT {', '.join(COLUNAS_SYNC)} FROM transacoes
+                    WHERE data BETWEEN ? AND ? AND substr(uuid, 1, ?) = ?
+                    """,
+                    (f"{mes}-01", f"{mes}-31", len(prefixo), prefixo)
+                )]
+                pacote['exclusoes'] += [list(linha) for linha in conn.execute(
+                    "SELECT uuid, mes, excluido_em FROM exclusoes WHERE mes = ? AND substr(uuid, 1, ?) = ?",
+                    (mes, len(prefixo), prefixo)
+                )]
+        return pacote
+    
+    def aplicar_sync(self, pacote):
+        """Junta ao banco as transações e lápides recebidas de outro par.
+        
+        Lápides sempre vencem. Entre duas versões da mesma transação (mesmo
+        uuid) fica a de alterado_em mais recente, e no empate a de maior hash,
+        então os dois pares chegam ao mesmo estado. Retorna quantas transações
+        foram incluídas, atualizadas e excluídas.
+        """
+        resultado = {'incluidas': 0, 'atualizadas': 0, 'excluidas': 0}
+        deltas = Counter()
+        folhas = []
+        categorias = set()
+        
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for uuid, mes, excluido_em in pacote.get('exclusoes', []):
+                    if conn.execute("SELECT 1 FROM exclusoes WHERE uuid = ?", (uuid,)).fetchone():
+                        continue
+                    anterior = self._linha_sync(conn, 'uuid', uuid)
+                    if anterior:
+                        conn.execute("DELETE FROM transacoes WHERE uuid = ?", (uuid,))
+                        deltas.update(self._deltas_indice(
+                            [(anterior['descricao'], anterior['tipo'], anterior['categoria'])], -1
+                        ))
+                        folhas.append(folha_transacao(*anterior))
+                        resultado['excluidas'] += 1
+                    conn.execute(
+                        "INSERT INTO exclusoes (uuid, mes, excluido_em) VALUES (?, ?, ?)", (uuid, mes, excluido_em)
+                    )
+                    folhas.append(folha_exclusao(uuid, mes))
+                
+                for linha in pacote.get('transacoes', []):
+                    uuid, descricao, valor, categoria, tipo, data, moeda, alterado_em = linha
+                    if conn.execute("SELECT 1 FROM exclusoes WHERE uuid = ?", (uuid,)).fetchone():
+                        continue
+                    nova = folha_transacao(*linha)
+                    anterior = self._linha_sync(conn, 'uuid', uuid)
+                    campos = (descricao, valor, categoria, tipo, data, moeda, alterado_em,
+                              impressao_transacao(data, valor, descricao, tipo, moeda), uuid)
+                    if anterior is None:
+                        conn.execute(
+                            """
+                            INSERT INTO transacoes
+                                (descricao, valor, categoria, tipo, data, moeda, alterado_em, impressao, uuid)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            """,
+                            campos
+                        )
+                        resultado['incluidas'] += 1
+                    else:
+                        antiga = folha_transacao(*anterior)
+                        if (alterado_em, nova[2]) <= (anterior['alterado_em'], antiga[2]):
+                            continue
+                        conn.execute(
+                            """
+                            UPDATE transacoes SET descricao = ?, valor = ?, categoria = ?, tipo = ?, data = ?,
+                                moeda = ?, alterado_em = ?, impressao = ?
+                            WHERE uuid = ?
+                            """,
+                            campos
+                        )
+                        deltas.update(self._deltas_indice(
+                            [(anterior['descricao'], anterior['tipo'], anterior['categoria'])], -1
+                        ))
+                        folhas.append(antiga)
+                        resultado['atualizadas'] += 1
+                    deltas.update(self._deltas_indice([(descricao, tipo, categoria)], 1))
+                    folhas.append(nova)
+                    categorias.add((categoria, tipo))
+                
+                # Categorias novas vindas do outro par aparecem nos filtros e formulários
+                conn.executemany("INSERT OR IGNORE INTO categorias (nome, tipo) VALUES (?, ?)", categorias)
+                datas = [linha[5] for linha in pacote.get('transacoes', [])]
+                if datas:
+                    self._garantir_calendario(conn, min(datas), max(datas))
+                self._gravar_indice(conn, deltas)
+                self._gravar_sync(conn, self._variacoes_sync(folhas))
+                # Lápides também entram: o mês delas é o da transação excluída
+                self._atualizar_metricas(conn, {mes for mes, _, _ in folhas})
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        self._apos_gravar(deltas)
+        return resultado
+    
+    def get_transacoes(self, mes=None, ano=None, data_inicio=None, data_fim=None, limite=None, colunas=None):
+        """Obtém transações com filtro opcional de mês/ano ou intervalo de datas.
+
+        `valor` fica na moeda original e `valor_brl` traz o valor convertido
+        (ver _taxas_brl). Com `limite`, retorna só as N mais recentes. `colunas`
+        restringe as colunas lidas (valor_brl sempre vem). O DataFrame volta com
+        tipos compactos (ver compactar_transacoes).
+        """
+        colunas = colunas or COLUNAS_TRANSACOES
+        invalidas = set(colunas) - set(COLUNAS_TRANSACOES)
+        if invalidas:
+            raise ValueError(f"Colunas inválidas: {', '.join(sorted(invalidas))}")
+        
+        # A conversão usa valor, moeda e data mesmo quando elas não estão em `colunas`
+        lidas = list(colunas) + [coluna for coluna in ('valor', 'moeda', 'data') if coluna not in colunas]
+        query = f"SELECT {', '.join(f't.{coluna}' for coluna in lidas)} FROM transacoes t"
+        params = []
+        
+        intervalo = self._intervalo(mes, ano, data_inicio, data_fim)
+        if intervalo:
+            query += " WHERE t.data BETWEEN ? AND ?"
+            params = list(intervalo)
+        
+        query += " ORDER BY t.data DESC, t.id DESC"
+        if limite:
+            query += " LIMIT ?"
+            params = list(params) + [int(limite)]
+        df = compactar_transacoes(self.fetch_all(query, params))
+        df['valor_brl'] = df['valor'] * self._taxas_brl(df['moeda'], df['data'])
+        return df.drop(columns=lidas[len(colunas):])
+    
+    def _taxas_brl(self, moedas, datas):
+        """Taxa para BRL de cada linha pela última cotação até a data (as-of).
+        
+        Um único pd.merge_asof por (moeda, data) contra as cotações lidas de uma
+        vez; linhas em BRL têm taxa 1 e as sem cotação anterior ficam com NaN.
+        """
+        taxas = pd.Series(1.0, index=moedas.index)
+        estrangeiras = (moedas != 'BRL').to_numpy()
+        if not estrangeiras.any():
+            return taxas
+        
+        linhas = pd.DataFrame({
+            'linha': moedas.index[estrangeiras],
+            'moeda': moedas[estrangeiras].astype(str).to_numpy(),
+            'data': datas[estrangeiras].to_numpy()
+        }).sort_values('data', kind='stable')
+        nomes = linhas['moeda'].unique().tolist()
+        cotacoes = self.fetch_all(
+            f"SELECT moeda, data, taxa FROM cotacoes WHERE moeda IN ({','.join('?' * len(nomes))}) AND data <= ? "
+            "ORDER BY data",
+            nomes + [para_iso(linhas['data'].iloc[-1])]
+        )
+        cotacoes['data'] = pd.to_datetime(cotacoes['data'], format='%Y-%m-%d')
+        # Sem nenhuma cotação a coluna viria como object; a taxa é sempre float (NaN se faltar)
+        cotacoes['taxa'] = cotacoes['taxa'].astype(float)
+        
+        convertidas = pd.merge_asof(linhas, cotacoes, on='data', by='moeda')
+        taxas.loc[convertidas['linha'].to_numpy()] = convertidas['taxa'].to_numpy(dtype=float)
+        return taxas
+    
+    def get_resumo(self, mes=None, ano=None, data_inicio=None, data_fim=None):
+        """Obtém resumo por categoria (total convertido para BRL)"""
+        query = f"""
+        WITH {SQL_DIARIO_BRL}
         SELECT 
             tipo,
             categoria,
-            SUM(valor) as total
-        FROM transacoes 
-        WHERE strftime('%m', data) = ? AND strftime('%Y', data) = ?
+            SUM(valor_brl) as total
+        FROM diario_brl
         GROUP BY tipo, categoria
         """
-        return self.fetch_all(query, (f"{mes:02d}", str(ano)))
+        return self.fetch_all(query, self._intervalo(mes, ano, data_inicio, data_fim))
+    
+    def get_resumo_moedas(self, mes=None, ano=None, data_inicio=None, data_fim=None):
+        """Obtém totais por tipo e moeda, no valor original e convertido para BRL"""
+        query = f"""
+        WITH {SQL_DIARIO_BRL}
+        SELECT
+            tipo,
+            moeda,
+            SUM(valor) AS total_original,
+            SUM(valor_brl) AS total_brl,
+            SUM(valor_brl IS NULL) AS dias_sem_cotacao
+        FROM diario_brl
+        GROUP BY tipo, moeda
+        ORDER BY tipo, moeda
+        """
+        return self.fetch_all(query, self._intervalo(mes, ano, data_inicio, data_fim))
+    
+    def get_totais_mensais(self, data_inicio, data_fim):
+        """Obtém receitas, despesas e saldo de cada mês do intervalo numa única consulta.
+
+        Os meses vêm da tabela calendario, então meses sem transações aparecem com zero.
+        Os valores são convertidos para BRL.
+        """
+        query = f"""
+        WITH {SQL_DIARIO_BRL},
+        meses AS (
+            SELECT ano_mes, MIN(ano) AS ano, MIN(mes) AS mes
+            FROM calendario
+            WHERE data BETWEEN ? AND ?
+            GROUP BY ano_mes
+        ),
+        totais AS (
+            SELECT
+                substr(data, 1, 7) AS ano_mes,
+                SUM(CASE WHEN tipo = 'receita' THEN valor_brl ELSE 0 END) AS receitas,
+                SUM(CASE WHEN tipo = 'despesa' THEN valor_brl ELSE 0 END) AS despesas
+            FROM diario_brl
+            GROUP BY substr(data, 1, 7)
+        )
+        SELECT
+            m.ano_mes,
+            m.ano,
+            m.mes,
+            COALESCE(t.receitas, 0) AS receitas,
+            COALESCE(t.despesas, 0) AS despesas,
+            COALESCE(t.receitas, 0) - COALESCE(t.despesas, 0) AS saldo
+        FROM meses m
+        LEFT JOIN totais t ON t.ano_mes = m.ano_mes
+        ORDER BY m.ano_mes
+        """
+        inicio, fim = para_iso(data_inicio), para_iso(data_fim)
+        self._checar_calendario(inicio, fim)
+        return self.fetch_all(query, (inicio, fim, inicio, fim))
+    
+    def get_saldo_diario(self, data_inicio, data_fim):
+        """Obtém o movimento e o saldo acumulado de cada dia do intervalo, em BRL.
+        
+        O saldo parte do acumulado de todas as transações anteriores a data_inicio
+        e é somado dia a dia por uma window function. Dias sem transações vêm da
+        tabela calendario, com movimento zero.
+        """
+        query = f"""
+        WITH {SQL_DIARIO_BRL},
+        movimento AS (
+            SELECT
+                data,
+                SUM(CASE WHEN tipo = 'receita' THEN valor_brl ELSE -valor_brl END) AS movimento
+            FROM diario_brl
+            GROUP BY data
+        ),
+        dias AS (
+            SELECT c.data, COALESCE(m.movimento, 0) AS movimento
+            FROM calendario c
+            LEFT JOIN movimento m ON m.data = c.data
+            WHERE c.data BETWEEN ? AND ?
+        )
+        SELECT
+            data,
+            movimento,
+            (SELECT COALESCE(SUM(movimento), 0) FROM movimento WHERE data < ?)
+                + SUM(movimento) OVER (ORDER BY data ROWS UNBOUNDED PRECEDING) AS saldo
+        FROM dias
+        ORDER BY data
+        """
+        inicio, fim = para_iso(data_inicio), para_iso(data_fim)
+        self._checar_calendario(inicio, fim)
+        return self.fetch_all(query, ('0001-01-01', fim, inicio, fim, inicio))
+    
+    def get_metricas(self, data_fim, meses=12):
+        """Métricas pré-calculadas (metricas_mensais) dos `meses` meses até o de `data_fim`.
+        
+        Uma leitura pela chave primária, sem agregar o histórico de transações.
+        """
+        mes = para_iso(data_fim)[:7]
+        return self.fetch_all(
+            "SELECT * FROM metricas_mensais WHERE mes BETWEEN ? AND ? ORDER BY mes, tipo, categoria",
+            (somar_meses(mes, 1 - meses), mes)
+        )
+    
+    def importar_cotacoes_csv(self, caminho):
+        """Importa cotações diárias de um CSV com colunas data, moeda e taxa.
+
+        `taxa` é quantos BRL vale uma unidade da moeda. Cotações já existentes
+        para a mesma data e moeda são substituídas. Retorna o número de linhas lidas.
+        """
+        cotacoes = pd.read_csv(caminho, dtype={'moeda': str})
+        cotacoes['data'] = pd.to_datetime(cotacoes['data']).dt.strftime('%Y-%m-%d')
+        cotacoes['moeda'] = cotacoes['moeda'].str.strip().str.upper()
+        
+        with self.get_connection() as conn:
+            existentes = {(moeda, data): taxa for moeda, data, taxa in conn.execute("SELECT moeda, data, taxa FROM cotacoes")}
+            novas = [
+                linha for linha in cotacoes[['moeda', 'data', 'taxa']].itertuples(index=False, name=None)
+                if existentes.get(linha[:2]) != linha[2]
+            ]
+            conn.executemany("INSERT OR REPLACE INTO cotacoes (moeda, data, taxa) VALUES (?, ?, ?)", novas)
+            
+            # A cotação vale até a próxima, então mudam as métricas de todos os meses
+            # seguintes com transações na moeda (o app reimporta o CSV a cada sessão,
+            # mas só recalcula quando alguma cotação mudou)
+            for moeda in {moeda for moeda, _, _ in novas}:
+                inicio = min(data for m, data, _ in novas if m == moeda)
+                self._atualizar_metricas(conn, [mes for (mes,) in conn.execute(
+                    "SELECT DISTINCT substr(data, 1, 7) FROM transacoes WHERE data >= ? AND moeda = ?", (inicio, moeda)
+                ).fetchall()])
+            conn.commit()
+        self.escritas += 1
+        return len(cotacoes)
+    
+    def get_anos_disponiveis(self):
+        """Obtém os anos entre a transação mais antiga e o ano atual"""
+        with self.get_connection() as conn:
+            primeira = conn.execute("SELECT MIN(data) FROM transacoes").fetchone()[0]
+        ano_atual = datetime.now().year
+        ano_inicial = int(primeira[:4]) if primeira else ano_atual
+        return list(range(min(ano_inicial, ano_atual - 2), ano_atual + 1))
     
     def get_categorias(self, tipo=None):
         """Obtém lista de categorias"""
@@ -0,0 +1,191 @@
+"""
+Geração offline de relatórios mensais em HTML (dashboard, extrato e evolução).
+
+Cada mês vira um arquivo AAAA-MM.html independente. Os meses são distribuídos
+entre processos; cada worker abre o banco somente leitura.
+"""
+
+import calendar
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from dateutil.relativedelta import relativedelta
+
+from src.analytics import COLUNAS_EXTRATO, Analytics
+from src.database import DatabaseManager
+from src.utils import calcular_periodo, formatar_moeda
+
+ESTILO = """
+body { font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 2rem auto; max-width: 1100px; color: #2c3e50; }
+h1 { margin-bottom: 0; }
+.metricas { display: flex; gap: 1rem; margin: 1.5rem 0; }
+.metrica { flex: 1; padding: 1rem; border-radius: 8px; background: #f4f6f7; }
+.metrica span { display: block; font-size: 0.85rem; color: #7f8c8d; }
+.metrica strong { font-size: 1.4rem; }
+.graficos { display: flex; flex-wrap: wrap; }
+.graficos > div { flex: 1 1 500px; }
+table { border-collapse: collapse; width: 100%; font-size: 0.9rem; }
+th, td { padding: 0.35rem 0.6rem; border-bottom: 1px solid #e5e8e8; text-align: left; }
+"""
+
+# Banco do worker (um por processo, aberto em _iniciar_worker)
+_db = None
+
+
+def listar_meses(inicio, fim):
+    """Lista (ano, mes) de todos os meses entre duas datas, inclusive"""
+    atual = date(inicio.year, inicio.month, 1)
+    meses = []
+    while atual <= fim:
+        meses.append((atual.year, atual.month))
+        atual += relativedelta(months=1)
+    return meses
+
+
+def _figura_html(fig):
+    if fig is None:
+        return "<p>Sem dados para o gráfico.</p>"
+    return fig.to_html(full_html=False, include_plotlyjs=False)
+
+
+def _script_plotlyjs(plotlyjs):
+    """Tag <script> do plotly.js: 'directory' (arquivo ao lado), 'cdn' ou 'inline'"""
+    if plotlyjs == 'inline':
+        from plotly.offline import get_plotlyjs
+        return f"<script>{get_plotlyjs()}</script>"
+    if plotlyjs == 'cdn':
+        from plotly.offline import get_plotlyjs_version
+        return f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+    return '<script src="plotly.min.js"></script>'
+
+
+def gerar_relatorio_mes(db, ano, mes, destino, plotlyjs='directory'):
+    """Gera o relatório HTML de um mês e retorna o caminho do arquivo"""
+    analytics = Analytics(db)
+    data_inicio, data_fim = calcular_periodo(mes, ano)
+    
+    transacoes = db.get_transacoes(data_inicio=data_inicio, data_fim=data_fim, colunas=COLUNAS_EXTRATO)
+    resumo = db.get_resumo(data_inicio=data_inicio, data_fim=data_fim)
+    resumo_moedas = db.get_resumo_moedas(data_inicio=data_inicio, data_fim=data_fim)
+    
+    receitas = transacoes[transacoes['tipo'] == 'receita']['valor_brl'].sum()
+    despesas = transacoes[transacoes['tipo'] == 'despesa']['valor_brl'].sum()
+    saldo = receitas - despesas
+    margem = (saldo / receitas * 100) if receitas > 0 else 0
+    
+    fig_evolucao, _ = analytics.gerar_grafico_evolucao(mes, ano, meses_anteriores=6)
+    graficos = [
+        _figura_html(analytics.gerar_grafico_pizza_despesas(resumo)),
+        _figura_html(analytics.gerar_grafico_comparacao(receitas, despesas)),
+        _figura_html(fig_evolucao)
+    ]
+    
+    extrato = analytics.gerar_extrato_com_saldo(transacoes)
+    tabela_extrato = (
+        extrato.to_html(index=False, border=0) if not extrato.empty
+        else "<p>Nenhuma transação no mês.</p>"
+    )
+    
+    tabela_moedas = ""
+    if (resumo_moedas['moeda'] != 'BRL').any():
+        tabela_moedas = (
+            "<h2>💱 Totais por Moeda</h2>"
+            + analytics.gerar_tabela_moedas(resumo_moedas).to_html(index=False, border=0)
+        )
+    
+    titulo = f"{calendar.month_name[mes]}/{ano}"
+    metricas = "".join(
+        f'<div class="metrica"><span>{rotulo}</span><strong>{html.escape(valor)}</strong></div>'
+        for rotulo, valor in (
+            ("💰 Receitas", formatar_moeda(receitas)),
+            ("💸 Despesas", formatar_moeda(despesas)),
+            ("⚖️ Saldo", formatar_moeda(saldo)),
+            ("📈 Margem", f"{margem:.1f}%")
+        )
+    )
+    
+    pagina = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Extrato {titulo}</title>
+<style>{ESTILO}</style>
+{_script_plotlyjs(plotlyjs)}
+</head>
+<body>
+<h1>📊 Extrato Mensal - {titulo}</h1>
+<p>{len(transacoes)} transações de {data_inicio:%d/%m/%Y} a {data_fim:%d/%m/%Y}</p>
+<div class="metricas">{metricas}</div>
+<div class="graficos"><div>{graficos[0]}</div><div>{graficos[1]}</div></div>
+{graficos[2]}
+{tabela_moedas}
+<h2>📋 Extrato com Saldo Acumulado</h2>
+{tabela_extrato}
+</body>
+</html>
+"""
+    caminho = Path(destino) / f"{ano}-{mes:02d}.html"
+    caminho.write_text(pagina, encoding='utf-8')
+    return caminho
+
+
+def _iniciar_worker(db_path):
+    global _db
+    _db = DatabaseManager(db_path, somente_leitura=True)
+
+
+def _gerar_no_worker(tarefa):
+    ano, mes, destino, plotlyjs = tarefa
+    return gerar_relatorio_mes(_db, ano, mes, destino, plotlyjs)
+
+
+def gerar_indice(meses, destino):
+    """Gera index.html com links para os relatórios"""
+    itens = "\n".join(
+        f'<li><a href="{ano}-{mes:02d}.html">{calendar.month_name[mes]}/{ano}</a></li>'
+        for ano, mes in sorted(meses, reverse=True)
+    )
+    caminho = Path(destino) / "index.html"
+    caminho.write_text(
+        f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f'<title>Relatórios</title><style>{ESTILO}</style></head>'
+        f'<body><h1>📁 Relatórios Mensais</h1><ul>{itens}</ul></body></html>',
+        encoding='utf-8'
+    )
+    return caminho
+
+
+def gerar_relatorios(db_path, inicio, fim, destino, processos=None, plotlyjs='directory'):
+    """Gera os relatórios de todos os meses entre inicio e fim.
+    
+    Com processos=1 roda no processo atual. Retorna (arquivos, segundos).
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    meses = listar_meses(inicio, fim)
+    processos = processos or os.cpu_count() or 1
+    
+    # Com 'directory' o plotly.min.js é gravado uma vez na pasta e referenciado
+    if plotlyjs == 'directory':
+        from plotly.offline import get_plotlyjs
+        (destino / 'plotly.min.js').write_text(get_plotlyjs(), encoding='utf-8')
+    
+    tarefas = [(ano, mes, str(destino), plotlyjs) for ano, mes in meses]
+    inicio_execucao = time.perf_counter()
+    
+    if processos == 1:
+        _iniciar_worker(db_path)
+        arquivos = [_gerar_no_worker(tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processos, initializer=_iniciar_worker, initargs=(str(db_path),)
+        ) as executor:
+            chunksize = max(1, len(tarefas) // (processos * 4))
+            arquivos = list(executor.map(_gerar_no_worker, tarefas, chunksize=chunksize))
+    
+    gerar_indice(meses, destino)
+    return arquivos, time.perf_counter() - inicio_execucao
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+Sincronização incremental entre duas cópias do banco (ex: notebook e servidor).
+
+Cada transação tem um uuid estável e cada exclusão deixa uma lápide. As folhas
+(transações e lápides) são agrupadas por mês e, dentro do mês, em 16 baldes
+pelo primeiro dígito do uuid; a cada gravação o DatabaseManager atualiza o XOR
+dos hashes das folhas do balde (tabela hashes_sync). O hash de um mês é o XOR
+dos seus baldes e a raiz é o hash da lista de meses, como numa árvore de Merkle:
+
+1. raízes iguais: nada a fazer;
+2. senão, compara os hashes dos meses e, nos meses diferentes, os dos baldes;
+3. nos baldes diferentes desce mais um nível, os sub-baldes do segundo dígito
+   do uuid (calculados na hora a partir das linhas do balde);
+4. troca só as linhas dos sub-baldes diferentes e cada lado aplica as do outro.
+
+A junção (DatabaseManager.aplicar_sync) é determinística, então os dois lados
+terminam com a mesma raiz. O outro lado é um Par: outro arquivo .db (ParLocal)
+ou a API de outra máquina (ParHttp, em POST /sync/<operacao>, autenticado
+pelo token compartilhado FINANCAS_SYNC_TOKEN).
+"""
+
+import hashlib
+import json
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from functools import reduce
+from operator import xor
+
+from src.database import folha_exclusao, folha_transacao
+
+_JSON_COMPACTO = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+def hashes_meses(arvore):
+    """{mês: hash} a partir de {mês: {balde: hash}}"""
+    return {mes: reduce(xor, baldes.values(), 0) for mes, baldes in arvore.items()}
+
+
+def raiz(arvore):
+    """Hash de todo o banco: igual nos dois pares só se todos os meses forem iguais"""
+    meses = ';'.join(f"{mes}:{valor}" for mes, valor in sorted(hashes_meses(arvore).items()) if valor)
+    return hashlib.blake2b(meses.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def hashes_sub_baldes(pacote):
+    """{2º dígito do uuid: hash} das folhas de um pacote de exportar_sync"""
+    hashes = {}
+    folhas = [(uuid, folha_transacao(uuid, *resto)) for uuid, *resto in pacote['transacoes']]
+    folhas += [(uuid, folha_exclusao(uuid, mes)) for uuid, mes, _ in pacote['exclusoes']]
+    for uuid, (_, _, valor) in folhas:
+        hashes[uuid[1]] = hashes.get(uuid[1], 0) ^ valor
+    return hashes
+
+
+def _diferentes(locais, remotos):
+    return sorted(chave for chave in locais.keys() | remotos.keys() if locais.get(chave, 0) != remotos.get(chave, 0))
+
+
+def atender(db, operacao, dados):
+    """Responde a uma operação do protocolo (usada pelo ParLocal e pela API)"""
+    if operacao == 'raiz':
+        return {'raiz': raiz(db.get_hashes_sync())}
+    if operacao == 'meses':
+        return {'meses': hashes_meses(db.get_hashes_sync())}
+    if operacao == 'baldes':
+        arvore = db.get_hashes_sync()
+        return {'baldes': {mes: arvore.get(mes, {}) for mes in dados['meses']}}
+    if operacao == 'sub_baldes':
+        return {'sub_baldes': [hashes_sub_baldes(db.exportar_sync([balde])) for balde in dados['baldes']]}
+    if operacao == 'exportar':
+        return db.exportar_sync(dados['prefixos'])
+    if operacao == 'aplicar':
+        return db.aplicar_sync(dados)
+    raise ValueError(f"Operação de sincronização desconhecida: {operacao}")
+
+
+class Par(ABC):
+    """A outra cópia do banco. Conta as chamadas e os bytes trocados (JSON)."""
+    
+    def __init__(self):
+        self.chamadas = 0
+        self.bytes_enviados = 0
+        self.bytes_recebidos = 0
+    
+    def chamar(self, operacao, dados=None):
+        corpo = json.dumps(dados or {}, **_JSON_COMPACTO).encode('utf-8')
+        resposta = self._transportar(operacao, corpo)
+        self.chamadas += 1
+        self.bytes_enviados += len(corpo)
+        self.bytes_recebidos += len(resposta)
+        return json.loads(resposta)
+    
+    @abstractmethod
+    def _transportar(self, operacao, corpo):
+        """Entrega o corpo JSON de uma operação ao par e retorna os bytes da resposta"""
+
+
+class ParLocal(Par):
+    """Outro arquivo .db na mesma máquina, com as mesmas mensagens da rede"""
+    
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+    
+    def _transportar(self, operacao, corpo):
+        return json.dumps(atender(self.db, operacao, json.loads(corpo)), **_JSON_COMPACTO).encode('utf-8')
+
+
+class ParHttp(Par):
+    """Cópia servida pela API de outra máquina (python run.py api)"""
+    
+    def __init__(self, url, token=None, timeout=300):
+        super().__init__()
+        self.url = url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+    
+    def _transportar(self, operacao, corpo):
+        cabecalhos = {'Content-Type': 'application/json'}
+        if self.token:
+            cabecalhos['Authorization'] = f"Bearer {self.token}"
+        requisicao = urllib.request.Request(f"{self.url}/sync/{operacao}", data=corpo, headers=cabecalhos)
+        with urllib.request.urlopen(requisicao, timeout=self.timeout) as resposta:
+            return resposta.read()
+
+
+def sincronizar(db, par):
+    """Sincroniza o banco local `db` com `par` nos dois sentidos.
+    
+    Retorna um resumo com os meses e baldes trocados, o que cada lado
+    aplicou, os bytes trocados com o par e se as raízes terminaram iguais.
+    """
+    inicio = time.perf_counter()
+    resumo = {'meses': 0, 'baldes': 0, 'prefixos': 0, 'enviadas': {}, 'recebidas': {}}
+    
+    arvore = db.get_hashes_sync()
+    if par.chamar('raiz')['raiz'] != raiz(arvore):
+        meses = _diferentes(hashes_meses(arvore), par.chamar('meses')['meses'])
+        remotos = par.chamar('baldes', {'meses': meses})['baldes']
+        baldes = [
+            [mes, balde]
+            for mes in meses
+            for balde in _diferentes(arvore.get(mes, {}), remotos[mes])
+        ]
+        
+        # Balde que só um lado tem vai inteiro; nos outros compara os sub-baldes
+        inteiros = [[mes, balde] for mes, balde in baldes if not (balde in arvore.get(mes, {}) and balde in remotos[mes])]
+        parciais = [b for b in baldes if b not in inteiros]
+        subs_locais = atender(db, 'sub_baldes', {'baldes': parciais})['sub_baldes']
+        subs_remotos = par.chamar('sub_baldes', {'baldes': parciais})['sub_baldes'] if parciais else []
+        prefixos = inteiros + [
+            [mes, balde + sub]
+            for (mes, balde), locais, remotos_balde in zip(parciais, subs_locais, subs_remotos)
+            for sub in _diferentes(locais, remotos_balde)
+        ]
+        
+        # Os dois lados exportam antes de aplicar: cada um recebe o estado do outro
+        daqui = db.exportar_sync(prefixos)
+        de_la = par.chamar('exportar', {'prefixos': prefixos})
+        resumo.update(
+            meses=len(meses),
+            baldes=len(baldes),
+            prefixos=len(prefixos),
+            enviadas=par.chamar('aplicar', daqui),
+            recebidas=db.aplicar_sync(de_la)
+        )
+    
+    resumo.update(
+        sincronizado=par.chamar('raiz')['raiz'] == raiz(db.get_hashes_sync()),
+        chamadas=par.chamadas,
+        bytes_enviados=par.bytes_enviados,
+        bytes_recebidos=par.bytes_recebidos,
+        segundos=round(time.perf_counter() - inicio, 3)
+    )
+    return resumo
\ No newline at end of file
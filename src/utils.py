@@ -1,14 +1,22 @@
 import streamlit as st
 import pandas as pd  # ADICIONAR ESTA LINHA
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import calendar
 from dateutil.relativedelta import relativedelta
 
-def formatar_moeda(valor):
-    """Formata valor como moeda brasileira"""
+# Moedas aceitas nas transações e seus símbolos
+SIMBOLOS_MOEDA = {
+    'BRL': 'R$',
+    'USD': 'US$',
+    'EUR': '€'
+}
+
+def formatar_moeda(valor, moeda='BRL'):
+    """Formata valor no padrão brasileiro com o símbolo da moeda"""
+    simbolo = SIMBOLOS_MOEDA.get(moeda, moeda)
     if pd.isna(valor) or valor == 0:
-        return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        return f"{simbolo} 0,00"
+    return f"{simbolo} {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
 
 def formatar_data(data):
     """Formata data para formato brasileiro"""
@@ -37,4 +45,48 @@ def inicializar_session_state():
     if 'db' not in st.session_state:
         from src.database import DatabaseManager
         st.session_state.db = DatabaseManager()
-        st.session_state.db.init_db()
\ No newline at end of file
+        st.session_state.db.init_db()
+
+# Períodos disponíveis no filtro da barra lateral
+PERIODOS = [
+    "Mês",
+    "Trimestre",
+    "Ano",
+    "Ano até hoje",
+    "Últimos 12 meses",
+    "Personalizado"
+]
+
+def calcular_intervalo(periodo, mes=None, ano=None, trimestre=None, hoje=None):
+    """Calcula data inicial e final (date) para um dos PERIODOS"""
+    hoje = hoje or date.today()
+    
+    if periodo == "Mês":
+        data_inicio, data_fim = calcular_periodo(mes, ano)
+        return data_inicio.date(), data_fim.date()
+    
+    if periodo == "Trimestre":
+        mes_inicio = 3 * (trimestre - 1) + 1
+        data_inicio = date(ano, mes_inicio, 1)
+        data_fim = data_inicio + relativedelta(months=3) - timedelta(days=1)
+        return data_inicio, data_fim
+    
+    if periodo == "Ano":
+        return date(ano, 1, 1), date(ano, 12, 31)
+    
+    if periodo == "Ano até hoje":
+        return date(hoje.year, 1, 1), hoje
+    
+    if periodo == "Últimos 12 meses":
+        data_inicio = date(hoje.year, hoje.month, 1) - relativedelta(months=11)
+        return data_inicio, hoje
+    
+    raise ValueError(f"Período sem intervalo automático: {periodo}")
+
+def intervalo_ano_anterior(data_inicio, data_fim):
+    """Retorna o mesmo intervalo deslocado um ano para trás"""
+    return data_inicio - relativedelta(years=1), data_fim - relativedelta(years=1)
+
+def descrever_intervalo(data_inicio, data_fim):
+    """Descreve um intervalo de datas no formato brasileiro"""
+    return f"{formatar_data(data_inicio)} a {formatar_data(data_fim)}"
\ No newline at end of file
@@ -0,0 +1,11 @@
+import pytest
+
+from src.database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Banco vazio e inicializado num diretório temporário"""
+    banco = DatabaseManager(tmp_path / 'financas.db')
+    banco.init_db()
+    return banco
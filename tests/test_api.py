@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from src.api import ApiServidor, ErroRequisicao, validar_transacao
+
+
+def chamar(servidor, metodo, caminho, corpo=None, consulta=None):
+    """Despacha uma requisição sem abrir socket, com o gravador rodando"""
+    async def executar():
+        servidor.gravador.iniciar()
+        try:
+            return await servidor._despachar(
+                metodo, caminho, consulta or {}, json.dumps(corpo).encode() if corpo is not None else b''
+            )
+        finally:
+            servidor.gravador._tarefa.cancel()
+    return asyncio.run(executar())
+
+
+def transacao(descricao, valor=10.0, data='2024-05-02'):
+    return {'descricao': descricao, 'valor': valor, 'categoria': 'Alimentação', 'tipo': 'despesa', 'data': data}
+
+
+def test_validacao_recusa_campos_invalidos():
+    with pytest.raises(ErroRequisicao, match="tipo"):
+        validar_transacao({**transacao("x"), 'tipo': 'outro'})
+    with pytest.raises(ErroRequisicao, match="data inválida"):
+        validar_transacao({**transacao("x"), 'data': '02/05/2024'})
+    with pytest.raises(ErroRequisicao, match="moeda"):
+        validar_transacao({**transacao("x"), 'moeda': 'JPY'})
+    assert validar_transacao({**transacao("x"), 'categoria': ''})[2] is None
+
+
+def test_requisicoes_simultaneas_agrupadas_num_commit(db):
+    servidor = ApiServidor(db)
+    
+    async def enviar():
+        servidor.gravador.iniciar()
+        respostas = await asyncio.gather(*[
+            servidor.gravador.gravar([validar_transacao(transacao(f"Compra {i}"))]) for i in range(20)
+        ])
+        servidor.gravador._tarefa.cancel()
+        return respostas
+    
+    assert asyncio.run(enviar()) == [1] * 20
+    assert servidor.gravador.commits < 20
+    assert len(db.get_transacoes()) == 20
+
+
+def test_lote_reenviado_nao_duplica(db):
+    servidor = ApiServidor(db)
+    lote = {'transacoes': [transacao("Padaria"), transacao("Padaria"), transacao("Mercado", 50)]}
+    
+    assert chamar(servidor, 'POST', '/transacoes/lote', lote)[1] == {'gravadas': 3, 'duplicadas': 0}
+    assert chamar(servidor, 'POST', '/transacoes/lote', lote)[1] == {'gravadas': 0, 'duplicadas': 3}
+    assert len(db.get_transacoes()) == 3
+
+
+def test_edicao_exclusao_e_sync_gravam_na_thread_do_gravador(db):
+    servidor = ApiServidor(db)
+    chamar(servidor, 'POST', '/transacoes', transacao("Padaria"))
+    transacao_id = int(db.get_transacoes()['id'][0])
+    threads = []
+    
+    for nome in ('atualizar_transacao', 'excluir_transacao_db', 'aplicar_sync'):
+        original = getattr(db, nome)
+        
+        def registrar(*args, _original=original, **kwargs):
+            threads.append(threading.current_thread().name)
+            return _original(*args, **kwargs)
+        setattr(db, nome, registrar)
+    
+    chamar(servidor, 'PUT', f'/transacoes/{transacao_id}', transacao("Padaria Nova"))
+    chamar(servidor, 'DELETE', f'/transacoes/{transacao_id}')
+    chamar(servidor, 'POST', '/sync/aplicar', {'transacoes': [], 'exclusoes': []})
+    
+    assert len(threads) == 3
+    assert all(nome.startswith('gravador') for nome in threads)
+    assert db.get_transacoes().empty
+
+
+def test_editar_ou_excluir_id_inexistente_responde_404(db):
+    servidor = ApiServidor(db)
+    
+    for metodo, corpo in (('PUT', transacao("Fantasma")), ('DELETE', None)):
+        with pytest.raises(ErroRequisicao, match="não encontrada") as erro:
+            chamar(servidor, metodo, '/transacoes/999', corpo)
+        assert erro.value.status == 404
+    assert db.atualizar_transacao(999, "Fantasma", 1, "Outros", "2024-05-02") is None
+    assert db.excluir_transacao_db(999) is None
+    assert db.get_transacoes().empty
+
+
+def test_sync_com_corpo_incompleto_responde_400(db):
+    servidor = ApiServidor(db)
+    
+    for operacao in ('baldes', 'sub_baldes', 'exportar'):
+        with pytest.raises(ErroRequisicao, match="Corpo inválido") as erro:
+            chamar(servidor, 'POST', f'/sync/{operacao}', {})
+        assert erro.value.status == 400
+
+
+def test_rota_desconhecida(db):
+    with pytest.raises(ErroRequisicao, match="Rota não encontrada"):
+        chamar(ApiServidor(db), 'GET', '/nada')
+
+
+def cabecalho_token(token):
+    return {'authorization': f"Bearer {token}"}
+
+
+def test_sync_exige_token_quando_configurado(db):
+    servidor = ApiServidor(db, token='segredo')
+    
+    async def despachar(cabecalhos):
+        return await servidor._despachar('POST', '/sync/raiz', {}, b'{}', cabecalhos)
+    
+    with pytest.raises(ErroRequisicao, match="Token") as erro:
+        asyncio.run(despachar(cabecalho_token('errado')))
+    assert erro.value.status == 401
+    assert asyncio.run(despachar(cabecalho_token('segredo')))[0] == 200
+
+
+def test_sync_pela_rede_sem_token_e_recusada(db):
+    servidor = ApiServidor(db, host='0.0.0.0')
+    
+    with pytest.raises(ErroRequisicao, match="exige um token") as erro:
+        asyncio.run(servidor._despachar('POST', '/sync/raiz', {}, b'{}', {}))
+    assert erro.value.status == 403
\ No newline at end of file
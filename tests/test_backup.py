@@ -0,0 +1,128 @@
+import pytest
+
+from src.backup import aplicar_retencao, criar_snapshot, listar_snapshots, restaurar
+from src.database import DatabaseManager
+
+
+def contar(db, descricao=None):
+    if descricao is None:
+        return int(db.fetch_all("SELECT COUNT(*) AS n FROM transacoes")['n'][0])
+    return int(db.fetch_all("SELECT COUNT(*) AS n FROM transacoes WHERE descricao = ?", (descricao,))['n'][0])
+
+
+def gravar(db, descricao, quantidade):
+    db.add_transacoes([(descricao, 10 + i, "Outros", "despesa", "2024-03-01", "BRL") for i in range(quantidade)])
+
+
+@pytest.fixture
+def outro(tmp_path):
+    banco = DatabaseManager(tmp_path / 'casa.db')
+    banco.init_db()
+    return banco
+
+
+def test_cadeia_incremental_restaura_cada_ponto(db, tmp_path):
+    pasta = tmp_path / 'backups'
+    gravar(db, "Antes", 200)
+    completo = criar_snapshot(db.db_path, pasta)
+    gravar(db, "Meio", 50)
+    incremental = criar_snapshot(db.db_path, pasta)
+    gravar(db, "Depois", 30)
+
+    assert completo['tipo'] == 'completo'
+    assert incremental['tipo'] == 'incremental' and incremental['base'] == completo['nome']
+    assert incremental['paginas_gravadas'] < incremental['paginas']
+
+    manifesto, _, seguranca = restaurar(db.db_path, pasta)
+    assert manifesto['nome'] == incremental['nome']
+    assert (contar(db, "Antes"), contar(db, "Meio"), contar(db, "Depois")) == (200, 50, 0)
+
+    restaurar(db.db_path, pasta, completo['nome'])
+    assert (contar(db, "Antes"), contar(db, "Meio")) == (200, 0)
+
+    # O snapshot de segurança guarda o estado que a restauração sobrescreveu
+    restaurar(db.db_path, pasta, seguranca['nome'])
+    assert contar(db, "Depois") == 30
+
+
+def test_snapshots_de_bancos_diferentes_nao_se_misturam(db, outro, tmp_path):
+    pasta = tmp_path / 'backups'
+    gravar(db, "Pessoal", 100)
+    gravar(outro, "Casa", 40)
+    pessoal = criar_snapshot(db.db_path, pasta)
+    casa = criar_snapshot(outro.db_path, pasta)
+    gravar(db, "Pessoal", 10)
+    pessoal_inc = criar_snapshot(db.db_path, pasta)
+
+    # O incremental usa a base do próprio banco, mesmo com outro snapshot mais recente na pasta
+    assert casa['tipo'] == 'completo'
+    assert pessoal_inc['base'] == pessoal['nome']
+    assert [m['nome'] for m in listar_snapshots(pasta, db.db_path)] == [pessoal['nome'], pessoal_inc['nome']]
+    assert [m['nome'] for m in listar_snapshots(pasta, outro.db_path)] == [casa['nome']]
+
+    # Sem nome, restaura o mais recente do próprio banco
+    gravar(outro, "Casa", 5)
+    manifesto, _, _ = restaurar(outro.db_path, pasta)
+    assert manifesto['nome'] == casa['nome']
+    assert (contar(outro), contar(outro, "Pessoal")) == (40, 0)
+
+
+def test_restaurar_recusa_snapshot_de_outro_banco(db, outro, tmp_path):
+    pasta = tmp_path / 'backups'
+    gravar(outro, "Casa", 40)
+    casa = criar_snapshot(outro.db_path, pasta)
+    gravar(db, "Pessoal", 10)
+
+    with pytest.raises(ValueError, match="casa"):
+        restaurar(db.db_path, pasta, casa['nome'])
+    with pytest.raises(FileNotFoundError):
+        restaurar(db.db_path, pasta)
+    assert contar(db, "Pessoal") == 10
+    assert listar_snapshots(pasta, db.db_path) == []
+
+
+def test_retencao_so_remove_cadeias_antigas_do_proprio_banco(db, outro, tmp_path):
+    pasta = tmp_path / 'backups'
+    casa = criar_snapshot(outro.db_path, pasta)
+    cadeias = []
+    for i in range(3):
+        gravar(db, f"Lote {i}", 20)
+        cadeias.append([criar_snapshot(db.db_path, pasta, incremental=False)['nome'],
+                        criar_snapshot(db.db_path, pasta)['nome']])
+
+    removidos = aplicar_retencao(pasta, 2, db.db_path)
+
+    assert removidos == cadeias[0]
+    assert [m['nome'] for m in listar_snapshots(pasta, db.db_path)] == cadeias[1] + cadeias[2]
+    assert [m['nome'] for m in listar_snapshots(pasta, outro.db_path)] == [casa['nome']]
+
+
+def test_bancos_com_o_mesmo_nome_em_pastas_diferentes(tmp_path):
+    pasta = tmp_path / 'backups'
+    bancos = []
+    for nome in ('x', 'y'):
+        (tmp_path / nome).mkdir()
+        banco = DatabaseManager(tmp_path / nome / 'financas.db')
+        banco.init_db()
+        gravar(banco, f"so no {nome}", 5)
+        bancos.append(banco)
+    x, y = bancos
+    snapshot_x = criar_snapshot(x.db_path, pasta)
+    snapshot_y = criar_snapshot(y.db_path, pasta)
+
+    # Y não vira incremental sobre o completo de X
+    assert snapshot_y['tipo'] == 'completo'
+    assert [m['nome'] for m in listar_snapshots(pasta, x.db_path)] == [snapshot_x['nome']]
+
+    gravar(x, "depois", 3)
+    manifesto, _, _ = restaurar(x.db_path, pasta)
+    assert manifesto['nome'] == snapshot_x['nome']
+    assert (contar(x, "so no x"), contar(x, "so no y"), contar(x, "depois")) == (5, 0, 0)
+
+    with pytest.raises(ValueError):
+        restaurar(x.db_path, pasta, snapshot_y['nome'])
+
+    # A retenção de X não apaga a base de Y
+    criar_snapshot(x.db_path, pasta, incremental=False)
+    aplicar_retencao(pasta, 1, x.db_path)
+    assert [m['nome'] for m in listar_snapshots(pasta, y.db_path)] == [snapshot_y['nome']]
@@ -0,0 +1,50 @@
+from datetime import date
+
+import pytest
+
+from src.utils import calcular_intervalo, intervalo_ano_anterior
+
+
+def test_intervalos_dos_periodos():
+    hoje = date(2024, 5, 17)
+    assert calcular_intervalo("Mês", mes=2, ano=2024) == (date(2024, 2, 1), date(2024, 2, 29))
+    assert calcular_intervalo("Trimestre", ano=2024, trimestre=4) == (date(2024, 10, 1), date(2024, 12, 31))
+    assert calcular_intervalo("Ano até hoje", hoje=hoje) == (date(2024, 1, 1), hoje)
+    assert calcular_intervalo("Últimos 12 meses", hoje=hoje) == (date(2023, 6, 1), hoje)
+    assert intervalo_ano_anterior(date(2024, 2, 29), date(2024, 3, 31)) == (date(2023, 2, 28), date(2023, 3, 31))
+
+
+def test_totais_mensais_incluem_meses_sem_transacoes(db):
+    db.add_transacao("Salário", 1000, "Salário", "receita", "2024-01-05")
+    db.add_transacao("Mercado", 300, "Alimentação", "despesa", "2024-03-10")
+    
+    totais = db.get_totais_mensais(date(2024, 1, 1), date(2024, 3, 31))
+    
+    assert totais['ano_mes'].tolist() == ['2024-01', '2024-02', '2024-03']
+    assert totais['saldo'].tolist() == [1000, 0, -300]
+
+
+def test_saldo_diario_parte_do_acumulado_anterior(db):
+    db.add_transacao("Salário", 1000, "Salário", "receita", "2024-01-05")
+    db.add_transacao("Mercado", 300, "Alimentação", "despesa", "2024-02-02")
+    
+    saldo = db.get_saldo_diario(date(2024, 2, 1), date(2024, 2, 3))
+    
+    assert saldo['movimento'].tolist() == [0, -300, 0]
+    assert saldo['saldo'].tolist() == [1000, 700, 700]
+
+
+def test_calendario_estendido_para_transacoes_fora_da_faixa_padrao(db):
+    db.add_transacao("Aluguel antigo", 500, "Moradia", "despesa", "1998-12-30")
+    db.add_transacao("Previdência", 800, "Investimentos", "receita", "2061-01-02")
+    
+    antes = db.get_saldo_diario(date(1998, 12, 29), date(1999, 1, 1))
+    depois = db.get_totais_mensais(date(2060, 12, 1), date(2061, 1, 31))
+    
+    assert antes['saldo'].tolist() == [0, -500, -500, -500]
+    assert depois['receitas'].tolist() == [0, 800]
+
+
+def test_intervalo_fora_do_calendario_e_recusado(db):
+    with pytest.raises(ValueError, match="fora do calendário"):
+        db.get_saldo_diario(date(2070, 1, 1), date(2070, 1, 31))
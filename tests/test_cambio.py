@@ -0,0 +1,74 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def db_moedas(db, tmp_path):
+    (tmp_path / 'cotacoes.csv').write_text(
+        "data,moeda,taxa\n"
+        "2024-01-02,USD,5.0\n"
+        "2024-01-10,USD,6.0\n"
+        "2024-01-05,EUR,7.0\n"
+    )
+    db.importar_cotacoes_csv(tmp_path / 'cotacoes.csv')
+    db.add_transacoes([
+        ("Almoço", 10, "Alimentação", "despesa", "2024-01-03", "BRL"),
+        ("Hotel", 100, "Lazer", "despesa", "2024-01-09", "USD"),
+        ("Jantar", 100, "Alimentação", "despesa", "2024-01-10", "USD"),
+        ("Livro", 20, "Educação", "despesa", "2024-01-04", "EUR"),
+        ("Museu", 30, "Lazer", "despesa", "2024-01-06", "EUR"),
+    ])
+    return db
+
+
+def test_conversao_pela_ultima_cotacao_ate_a_data(db_moedas):
+    transacoes = db_moedas.get_transacoes(data_inicio=date(2024, 1, 1), data_fim=date(2024, 1, 31))
+    valores = dict(zip(transacoes['descricao'], transacoes['valor_brl']))
+    
+    assert valores['Almoço'] == 10
+    assert valores['Hotel'] == 500
+    assert valores['Jantar'] == 600
+    assert valores['Museu'] == 210
+    # Antes da primeira cotação do euro não há conversão
+    assert pd.isna(valores['Livro'])
+
+
+def test_conversao_com_colunas_restritas(db_moedas):
+    transacoes = db_moedas.get_transacoes(colunas=['descricao'])
+    
+    assert transacoes.columns.tolist() == ['descricao', 'valor_brl']
+    assert transacoes['valor_brl'].sum() == 1320
+
+
+def test_resumo_por_moeda_marca_dias_sem_cotacao(db_moedas):
+    resumo = db_moedas.get_resumo_moedas(data_inicio=date(2024, 1, 1), data_fim=date(2024, 1, 31)).set_index('moeda')
+    
+    assert resumo.loc['USD', 'total_original'] == 200
+    assert resumo.loc['USD', 'total_brl'] == 1100
+    assert resumo.loc['EUR', 'dias_sem_cotacao'] == 1
+
+
+def test_reimportar_cotacoes_substitui_a_taxa(db_moedas, tmp_path):
+    (tmp_path / 'novas.csv').write_text("data,moeda,taxa\n2024-01-10,usd,6.5\n")
+    db_moedas.importar_cotacoes_csv(tmp_path / 'novas.csv')
+    
+    transacoes = db_moedas.get_transacoes(colunas=['descricao'])
+    
+    assert dict(zip(transacoes['descricao'], transacoes['valor_brl']))['Jantar'] == 650
+
+
+@pytest.mark.filterwarnings('error::FutureWarning')
+def test_moeda_sem_nenhuma_cotacao_fica_sem_valor_brl(db):
+    db.add_transacoes([
+        ("Almoço", 10, "Alimentação", "despesa", "2024-01-03", "BRL"),
+        ("Hotel", 100, "Lazer", "despesa", "2024-01-09", "USD"),
+    ])
+
+    transacoes = db.get_transacoes()
+    valores = dict(zip(transacoes['descricao'], transacoes['valor_brl']))
+
+    assert transacoes['valor_brl'].dtype == float
+    assert valores['Almoço'] == 10
+    assert pd.isna(valores['Hotel'])
@@ -0,0 +1,34 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).parent.parent / 'benchmarks' / 'carga_sessoes.py'
+
+
+def carga(*args):
+    # Em subprocesso: o script troca o sqlite3.connect do processo para medir as instruções
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), '--sessoes', '1,2', '--duracao', '1', '--linhas', '500', *args],
+        capture_output=True, text=True, timeout=300
+    )
+
+
+def test_sessoes_simultaneas_sem_erros_e_comparacao(tmp_path):
+    salvo = tmp_path / 'carga.json'
+
+    execucao = carga('--salvar', str(salvo))
+    assert execucao.returncode == 0, execucao.stderr
+
+    niveis = json.loads(salvo.read_text(encoding='utf-8'))['niveis']
+    assert [nivel['sessoes'] for nivel in niveis] == [1, 2]
+    for nivel in niveis:
+        assert nivel['operacoes'] > 0
+        assert nivel['erros'] == {} and nivel['travas_sql'] == 0
+
+    # Uma base com vazão muito maior faz a comparação falhar
+    base = tmp_path / 'base.json'
+    base.write_text(json.dumps({'niveis': [dict(nivel, ops_s=nivel['ops_s'] * 100) for nivel in niveis]}))
+    execucao = carga('--comparar', str(base))
+    assert execucao.returncode == 1
+    assert 'regressão' in execucao.stdout
@@ -0,0 +1,80 @@
+from src.database import CATEGORIA_PADRAO, DatabaseManager
+
+
+def indice(db):
+    return {
+        (termo, tipo, categoria): contagem
+        for termo, tipo, categoria, contagem in db.fetch_all(
+            "SELECT termo, tipo, categoria, contagem FROM indice_categorias"
+        ).itertuples(index=False)
+    }
+
+
+def retreinado(db):
+    with db.get_connection() as conn:
+        conn.execute("BEGIN")
+        db._treinar_indice(conn)
+        contagens = {
+            (termo, tipo, categoria): contagem
+            for termo, tipo, categoria, contagem in conn.execute(
+                "SELECT termo, tipo, categoria, contagem FROM indice_categorias"
+            )
+        }
+        conn.rollback()
+    return contagens
+
+
+def em_memoria(db):
+    return {
+        (termo, tipo, categoria): n
+        for (tipo, termo), categorias in db.get_categorizador().indice.items()
+        for categoria, n in categorias.items() if n
+    }
+
+
+def test_indice_incremental_igual_ao_retreinado(db):
+    db.get_categorizador()
+    db.add_transacoes([
+        ("Supermercado Extra", 250, "Alimentação", "despesa", "2024-03-01", "BRL"),
+        ("Supermercado Pão de Açúcar", 180, "Alimentação", "despesa", "2024-03-03", "BRL"),
+        ("Uber Trip", 32, "Transporte", "despesa", "2024-03-04", "BRL"),
+        ("Posto Shell", 200, "Transporte", "despesa", "2024-03-05", "BRL"),
+    ])
+    transacao_id = int(db.fetch_all("SELECT id FROM transacoes WHERE descricao = 'Uber Trip'")['id'][0])
+    assert db.atualizar_transacao(transacao_id, "Uber Eats", 32, "Alimentação", "2024-03-04")
+    excluida = int(db.fetch_all("SELECT id FROM transacoes WHERE descricao = 'Posto Shell'")['id'][0])
+    assert db.excluir_transacao_db(excluida)
+
+    assert indice(db) == retreinado(db)
+    assert em_memoria(db) == indice(db)
+    assert ('shel*', 'despesa', 'Transporte') not in indice(db)
+
+
+def test_classifica_grafias_novas_pelo_historico(db):
+    db.add_transacoes(
+        [("Supermercado Extra Loja 12", 100 + i, "Alimentação", "despesa", "2024-03-01", "BRL") for i in range(5)]
+        + [("Posto Ipiranga", 150 + i, "Transporte", "despesa", "2024-03-02", "BRL") for i in range(5)]
+    )
+
+    categoria, confianca = db.get_categorizador().classificar("SUPERMERCADOS EXTRA", "despesa")
+    assert categoria == "Alimentação" and confianca > 0.9
+    assert db.get_categorizador().classificar("Livraria Cultura", "despesa") == (None, 0.0)
+
+    # Sem categoria na gravação: recebe a sugerida ou a padrão
+    db.add_transacoes([
+        ("Posto Ipiranga BR 101", 90, None, "despesa", "2024-03-10", "BRL"),
+        ("Livraria Cultura", 60, None, "despesa", "2024-03-10", "BRL"),
+    ])
+    categorias = db.fetch_all("SELECT descricao, categoria FROM transacoes WHERE data = '2024-03-10'")
+    assert dict(categorias.itertuples(index=False)) == {
+        "Posto Ipiranga BR 101": "Transporte", "Livraria Cultura": CATEGORIA_PADRAO
+    }
+
+
+def test_categorizador_recarrega_gravacoes_de_outro_processo(db):
+    db.add_transacao("Netflix", 40, "Lazer", "despesa", "2024-03-01")
+    assert db.get_categorizador().classificar("Netflix", "despesa")[0] == "Lazer"
+
+    DatabaseManager(db.db_path).add_transacoes([("Spotify", 20, "Lazer", "despesa", "2024-03-02", "BRL")])
+
+    assert db.get_categorizador().classificar("Spotify", "despesa")[0] == "Lazer"
@@ -0,0 +1,44 @@
+from datetime import date
+
+import pytest
+
+from src.analytics import Analytics
+
+
+@pytest.fixture
+def db_dois_anos(db):
+    db.add_transacoes([
+        ("Mercado", 300, "Alimentação", "despesa", "2025-01-15", "BRL"),
+        ("Farmácia", 100, "Saúde", "despesa", "2025-10-05", "BRL"),
+        ("Padaria", 40, "Alimentação", "despesa", "2025-10-12", "BRL"),
+        ("Viagem", 100, "Lazer", "despesa", "2025-10-25", "BRL"),
+        ("Salário", 5000, "Salário", "receita", "2025-10-30", "BRL"),
+        ("Mercado", 250, "Alimentação", "despesa", "2026-01-20", "BRL"),
+        ("Cinema", 100, "Lazer", "despesa", "2026-10-10", "BRL"),
+    ])
+    return db
+
+
+def comparacao(db, inicio, fim):
+    _, df_comp = Analytics(db).gerar_grafico_comparativo_anual(inicio, fim)
+    return df_comp.set_index('ano_mes')
+
+
+def test_mes_parcial_compara_com_os_mesmos_dias(db_dois_anos):
+    df_comp = comparacao(db_dois_anos, date(2026, 10, 10), date(2026, 10, 19))
+
+    assert list(df_comp.index) == ['2026-10']
+    assert df_comp.loc['2026-10', 'despesas'] == 100
+    # Só 10 a 19/10/2025: fica de fora a farmácia (dia 5), a viagem (25) e o salário (30)
+    assert df_comp.loc['2026-10', 'despesas_anterior'] == 40
+    assert df_comp.loc['2026-10', 'receitas_anterior'] == 0
+
+
+def test_ano_ate_hoje(db_dois_anos):
+    df_comp = comparacao(db_dois_anos, date(2026, 1, 1), date(2026, 10, 19))
+
+    assert len(df_comp) == 10
+    assert (df_comp.loc['2026-01', 'despesas'], df_comp.loc['2026-01', 'despesas_anterior']) == (250, 300)
+    assert (df_comp.loc['2026-10', 'despesas'], df_comp.loc['2026-10', 'despesas_anterior']) == (100, 140)
+    assert df_comp['despesas_anterior'].sum() == 440
+    assert df_comp['variacao_despesas'].isna().sum() == 8
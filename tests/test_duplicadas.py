@@ -0,0 +1,72 @@
+import sqlite3
+
+from src.database import DatabaseManager, impressao_transacao
+
+
+def contar(db, descricao):
+    return int(db.fetch_all("SELECT COUNT(*) AS n FROM transacoes WHERE descricao = ?", (descricao,))['n'][0])
+
+
+def test_reimportar_extrato_grava_so_as_copias_a_mais(db):
+    cafe = ("Café", 7.5, "Alimentação", "despesa", "2024-03-01", "BRL")
+    assert db.add_lotes([[cafe, cafe]], ignorar_duplicadas=True) == [2]
+
+    # Mesmo extrato de novo: nada; com uma terceira compra igual: só ela
+    assert db.add_lotes([[cafe, cafe]], ignorar_duplicadas=True) == [0]
+    assert db.add_lotes([[cafe, cafe, cafe]], ignorar_duplicadas=True) == [1]
+    assert contar(db, "Café") == 3
+
+    # Entre lotes da mesma gravação conta o maior número de cópias, não a soma
+    assert db.add_lotes([[cafe] * 4, [cafe] * 5], ignorar_duplicadas=True) == [1, 1]
+    assert contar(db, "Café") == 5
+
+
+def test_mesmo_valor_em_outra_moeda_nao_e_duplicada(db):
+    db.add_transacao("Netflix", 10, "Lazer", "despesa", "2024-03-05", "USD")
+
+    assert db.add_lotes([[("NETFLIX", 10, "Lazer", "despesa", "2024-03-05", "BRL")]], ignorar_duplicadas=True) == [1]
+    assert db.add_lotes([[("Netflix ", 10, "Lazer", "despesa", "2024-03-05", "USD")]], ignorar_duplicadas=True) == [0]
+
+    usd = db.buscar_duplicadas("Netflix", 10, "despesa", "2024-03-06", "USD")
+    assert list(usd['moeda']) == ['USD']
+    assert db.buscar_duplicadas("Netflix", 10, "despesa", "2024-03-05", "EUR").empty
+
+
+def test_buscar_duplicadas_ordena_exatas_antes_das_parecidas(db):
+    db.add_transacoes([
+        ("Padaria Pão Quente", 25, "Alimentação", "despesa", "2024-03-01", "BRL"),
+        ("Padaria Pao Quente LTDA", 25, "Alimentação", "despesa", "2024-03-02", "BRL"),
+        ("Posto Shell", 25, "Transporte", "despesa", "2024-03-01", "BRL"),
+    ])
+
+    duplicadas = db.buscar_duplicadas("PADARIA PÃO QUENTE", 25, "despesa", "2024-03-01")
+
+    assert list(duplicadas['descricao']) == ["Padaria Pão Quente", "Padaria Pao Quente LTDA"]
+    assert list(duplicadas['exata']) == [True, False]
+
+
+def test_editar_a_moeda_recalcula_a_impressao(db):
+    db.add_transacao("Hotel", 300, "Viagem", "despesa", "2024-03-01", "BRL")
+    transacao_id = int(db.fetch_all("SELECT id FROM transacoes")['id'][0])
+
+    assert db.atualizar_transacao(transacao_id, "Hotel", 300, "Viagem", "2024-03-01", "EUR")
+
+    impressao = int(db.fetch_all("SELECT impressao FROM transacoes")['impressao'][0])
+    assert impressao == impressao_transacao("2024-03-01", 300, "Hotel", "despesa", "EUR")
+
+
+def test_init_db_recalcula_impressoes_sem_moeda(db):
+    db.add_transacoes([
+        ("Uber", 30, "Transporte", "despesa", "2024-03-01", "BRL"),
+        ("Uber", 30, "Transporte", "despesa", "2024-03-01", "USD"),
+    ])
+    # Impressões no formato antigo (data|valor|descrição|tipo), iguais para as duas linhas
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("UPDATE transacoes SET impressao = 42")
+
+    DatabaseManager(db.db_path).init_db()
+
+    impressoes = db.fetch_all("SELECT moeda, impressao FROM transacoes ORDER BY moeda")
+    assert list(impressoes['impressao']) == [
+        impressao_transacao("2024-03-01", 30, "Uber", "despesa", moeda) for moeda in impressoes['moeda']
+    ]
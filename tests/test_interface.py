@@ -0,0 +1,62 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from src.database import DatabaseManager
+
+APP = str(Path(__file__).parent.parent / 'app.py')
+
+
+@pytest.fixture
+def consultas(monkeypatch):
+    """Instruções SQL executadas por todas as conexões abertas durante o teste"""
+    executadas = []
+    connect = sqlite3.connect
+
+    def connect_contando(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(
+            lambda sql: executadas.append(sql) if sql.lstrip().upper().startswith(('SELECT', 'WITH')) else None
+        )
+        return conn
+
+    monkeypatch.setattr(sqlite3, 'connect', connect_contando)
+    return executadas
+
+
+def test_versao_dados_muda_so_com_gravacoes(db):
+    versao = db.versao_dados()
+    db.get_transacoes()
+    db.get_resumo(mes=3, ano=2024)
+    assert db.versao_dados() == versao
+
+    db.add_transacao("Café", 7.5, "Alimentação", "despesa", "2024-03-01")
+    assert db.versao_dados() != versao
+
+    # Gravação de outro processo: o contador não muda, o banco/WAL sim
+    versao = db.versao_dados()
+    DatabaseManager(db.db_path).add_transacao("Pão", 5, "Alimentação", "despesa", "2024-03-02")
+    assert db.versao_dados() != versao
+
+
+def test_rerun_sem_mudancas_nao_consulta_o_banco(db, consultas):
+    db.add_transacoes([
+        (f"Compra {i}", 10 + i, "Alimentação", "despesa", f"2024-0{1 + i % 3}-1{i % 9}", "BRL") for i in range(20)
+    ])
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state['db'] = db
+    at.run()
+    assert not at.exception
+    assert consultas
+
+    consultas.clear()
+    at.run()
+    assert not at.exception
+    assert consultas == []
+
+    # Outra sessão gravou: o próximo rerun lê de novo
+    DatabaseManager(db.db_path).add_transacao("Mercado", 80, "Alimentação", "despesa", "2024-03-20")
+    at.run()
+    assert consultas
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from src.analytics import Analytics
+
+COLUNAS = ['mes', 'tipo', 'categoria', 'valor', 'anterior', 'media_3m', 'media_12m']
+
+
+def metricas(db):
+    return db.fetch_all(f"SELECT {', '.join(COLUNAS)} FROM metricas_mensais ORDER BY mes, tipo, categoria")
+
+
+def igual_a_reconstruir(db):
+    incremental = metricas(db)
+    with db.get_connection() as conn:
+        db._reconstruir_metricas(conn)
+        conn.commit()
+    pd.testing.assert_frame_equal(incremental, metricas(db))
+    return incremental
+
+
+@pytest.fixture
+def db_historico(db):
+    db.add_transacoes(
+        [(f"Salário {mes}", 5000, "Salário", "receita", f"2024-{mes:02d}-05", "BRL") for mes in range(1, 13)]
+        + [(f"Mercado {mes}", 100 * mes, "Alimentação", "despesa", f"2024-{mes:02d}-10", "BRL") for mes in range(1, 13)]
+        + [(f"Cinema {mes}", 50, "Lazer", "despesa", f"2024-{mes:02d}-20", "USD") for mes in range(3, 13, 3)]
+    )
+    return db
+
+
+def test_medias_e_taxa_de_poupanca(db_historico):
+    tabela = metricas(db_historico).set_index(['mes', 'tipo', 'categoria'])
+    
+    maio = tabela.loc[('2024-05', 'despesa', 'Alimentação')]
+    assert maio['valor'] == 500
+    assert maio['anterior'] == 400
+    assert maio['media_3m'] == 300
+    # Janela de 12 meses limitada ao primeiro mês com transações (jan a abr)
+    assert maio['media_12m'] == 250
+    assert tabela.loc[('2024-05', 'poupanca', ''), 'valor'] == pytest.approx(0.9)
+    assert tabela.loc[('2024-05', 'poupanca', ''), 'media_3m'] == pytest.approx(1 - 900 / 15000)
+
+
+def test_incremental_igual_a_reconstruir_apos_cada_gravacao(db_historico, tmp_path):
+    db = db_historico
+    db.add_transacao("Farmácia", 80, "Saúde", "despesa", "2024-07-15")
+    igual_a_reconstruir(db)
+    
+    # Mês anterior ao primeiro: as janelas de todos os meses seguintes mudam
+    db.add_transacao("Extrato antigo", 300, "Alimentação", "despesa", "2023-03-10")
+    igual_a_reconstruir(db)
+    
+    transacao_id = int(db.fetch_all("SELECT id FROM transacoes WHERE descricao = 'Mercado 6'")['id'][0])
+    db.atualizar_transacao(transacao_id, "Mercado 6", 999, "Alimentação", "2024-08-01")
+    igual_a_reconstruir(db)
+    
+    # Excluir o primeiro mês faz as janelas começarem mais tarde
+    antigo_id = int(db.fetch_all("SELECT id FROM transacoes WHERE descricao = 'Extrato antigo'")['id'][0])
+    db.excluir_transacao_db(antigo_id)
+    igual_a_reconstruir(db)
+    
+    (tmp_path / 'cotacoes.csv').write_text("data,moeda,taxa\n2024-01-01,USD,5.0\n2024-06-01,USD,6.0\n")
+    db.importar_cotacoes_csv(tmp_path / 'cotacoes.csv')
+    depois = igual_a_reconstruir(db)
+    cinema = depois.set_index(['mes', 'tipo', 'categoria']).loc[('2024-09', 'despesa', 'Lazer'), 'valor']
+    assert cinema == 300
+
+
+def test_reimportar_cotacoes_iguais_nao_recalcula(db_historico, tmp_path):
+    (tmp_path / 'cotacoes.csv').write_text("data,moeda,taxa\n2024-01-01,USD,5.0\n")
+    db_historico.importar_cotacoes_csv(tmp_path / 'cotacoes.csv')
+    chamadas = []
+    original = db_historico._atualizar_metricas
+    db_historico._atualizar_metricas = lambda c, meses: chamadas.append(meses) or original(c, meses)
+    
+    db_historico.importar_cotacoes_csv(tmp_path / 'cotacoes.csv')
+    
+    assert chamadas == []
+
+
+def test_tabela_de_tendencias(db_historico):
+    tabela = Analytics(db_historico).gerar_tabela_tendencias(db_historico.get_metricas('2024-05-31'), '2024-05')
+    
+    assert tabela['CATEGORIA'].tolist() == ['Alimentação']
+    assert tabela['VS MÊS ANTERIOR'].tolist() == ['+25.0%']
+    assert tabela['VS MÉDIA 12M'].tolist() == ['+100.0%']
@@ -0,0 +1,31 @@
+from datetime import date
+
+import pytest
+
+from src.relatorios import gerar_relatorios, listar_meses
+
+
+def test_listar_meses_inclui_as_pontas():
+    assert listar_meses(date(2023, 11, 20), date(2024, 2, 1)) == [(2023, 11), (2023, 12), (2024, 1), (2024, 2)]
+
+
+@pytest.mark.parametrize('processos', [1, 2])
+def test_um_relatorio_por_mes_e_indice(db, tmp_path, processos):
+    db.add_transacoes([
+        ("Salário", 5000, "Salário", "receita", "2024-01-05", "BRL"),
+        ("Mercado <Extra>", 300, "Alimentação", "despesa", "2024-01-10", "BRL"),
+        ("Aluguel", 1500, "Moradia", "despesa", "2024-03-01", "BRL"),
+    ])
+    destino = tmp_path / 'relatorios'
+
+    arquivos, _ = gerar_relatorios(db.db_path, date(2024, 1, 1), date(2024, 3, 31), destino,
+                                   processos=processos, plotlyjs='cdn')
+
+    assert [arquivo.name for arquivo in arquivos] == ['2024-01.html', '2024-02.html', '2024-03.html']
+    janeiro = arquivos[0].read_text(encoding='utf-8')
+    assert "2 transações" in janeiro
+    assert "Mercado &lt;Extra&gt;" in janeiro
+    assert "Nenhuma transação no mês." in arquivos[1].read_text(encoding='utf-8')
+    indice = (destino / 'index.html').read_text(encoding='utf-8')
+    assert all(f'href="{arquivo.name}"' in indice for arquivo in arquivos)
+    assert not (destino / 'plotly.min.js').exists()
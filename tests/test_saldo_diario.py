@@ -0,0 +1,52 @@
+from datetime import date
+
+import numpy as np
+
+from src.analytics import Analytics, reduzir_lttb
+
+
+def test_lttb_mantem_extremos_e_picos():
+    x = np.arange(10_000)
+    y = np.sin(x / 500)
+    y[4321] = 50
+    y[7777] = -50
+
+    indices = reduzir_lttb(x, y, 200)
+
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert {4321, 7777} <= set(indices.tolist())
+
+
+def test_lttb_nao_reduz_series_pequenas():
+    assert reduzir_lttb([1, 2, 3], [3, 1, 2], 10).tolist() == [0, 1, 2]
+    assert reduzir_lttb(range(100), range(100), 2).tolist() == list(range(100))
+
+
+def test_saldo_diario_parte_do_acumulado_anterior(db):
+    db.add_transacoes([
+        ("Salário", 1000, "Salário", "receita", "2024-02-25", "BRL"),
+        ("Mercado", 200, "Alimentação", "despesa", "2024-03-02", "BRL"),
+        ("Freela", 50, "Outros", "receita", "2024-03-02", "BRL"),
+        ("Aluguel", 700, "Moradia", "despesa", "2024-03-05", "BRL"),
+    ])
+
+    saldo = db.get_saldo_diario(date(2024, 3, 1), date(2024, 3, 6))
+
+    assert saldo['data'].tolist() == [f"2024-03-0{dia}" for dia in range(1, 7)]
+    assert saldo['movimento'].tolist() == [0, -150, 0, 0, -700, 0]
+    assert saldo['saldo'].tolist() == [1000, 850, 850, 850, 150, 150]
+
+
+def test_grafico_saldo_diario_limita_os_pontos(db):
+    db.add_transacoes([
+        (f"Compra {i}", 1 + i % 17, "Outros", "despesa", f"{2020 + i % 5}-0{1 + i % 9}-1{i % 9}", "BRL")
+        for i in range(300)
+    ])
+
+    fig, diario = Analytics(db).gerar_grafico_saldo_diario(date(2020, 1, 1), date(2024, 12, 31), max_pontos=100)
+
+    assert len(diario) == 1827
+    assert len(fig.data[0].x) == 100
+    assert fig.data[0].y[-1] == diario['saldo'].iloc[-1]
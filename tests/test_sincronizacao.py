@@ -0,0 +1,120 @@
+import shutil
+import sqlite3
+
+import pytest
+
+from src.database import COLUNAS_SYNC, DatabaseManager
+from src.sincronizacao import ParLocal, raiz, sincronizar
+
+
+def transacoes(db):
+    return db.fetch_all(f"SELECT {', '.join(COLUNAS_SYNC)} FROM transacoes ORDER BY uuid")
+
+
+def id_por_descricao(db, descricao):
+    return int(db.fetch_all("SELECT id FROM transacoes WHERE descricao = ?", (descricao,))['id'][0])
+
+
+@pytest.fixture
+def pares(tmp_path):
+    notebook = DatabaseManager(tmp_path / 'notebook.db')
+    servidor = DatabaseManager(tmp_path / 'servidor.db')
+    notebook.init_db()
+    servidor.init_db()
+    notebook.add_transacoes([
+        (f"Compra {i}", 10 + i, "Alimentação", "despesa", f"2024-0{1 + i % 3}-1{i % 9}", "BRL") for i in range(30)
+    ])
+    sincronizar(notebook, ParLocal(servidor))
+    return notebook, servidor
+
+
+def test_copias_de_um_banco_antigo_ja_estao_sincronizadas(tmp_path):
+    # Banco anterior à sincronização: transacoes sem uuid nem alterado_em
+    with sqlite3.connect(tmp_path / 'antigo.db') as conn:
+        conn.execute('''
+            CREATE TABLE transacoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                descricao TEXT NOT NULL,
+                valor REAL NOT NULL,
+                categoria TEXT NOT NULL,
+                tipo TEXT NOT NULL CHECK(tipo IN ('receita', 'despesa')),
+                data DATE NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.executemany(
+            "INSERT INTO transacoes (descricao, valor, categoria, tipo, data) VALUES (?, ?, ?, ?, ?)",
+            [(f"Compra {i}", 10 + i, "Alimentação", "despesa", f"2023-{1 + i % 12:02d}-10") for i in range(50)]
+        )
+    shutil.copy(tmp_path / 'antigo.db', tmp_path / 'copia.db')
+    notebook = DatabaseManager(tmp_path / 'antigo.db')
+    servidor = DatabaseManager(tmp_path / 'copia.db')
+    notebook.init_db()
+    servidor.init_db()
+    
+    resumo = sincronizar(notebook, ParLocal(servidor))
+    
+    assert resumo['sincronizado']
+    assert resumo['baldes'] == 0
+    assert len(transacoes(notebook)) == len(transacoes(servidor)) == 50
+
+
+def test_mudancas_dos_dois_lados_convergem(pares):
+    notebook, servidor = pares
+    notebook.add_transacao("Nova no notebook", 5, "Lazer", "despesa", "2024-02-01")
+    servidor.add_transacao("Nova no servidor", 7, "Lazer", "despesa", "2024-03-01")
+    notebook.atualizar_transacao(id_por_descricao(notebook, "Compra 1"), "Editada", 99, "Lazer", "2024-02-11")
+    servidor.excluir_transacao_db(id_por_descricao(servidor, "Compra 2"))
+    
+    resumo = sincronizar(notebook, ParLocal(servidor))
+    
+    assert resumo['sincronizado']
+    assert resumo['enviadas'] == {'incluidas': 1, 'atualizadas': 1, 'excluidas': 0}
+    assert resumo['recebidas'] == {'incluidas': 1, 'atualizadas': 0, 'excluidas': 1}
+    assert transacoes(notebook).equals(transacoes(servidor))
+    assert len(transacoes(notebook)) == 31
+    assert sincronizar(notebook, ParLocal(servidor))['baldes'] == 0
+
+
+def test_lapide_vence_edicao_concorrente(pares):
+    notebook, servidor = pares
+    notebook.atualizar_transacao(id_por_descricao(notebook, "Compra 3"), "Editada depois", 1, "Lazer", "2024-01-13")
+    servidor.excluir_transacao_db(id_por_descricao(servidor, "Compra 3"))
+    
+    sincronizar(notebook, ParLocal(servidor))
+    
+    for db in pares:
+        assert "Editada depois" not in transacoes(db)['descricao'].tolist()
+        assert "Compra 3" not in transacoes(db)['descricao'].tolist()
+
+
+def test_edicao_mais_recente_vence(pares):
+    notebook, servidor = pares
+    notebook.atualizar_transacao(id_por_descricao(notebook, "Compra 4"), "Notebook", 1, "Lazer", "2024-02-14")
+    servidor.atualizar_transacao(id_por_descricao(servidor, "Compra 4"), "Servidor", 2, "Lazer", "2024-02-14")
+    
+    sincronizar(notebook, ParLocal(servidor))
+    
+    assert "Servidor" in transacoes(notebook)['descricao'].tolist()
+    assert transacoes(notebook).equals(transacoes(servidor))
+
+
+def test_hashes_incrementais_iguais_ao_recalculo(pares):
+    notebook, _ = pares
+    notebook.add_transacao("Nova", 5, "Lazer", "despesa", "2024-05-01")
+    notebook.atualizar_transacao(id_por_descricao(notebook, "Compra 5"), "Movida", 5, "Lazer", "2024-06-01")
+    notebook.excluir_transacao_db(id_por_descricao(notebook, "Compra 6"))
+    incremental = raiz(notebook.get_hashes_sync())
+    
+    with notebook.get_connection() as conn:
+        notebook._recalcular_sync(conn)
+        conn.commit()
+    
+    assert raiz(notebook.get_hashes_sync()) == incremental
+
+
+def test_par_sem_transporte_nao_instancia():
+    from src.sincronizacao import Par
+    
+    with pytest.raises(TypeError):
+        Par()
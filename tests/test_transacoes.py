@@ -0,0 +1,52 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.analytics import COLUNAS_EXTRATO
+from src.database import COLUNAS_TRANSACOES, TIPO_TEXTO
+
+
+@pytest.fixture
+def db_extrato(db):
+    db.add_transacoes([
+        (f"Compra {i}", 10 + i, ["Alimentação", "Transporte", "Lazer"][i % 3], "despesa",
+         f"2024-03-{1 + i:02d}", "BRL")
+        for i in range(20)
+    ])
+    return db
+
+
+def test_tipos_compactos(db_extrato):
+    transacoes = db_extrato.get_transacoes()
+
+    assert list(transacoes.columns) == list(COLUNAS_TRANSACOES) + ['valor_brl']
+    for coluna in ('tipo', 'categoria', 'moeda'):
+        assert isinstance(transacoes[coluna].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_dtype(transacoes['data'])
+    assert pd.api.types.is_datetime64_dtype(transacoes['created_at'])
+    if TIPO_TEXTO:
+        assert transacoes['descricao'].dtype == TIPO_TEXTO
+
+
+def test_colunas_pedidas_e_limite(db_extrato):
+    transacoes = db_extrato.get_transacoes(limite=5, colunas=('descricao', 'categoria'))
+
+    # valor, moeda e data são lidos para a conversão, mas não voltam
+    assert list(transacoes.columns) == ['descricao', 'categoria', 'valor_brl']
+    assert transacoes['descricao'].tolist() == [f"Compra {i}" for i in range(19, 14, -1)]
+    assert transacoes['valor_brl'].tolist() == [29, 28, 27, 26, 25]
+
+
+def test_colunas_invalidas(db_extrato):
+    with pytest.raises(ValueError, match="impressao"):
+        db_extrato.get_transacoes(colunas=('descricao', 'impressao'))
+
+
+def test_filtro_por_intervalo(db_extrato):
+    transacoes = db_extrato.get_transacoes(
+        data_inicio=date(2024, 3, 5), data_fim=date(2024, 3, 7), colunas=COLUNAS_EXTRATO
+    )
+
+    assert transacoes['data'].dt.day.tolist() == [7, 6, 5]
+    assert transacoes['valor'].tolist() == transacoes['valor_brl'].tolist()